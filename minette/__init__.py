@@ -4,7 +4,11 @@ from .config import Config
 from .core import Minette
 from .datastore import (
     ConnectionProvider,
+    PooledConnectionProvider,
     ContextStore,
+    CachedContextStore,
+    BufferedMessageLogStore,
+    PartitionedMessageLogStore,
     UserStore,
     MessageLogStore,
     StoreSet,
@@ -19,9 +23,12 @@ from .dialog import (
     EchoDialogService,
     ErrorDialogService,
     DialogRouter,
+    PatternDialogRouter,
+    ClassifierDialogRouter,
+    FAQDialogService,
     DependencyContainer
 )
 from .models import *
-from .tagger import Tagger
+from .tagger import Tagger, CachedTagger
 from .adapter import Adapter
 from .scheduler import Task, Scheduler
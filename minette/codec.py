@@ -0,0 +1,465 @@
+""" Codecs to encode/decode the data stored in data stores """
+from abc import ABC, abstractmethod
+import base64
+import json
+import zlib
+import threading
+from datetime import datetime
+
+from .utils import date_to_str
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+
+# prefix of the tagged value. JSON never starts with this
+TAG_PREFIX = "~"
+NO_COMPRESSION = "-"
+
+
+def _encode_datetime(obj):
+    if isinstance(obj, datetime):
+        return date_to_str(obj, obj.tzinfo is not None)
+
+
+class Codec(ABC):
+    """
+    Base class for codec
+
+    Attributes
+    ----------
+    name : str
+        Name of codec
+    tag : str
+        Character to identify the codec in tagged value
+    binary : bool
+        Whether the codec writes bytes. Values written by the codec that
+        is not binary are stored as is unless they are compressed
+    """
+    name = None
+    tag = None
+    binary = False
+
+    @abstractmethod
+    def encode(self, obj):
+        """
+        Encode object
+
+        Parameters
+        ----------
+        obj : dict or list
+            Object to encode
+
+        Returns
+        -------
+        data : str or bytes
+            Encoded data. bytes for binary codec
+        """
+        pass
+
+    @abstractmethod
+    def decode(self, data, object_hook=None):
+        """
+        Decode data
+
+        Parameters
+        ----------
+        data : str or bytes
+            Data to decode
+        object_hook : callable, default None
+            Function called with each decoded dict
+
+        Returns
+        -------
+        obj : dict or list
+            Decoded object
+        """
+        pass
+
+
+class JSONCodec(Codec):
+    """
+    Codec using json in standard library
+
+    """
+    name = "json"
+    tag = "j"
+
+    def encode(self, obj):
+        return json.dumps(obj, default=_encode_datetime)
+
+    def decode(self, data, object_hook=None):
+        return json.loads(data, object_hook=object_hook)
+
+
+class OrJSONCodec(JSONCodec):
+    """
+    Codec using orjson
+
+    """
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is required to use OrJSONCodec")
+
+    def encode(self, obj):
+        # encode datetime in the same format as JSONCodec
+        return orjson.dumps(
+            obj, default=_encode_datetime,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+
+    def decode(self, data, object_hook=None):
+        if object_hook:
+            return super().decode(data, object_hook)
+        return orjson.loads(data)
+
+
+class UJSONCodec(JSONCodec):
+    """
+    Codec using ujson
+
+    """
+    name = "ujson"
+
+    def __init__(self):
+        if ujson is None:
+            raise ImportError("ujson is required to use UJSONCodec")
+
+    def encode(self, obj):
+        return ujson.dumps(obj, default=_encode_datetime)
+
+    def decode(self, data, object_hook=None):
+        if object_hook:
+            return super().decode(data, object_hook)
+        return ujson.loads(data)
+
+
+class MessagePackCodec(Codec):
+    """
+    Binary codec using MessagePack
+
+    """
+    name = "msgpack"
+    tag = "m"
+    binary = True
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack is required to use MessagePackCodec")
+
+    def encode(self, obj):
+        return msgpack.packb(obj, default=_encode_datetime, use_bin_type=True)
+
+    def decode(self, data, object_hook=None):
+        return msgpack.unpackb(
+            data, raw=False, strict_map_key=False, object_hook=object_hook)
+
+
+class Compressor(ABC):
+    """
+    Base class for compressor
+
+    Attributes
+    ----------
+    name : str
+        Name of compressor
+    tag : str
+        Character to identify the compression in tagged value
+    threshold : int
+        Values smaller than this (in bytes) are not compressed
+    """
+    name = None
+    tag = None
+
+    def __init__(self, threshold=1024):
+        """
+        Parameters
+        ----------
+        threshold : int, default 1024
+            Values smaller than this (in bytes) are not compressed
+        """
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._compressed = 0
+        self._skipped = 0
+        self._original_bytes = 0
+        self._stored_bytes = 0
+
+    def compress(self, data):
+        """
+        Compress data if it is large enough and compression reduces its size
+
+        Parameters
+        ----------
+        data : bytes
+            Data to compress
+
+        Returns
+        -------
+        compressed : bytes
+            Compressed data. None if not compressed
+        """
+        compressed = None
+        if len(data) >= self.threshold:
+            compressed = self._compress(data)
+            # compressed value is stored as base64
+            if (len(compressed) + 2) // 3 * 4 + 3 >= len(data):
+                compressed = None
+        with self._lock:
+            if compressed is None:
+                self._skipped += 1
+            else:
+                self._compressed += 1
+                self._original_bytes += len(data)
+                self._stored_bytes += (len(compressed) + 2) // 3 * 4 + 3
+        return compressed
+
+    @abstractmethod
+    def _compress(self, data):
+        pass
+
+    @abstractmethod
+    def decompress(self, data):
+        """
+        Decompress data
+
+        Parameters
+        ----------
+        data : bytes
+            Compressed data
+
+        Returns
+        -------
+        data : bytes
+            Decompressed data
+        """
+        pass
+
+    def stats(self):
+        """
+        Get statistics of compression
+
+        Returns
+        -------
+        stats : dict
+            Count of `compressed` and `skipped` values, `original_bytes` and
+            `stored_bytes` of the compressed values and `bytes_saved`
+        """
+        with self._lock:
+            return {
+                "compressed": self._compressed,
+                "skipped": self._skipped,
+                "original_bytes": self._original_bytes,
+                "stored_bytes": self._stored_bytes,
+                "bytes_saved": self._original_bytes - self._stored_bytes,
+            }
+
+
+class ZlibCompressor(Compressor):
+    """
+    Compressor using zlib
+
+    """
+    name = "zlib"
+    tag = "z"
+
+    def __init__(self, threshold=1024, level=6):
+        """
+        Parameters
+        ----------
+        threshold : int, default 1024
+            Values smaller than this (in bytes) are not compressed
+        level : int, default 6
+            Compression level from 1 (fastest) to 9 (smallest)
+        """
+        super().__init__(threshold)
+        self.level = level
+
+    def _compress(self, data):
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data):
+        return zlib.decompress(data)
+
+
+class LZ4Compressor(Compressor):
+    """
+    Compressor using LZ4. Faster than zlib but compression ratio is lower
+
+    """
+    name = "lz4"
+    tag = "l"
+
+    def __init__(self, threshold=1024):
+        if lz4 is None:
+            raise ImportError("lz4 is required to use LZ4Compressor")
+        super().__init__(threshold)
+
+    def _compress(self, data):
+        return lz4.frame.compress(data)
+
+    def decompress(self, data):
+        return lz4.frame.decompress(data)
+
+
+codec_classes = {
+    c.name: c for c in (JSONCodec, OrJSONCodec, UJSONCodec, MessagePackCodec)
+}
+_codecs = {}
+compressor_classes = {c.name: c for c in (ZlibCompressor, LZ4Compressor)}
+_decompressors = {}
+
+
+def get_codec(codec=None):
+    """
+    Get codec
+
+    Parameters
+    ----------
+    codec : str or Codec, default None
+        Name of codec or codec itself. "json" if None
+
+    Returns
+    -------
+    codec : Codec
+        Codec
+    """
+    if isinstance(codec, Codec):
+        return codec
+    name = codec or "json"
+    if name not in _codecs:
+        if name not in codec_classes:
+            raise ValueError("Unknown codec: {}".format(name))
+        _codecs[name] = codec_classes[name]()
+    return _codecs[name]
+
+
+def _get_codec_by_tag(tag):
+    for c in codec_classes.values():
+        if c.tag == tag:
+            return get_codec(c.name)
+    raise ValueError("Unknown codec tag: {}".format(tag))
+
+
+def get_compressor(compression=None, threshold=None):
+    """
+    Get new compressor
+
+    Parameters
+    ----------
+    compression : str or Compressor, default None
+        Name of compression like "zlib" or compressor itself
+    threshold : int, default None
+        Values smaller than this (in bytes) are not compressed.
+        1024 if None
+
+    Returns
+    -------
+    compressor : Compressor
+        Compressor. None if compression is not specified
+    """
+    if not compression or isinstance(compression, Compressor):
+        return compression or None
+    if compression not in compressor_classes:
+        raise ValueError("Unknown compression: {}".format(compression))
+    if threshold is None:
+        return compressor_classes[compression]()
+    return compressor_classes[compression](threshold=threshold)
+
+
+def _get_decompressor_by_tag(tag):
+    if tag not in _decompressors:
+        for c in compressor_classes.values():
+            if c.tag == tag:
+                _decompressors[tag] = c()
+                break
+        else:
+            raise ValueError("Unknown compression tag: {}".format(tag))
+    return _decompressors[tag]
+
+
+def encode(obj, codec=None, compressor=None):
+    """
+    Encode object to the str to store
+
+    Parameters
+    ----------
+    obj : dict or list
+        Object to encode
+    codec : str or Codec, default None
+        Codec to encode. "json" if None
+    compressor : Compressor, default None
+        Compressor to compress large values
+
+    Returns
+    -------
+    s : str
+        JSON, or "~" + codec tag + compression tag + base64 encoded data
+        for binary codecs and compressed values
+    """
+    codec = get_codec(codec)
+    data = codec.encode(obj)
+    compression = NO_COMPRESSION
+    if compressor is not None:
+        compressed = compressor.compress(
+            data if codec.binary else data.encode("utf-8"))
+        if compressed is not None:
+            data = compressed
+            compression = compressor.tag
+    if not codec.binary and compression == NO_COMPRESSION:
+        return data
+    return TAG_PREFIX + codec.tag + compression + \
+        base64.b64encode(data).decode("ascii")
+
+
+def decode(s, codec=None, object_hook=None):
+    """
+    Decode the stored str. Codec and compression are selected by the tag
+    in the value, so the values written by any codec can be decoded.
+
+    Parameters
+    ----------
+    s : str
+        Stored value
+    codec : str or Codec, default None
+        Codec to decode the value written as JSON. "json" if None
+    object_hook : callable, default None
+        Function called with each decoded dict
+
+    Returns
+    -------
+    obj : dict or list
+        Decoded object
+    """
+    codec = get_codec(codec)
+    if codec.binary:
+        # JSON written before switching to binary codec
+        codec = get_codec("json")
+    if s.startswith(TAG_PREFIX):
+        data = base64.b64decode(s[3:])
+        if s[2] != NO_COMPRESSION:
+            data = _get_decompressor_by_tag(s[2]).decompress(data)
+        value_codec = _get_codec_by_tag(s[1])
+        if value_codec.binary:
+            return value_codec.decode(data, object_hook=object_hook)
+        s = data.decode("utf-8")
+    return codec.decode(s, object_hook=object_hook)
@@ -41,3 +41,28 @@ class Config:
         if str(ret).startswith("ENV::"):
             ret = os.environ.get(ret[5:], default)
         return ret
+
+    def getboolean(self, key, default=False, section="minette"):
+        """
+        Get configuration value as bool
+
+        Parameters
+        ----------
+        key : str
+            Configuration key
+        default : bool, default False
+            Value returned when the key is not configured
+        section : str, default "minette"
+            Section of configuration
+
+        Returns
+        -------
+        value : bool
+            True when the value is one of "1", "yes", "true" or "on"
+        """
+        ret = self.get(key, section=section)
+        if ret is None or ret == "":
+            return default
+        if isinstance(ret, bool):
+            return ret
+        return str(ret).strip().lower() in ("1", "yes", "true", "on")
@@ -3,7 +3,6 @@ import traceback
 import logging
 from datetime import datetime
 from pytz import timezone as tz
-from copy import deepcopy
 
 from .models import (
     Topic,
@@ -13,21 +12,27 @@ from .models import (
 )
 from .datastore import (
     ConnectionProvider,
+    PooledConnectionProvider,
     ContextStore,
+    CachedContextStore,
+    BufferedMessageLogStore,
+    PartitionedMessageLogStore,
     UserStore,
     MessageLogStore,
     SQLiteConnectionProvider,
     SQLiteContextStore,
     SQLiteUserStore,
-    SQLiteMessageLogStore
+    SQLiteMessageLogStore,
+    UnitOfWork
 )
 from .config import Config
+from .serializer import dumps, loads
 from .dialog import (
     DialogService,
     DialogRouter,
     DependencyContainer
 )
-from .tagger import Tagger
+from .tagger import Tagger, CachedTagger
 
 
 class Minette:
@@ -57,6 +62,11 @@ class Minette:
         then returns proper DialogService for intent
     tagger: Tagger
         Morphological analysis engine
+    unit_of_work : bool
+        Commit all changes in a turn at once
+    messagelog_failure : str
+        Policy for the changes in a turn when message log fails
+        in unit of work mode. "commit" or "rollback"
     """
 
     def __init__(self, *, config=None, config_file=None, timezone=None,
@@ -67,7 +77,11 @@ class Minette:
                  user_store=None, user_table=None,
                  messagelog_store=None, messagelog_table=None,
                  default_dialog_service=None, dialog_router=None,
-                 tagger=None, tagger_max_length=None, prepare_table=True, **kwargs):
+                 tagger=None, tagger_max_length=None, prepare_table=True,
+                 unit_of_work=None, messagelog_failure=None,
+                 connection_pool_size=None, tagger_cache_size=None,
+                 context_cache_size=None, messagelog_queue_size=None,
+                 messagelog_partition=None, **kwargs):
         """
         Parameters
         ----------
@@ -130,6 +144,40 @@ class Minette:
             Morphological analysis engine
         prepare_table: bool, default True
             Create tables for data stores if they don't exist.
+        unit_of_work: bool, default None
+            Commit all changes of data stores in a turn at once
+            instead of committing at each store. Use `unit_of_work`
+            in configuration file or `False` by default.
+        messagelog_failure: str, default None
+            What to do with the changes in a turn when writing message log
+            fails in unit of work mode. `commit` keeps context and user
+            and `rollback` discards them all. Use `messagelog_failure`
+            in configuration file or `commit` by default.
+        connection_pool_size: int, default None
+            Max number of connections pooled and reused across turns.
+            Use `connection_pool_size` in configuration file or no pooling
+            by default. Pass `PooledConnectionProvider` as
+            `connection_provider` to configure the pool in detail.
+        tagger_cache_size: int, default None
+            Max number of texts whose parsed words are cached.
+            Use `tagger_cache_size` in configuration file or no cache
+            by default.
+        context_cache_size: int, default None
+            Max number of contexts cached in this process.
+            Use `context_cache_size` in configuration file or no cache
+            by default. Pass `CachedContextStore` as `context_store`
+            to configure the cache in detail.
+        messagelog_queue_size: int, default None
+            Max number of message logs queued to write them in batches
+            at the background thread. Use `messagelog_queue_size` in
+            configuration file or writing at each turn by default.
+            Pass `BufferedMessageLogStore` as `messagelog_store`
+            to configure the queue in detail.
+        messagelog_partition: str, default None
+            Write message logs to the table of each period, "daily" or
+            "monthly". Use `messagelog_partition` in configuration file
+            or single table by default. Only the message log stores of
+            SQLiteStores, MySQLStores and SQLDBStores are supported.
         """
         # setup essensial members for other members
         if config:
@@ -142,7 +190,8 @@ class Minette:
         self.connection_provider = self._get_connection_provider(
             connection_provider or (
                 data_stores.connection_provider if data_stores else None),
-            connection_str=connection_str, **kwargs)
+            connection_str=connection_str,
+            connection_pool_size=connection_pool_size, **kwargs)
 
         # make arguments dict
         setter_args = {
@@ -164,6 +213,10 @@ class Minette:
             "default_dialog_service": default_dialog_service,
             "tagger": tagger,
             "tagger_max_length": tagger_max_length,
+            "tagger_cache_size": tagger_cache_size,
+            "context_cache_size": context_cache_size,
+            "messagelog_queue_size": messagelog_queue_size,
+            "messagelog_partition": messagelog_partition,
         }
         setter_args.update({k: v for k, v in kwargs.items() if k not in setter_args})
 
@@ -174,6 +227,10 @@ class Minette:
         self.default_dialog_service = default_dialog_service
         self.dialog_router = self._get_dialog_router(**setter_args)
         self.tagger = self._get_tagger(**setter_args)
+        self.unit_of_work = unit_of_work if unit_of_work is not None \
+            else self.config.getboolean("unit_of_work")
+        self.messagelog_failure = messagelog_failure or \
+            self.config.get("messagelog_failure") or "commit"
 
         # prepare tables
         if prepare_table is True:
@@ -182,8 +239,7 @@ class Minette:
             self.context_store.prepare_table(connection, prepare_params)
             self.user_store.prepare_table(connection, prepare_params)
             self.messagelog_store.prepare_table(connection, prepare_params)
-            if hasattr(connection, "close"):
-                connection.close()
+            self.connection_provider.release_connection(connection)
 
     def _get_logger(self, logger, log_file=None, logger_name=None):
         lg = logger
@@ -215,32 +271,44 @@ class Minette:
         return lg
 
     def _get_connection_provider(self, connection_provider,
-                                 connection_str=None, **kwargs):
+                                 connection_str=None,
+                                 connection_pool_size=None, **kwargs):
         cp = connection_provider or SQLiteConnectionProvider
-        if issubclass(cp, ConnectionProvider):
+        if isinstance(cp, type) and issubclass(cp, ConnectionProvider):
             cp = cp(
                 connection_str=connection_str or
                 self.config.get("connection_str") or "minette.db",
                 **kwargs
             )
+        pool_size = connection_pool_size or \
+            int(self.config.get("connection_pool_size") or 0)
+        if pool_size and not isinstance(cp, PooledConnectionProvider):
+            cp = PooledConnectionProvider(cp, max_size=pool_size)
         return cp
 
     def _get_context_store(self, context_store, context_table=None,
-                           context_timeout=None, **kwargs):
+                           context_timeout=None, context_cache_size=None,
+                           connection_provider=None, **kwargs):
         ss = context_store or SQLiteContextStore
-        if issubclass(ss, ContextStore):
+        if isinstance(ss, type) and issubclass(ss, ContextStore):
             ss = ss(
                 table_name=context_table or
                 self.config.get("context_table") or "context",
                 timeout=context_timeout or
                 self.config.get("context_timeout") or 300,
-                **kwargs
+                connection_provider=connection_provider, **kwargs
             )
+        cache_size = context_cache_size or \
+            int(self.config.get("context_cache_size") or 0)
+        if cache_size and not isinstance(ss, CachedContextStore):
+            ss = CachedContextStore(
+                ss, cache_size=cache_size,
+                connection_provider=connection_provider)
         return ss
 
     def _get_user_store(self, user_store, user_table=None, **kwargs):
         us = user_store or SQLiteUserStore
-        if issubclass(us, UserStore):
+        if isinstance(us, type) and issubclass(us, UserStore):
             us = us(
                 table_name=user_table or
                 self.config.get("user_table") or "user",
@@ -249,30 +317,48 @@ class Minette:
         return us
 
     def _get_messagelog_store(self, messagelog_store, messagelog_table=None,
-                              **kwargs):
+                              messagelog_queue_size=None,
+                              messagelog_partition=None,
+                              connection_provider=None, **kwargs):
         ms = messagelog_store or SQLiteMessageLogStore
-        if issubclass(ms, MessageLogStore):
+        if isinstance(ms, type) and issubclass(ms, MessageLogStore):
             ms = ms(
                 table_name=messagelog_table or
                 self.config.get("messagelog_table") or "messagelog",
-                **kwargs
+                connection_provider=connection_provider, **kwargs
             )
+        partition = messagelog_partition or \
+            self.config.get("messagelog_partition")
+        if partition and not isinstance(
+                ms, (PartitionedMessageLogStore, BufferedMessageLogStore)):
+            ms = PartitionedMessageLogStore(ms, period=partition)
+        queue_size = messagelog_queue_size or \
+            int(self.config.get("messagelog_queue_size") or 0)
+        if queue_size and not isinstance(ms, BufferedMessageLogStore):
+            ms = BufferedMessageLogStore(
+                ms, connection_provider or self.connection_provider,
+                queue_size=queue_size)
         return ms
 
     def _get_dialog_router(self, dialog_router, default_dialog_service=None,
                            **kwargs):
         dr = dialog_router or DialogRouter
-        if issubclass(dr, DialogRouter):
+        if isinstance(dr, type) and issubclass(dr, DialogRouter):
             dr = dr(default_dialog_service=default_dialog_service, **kwargs)
         return dr
 
-    def _get_tagger(self, tagger, tagger_max_length, **kwargs):
+    def _get_tagger(self, tagger, tagger_max_length, tagger_cache_size=None,
+                    **kwargs):
         tg = tagger or Tagger
-        if issubclass(tg, Tagger):
+        if isinstance(tg, type) and issubclass(tg, Tagger):
             if tagger_max_length is not None:
                 tg = tg(max_length=tagger_max_length, **kwargs)
             else:
                 tg = tg(**kwargs)
+        cache_size = tagger_cache_size or \
+            int(self.config.get("tagger_cache_size") or 0)
+        if cache_size and not isinstance(tg, CachedTagger):
+            tg = CachedTagger(tg, cache_size=cache_size)
         return tg
 
     def chat(self, request):
@@ -304,10 +390,11 @@ class Minette:
                 request = Message(text=request, timestamp=datetime.now(self.timezone))
             # connection
             connection = self.connection_provider.get_connection()
+            if self.unit_of_work:
+                connection = UnitOfWork(connection)
             performance.append("connection_provider.get_connection")
-            # tagger
-            request.words = self.tagger.parse(request.text)
-            performance.append("tagger.parse")
+            # tagger (parse when words are used)
+            self._set_words_parser(request, performance)
             # user
             request.user = self._get_user(request, connection)
             performance.append("get_user")
@@ -335,51 +422,325 @@ class Minette:
                 "Error occured in chat: "
                 + str(ex) + "\n" + traceback.format_exc())
             response = Response()
+            # discard the changes in the turn failed
+            if isinstance(connection, UnitOfWork):
+                self._rollback_unit_of_work(connection)
         finally:
             # set performance info to response
             response.performance = performance
             if connection:
                 # message log
+                messagelog_saved = True
                 try:
                     self.messagelog_store.save(
                         request, response, context, connection)
                 except Exception as ex:
+                    messagelog_saved = False
                     self.logger.error(
                         "Error occured in logging message: "
                         + str(ex) + "\n" + traceback.format_exc())
-                # close connection
-                if hasattr(connection, "close"):
-                    connection.close()
+                # commit all changes in this turn
+                if isinstance(connection, UnitOfWork):
+                    self._complete_unit_of_work(connection, messagelog_saved)
+                    connection = connection.connection
+                # return connection to the provider
+                if connection is not None:
+                    self.connection_provider.release_connection(connection)
         return response
 
-    def _get_user(self, request, connection):
+    async def chat_async(self, request):
+        """
+        Get response from chatbot without blocking the event loop
+
+        Examples
+        --------
+        >>> from minette import *
+        >>> bot = Minette(defautl_dialog_service=EchoDialogService)
+        >>> response = await bot.chat_async("hello")
+        >>> response.messages[0].text
+        "You said: hello"
+
+        Parameters
+        ----------
+        request : minette.Message or str
+            Message to chatbot
+
+        Returns
+        -------
+        response : minette.Response
+            Response from chatbot
+        """
+        connection = None
+        try:
+            performance = PerformanceInfo()
+            if isinstance(request, str):
+                request = Message(text=request, timestamp=datetime.now(self.timezone))
+            # connection
+            connection = await self.connection_provider.get_connection_async()
+            if self.unit_of_work:
+                connection = UnitOfWork(connection)
+            performance.append("connection_provider.get_connection")
+            # tagger (parse in executor not to block the event loop)
+            request.words = await self.tagger.parse_async(request.text)
+            performance.append("tagger.parse")
+            # user
+            request.user = await self._get_user_async(request, connection)
+            performance.append("get_user")
+            # context
+            context = await self._get_context_async(request, connection)
+            performance.append("get_context")
+            # route dialog
+            dialog_service = await self.dialog_router.execute_async(
+                request=request, context=context,
+                connection=connection, performance=performance)
+            performance.append("dialog_router.execute")
+            # process dialog
+            response = await dialog_service.execute_async(
+                request=request, context=context,
+                connection=connection, performance=performance)
+            performance.append("dialog_service.execute")
+            # save context
+            context = await self._save_context_async(context, connection)
+            performance.append("save_context")
+            # save user
+            await self._save_user_async(request.user, connection)
+            performance.append("save_user")
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in chat: "
+                + str(ex) + "\n" + traceback.format_exc())
+            response = Response()
+            # discard the changes in the turn failed
+            if isinstance(connection, UnitOfWork):
+                self._rollback_unit_of_work(connection)
+        finally:
+            # set performance info to response
+            response.performance = performance
+            if connection:
+                # message log
+                messagelog_saved = True
+                try:
+                    await self.messagelog_store.save_async(
+                        request, response, context, connection)
+                except Exception as ex:
+                    messagelog_saved = False
+                    self.logger.error(
+                        "Error occured in logging message: "
+                        + str(ex) + "\n" + traceback.format_exc())
+                # commit all changes in this turn
+                if isinstance(connection, UnitOfWork):
+                    self._complete_unit_of_work(connection, messagelog_saved)
+                    connection = connection.connection
+                # return connection to the provider
+                if connection is not None:
+                    self.connection_provider.release_connection(connection)
+        return response
+
+    def chat_batch(self, requests):
+        """
+        Get responses for many messages at once.
+        Users and contexts are read and written with bulk queries
+        and all changes are committed at once.
+        Messages from the same user are processed in the order of input.
+
+        Examples
+        --------
+        >>> from minette import *
+        >>> bot = Minette(defautl_dialog_service=EchoDialogService)
+        >>> responses = bot.chat_batch(["hello", "world"])
+        >>> [r.messages[0].text for r in responses]
+        ["You said: hello", "You said: world"]
+
+        Parameters
+        ----------
+        requests : list of minette.Message or str
+            Messages to chatbot
+
+        Returns
+        -------
+        responses : list of minette.Response
+            Responses from chatbot in the order of requests
+        """
+        requests = [
+            Message(text=r, timestamp=datetime.now(self.timezone))
+            if isinstance(r, str) else r for r in requests]
+        responses = [Response() for _ in requests]
+        logs = []
+        connection = None
+        try:
+            # connection
+            connection = self.connection_provider.get_connection()
+            # prefetch users and contexts
+            users = self.user_store.get_many(
+                [self._get_user_key(r) for r in requests], connection)
+            contexts = self.context_store.get_many(
+                [self._get_context_key(r) for r in requests], connection)
+            # process messages in order
+            for i, request in enumerate(requests):
+                performance = PerformanceInfo()
+                try:
+                    # tagger (parse when words are used)
+                    self._set_words_parser(request, performance)
+                    # user
+                    request.user = users[self._get_user_key(request)]
+                    performance.append("get_user")
+                    # context (get again if previous turn failed)
+                    context_key = self._get_context_key(request)
+                    context = contexts.pop(context_key, None) or \
+                        self.context_store.get(*context_key, connection)
+                    performance.append("get_context")
+                    # route dialog
+                    dialog_service = self.dialog_router.execute(
+                        request=request, context=context,
+                        connection=connection, performance=performance)
+                    performance.append("dialog_router.execute")
+                    # process dialog
+                    responses[i] = dialog_service.execute(
+                        request=request, context=context,
+                        connection=connection, performance=performance)
+                    performance.append("dialog_service.execute")
+                    # reset context and keep it for the next message
+                    context_for_log = context.snapshot()
+                    context.reset(self.config.get("keep_context_data", False))
+                    contexts[context_key] = self._renew_context(context)
+                    performance.append("save_context")
+                    logs.append((request, responses[i], context_for_log))
+                except Exception as ex:
+                    self.logger.error(
+                        "Error occured in chat: "
+                        + str(ex) + "\n" + traceback.format_exc())
+                    responses[i] = Response()
+                responses[i].performance = performance
+            # write back
+            self.context_store.save_many(contexts.values(), connection)
+            self.user_store.save_many(
+                [u for u in users.values() if self.user_store.should_save(u)],
+                connection)
+            messagelog_saved = True
+            try:
+                self.messagelog_store.save_many(logs, connection)
+            except Exception as ex:
+                messagelog_saved = False
+                self.logger.error(
+                    "Error occured in logging messages: "
+                    + str(ex) + "\n" + traceback.format_exc())
+            # commit all changes in this batch
+            unit_of_work = UnitOfWork(connection)
+            unit_of_work.has_changes = True
+            self._complete_unit_of_work(unit_of_work, messagelog_saved)
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in chat_batch: "
+                + str(ex) + "\n" + traceback.format_exc())
+            if hasattr(connection, "rollback"):
+                connection.rollback()
+        finally:
+            # return connection to the provider
+            if connection is not None:
+                self.connection_provider.release_connection(connection)
+        return responses
+
+    def _set_words_parser(self, request, performance):
+        tagger = self.tagger
+        text = request.text
+
+        def parse():
+            words = tagger.parse(text)
+            performance.append("tagger.parse")
+            return words
+
+        request.set_words_parser(parse)
+
+    def _rollback_unit_of_work(self, unit_of_work):
+        try:
+            unit_of_work.rollback()
+            self.logger.warning(
+                "Changes in this turn are rolled back because of the error")
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in rolling back changes: "
+                + str(ex) + "\n" + traceback.format_exc())
+
+    def _complete_unit_of_work(self, unit_of_work, messagelog_saved=True):
+        try:
+            if not messagelog_saved and self.messagelog_failure == "rollback":
+                unit_of_work.rollback()
+                self.logger.warning(
+                    "Changes in this turn are rolled back "
+                    "because message log is not saved")
+            else:
+                unit_of_work.complete()
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in committing changes: "
+                + str(ex) + "\n" + traceback.format_exc())
+            unit_of_work.rollback()
+
+    def _renew_context(self, context):
+        # make context as if it is restored from the store at the next turn
+        renewed = type(context)(context.channel, context.channel_user_id)
+        renewed.timestamp = datetime.now(self.timezone)
+        if not context.channel_user_id:
+            return renewed
+        renewed.topic.name = context.topic.name
+        renewed.topic.status = context.topic.status
+        renewed.topic.priority = context.topic.priority
+        renewed.topic.previous = context.topic.previous
+        # don't share data with the snapshot for message log
+        renewed.data = loads(dumps(context.data)) if context.data else {}
+        renewed.is_new = False
+        return renewed
+
+    def _get_user_key(self, request):
         user_scope = request.channel
         if self.config.get("user_scope") == "channel_detail":
             user_scope += "_" + request.channel_detail
-        return self.user_store.get(
-            user_scope, request.channel_user_id, connection)
+        return user_scope, request.channel_user_id
+
+    def _get_user(self, request, connection):
+        return self.user_store.get(*self._get_user_key(request), connection)
+
+    async def _get_user_async(self, request, connection):
+        return await self.user_store.get_async(
+            *self._get_user_key(request), connection)
 
     def _save_user(self, user, connection):
-        self.user_store.save(user, connection)
+        if self.user_store.should_save(user):
+            self.user_store.save(user, connection)
 
-    def _get_context(self, request, connection):
+    async def _save_user_async(self, user, connection):
+        if self.user_store.should_save(user):
+            await self.user_store.save_async(user, connection)
+
+    def _get_context_key(self, request):
         context_scope = request.channel
         if self.config.get("context_scope") == "channel_detail":
             context_scope += "_" + request.channel_detail
         if request.group:
-            context = self.context_store.get(
-                context_scope, request.group.id, connection)
+            return context_scope, request.group.id
         else:
-            context = self.context_store.get(
-                context_scope, request.channel_user_id, connection)
-        return context
+            return context_scope, request.channel_user_id
+
+    def _get_context(self, request, connection):
+        return self.context_store.get(
+            *self._get_context_key(request), connection)
+
+    async def _get_context_async(self, request, connection):
+        return await self.context_store.get_async(
+            *self._get_context_key(request), connection)
 
     def _save_context(self, context, connection):
-        context_for_log = deepcopy(context)
+        context_for_log = context.snapshot()
         context.reset(self.config.get("keep_context_data", False))
         self.context_store.save(context, connection)
         return context_for_log
 
+    async def _save_context_async(self, context, connection):
+        context_for_log = context.snapshot()
+        context.reset(self.config.get("keep_context_data", False))
+        await self.context_store.save_async(context, connection)
+        return context_for_log
+
     def dialog_uses(self, dependency_rules=None, **defaults):
         """
         Set dependency components for DialogServices/Router
@@ -414,3 +775,4 @@ class Minette:
         self.dialog_router.default_dependencies = defaults
         self.dialog_router.dependencies = DependencyContainer(
             self.dialog_router, dependency_rules, **defaults)
+        self.dialog_router.prepare_dependencies()
@@ -1,8 +1,12 @@
-from .connectionprovider import ConnectionProvider
+from .connectionprovider import ConnectionProvider, PooledConnectionProvider
 from .contextstore import ContextStore
+from .cachedcontextstore import CachedContextStore
 from .userstore import UserStore
 from .messagelogstore import MessageLogStore
+from .bufferedmessagelogstore import BufferedMessageLogStore
+from .partitionedmessagelogstore import PartitionedMessageLogStore
 from .storeset import StoreSet
+from .unitofwork import UnitOfWork
 
 from .sqlitestores import (
     SQLiteConnectionProvider,
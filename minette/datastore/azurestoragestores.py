@@ -108,8 +108,13 @@ class AzureTableContextStore(ContextStore):
             row = connection.get_entity(self.table_name, channel, channel_user_id)
             if row is not None:
                 # convert type
-                row["topic_previous"] = loads(row["topic_previous"])
-                row["data"] = loads(row["data"])
+                row["topic_previous"] = loads(
+                    row["topic_previous"],
+                    datetime_decoding=self.datetime_decoding,
+                    codec=self.codec)
+                row["data"] = loads(
+                    row["data"], datetime_decoding=self.datetime_decoding,
+                    codec=self.codec)
                 # check context timeout. AzureTableStorage always returns timestamp with UTC timezone
                 last_access = row["local_timestamp"].astimezone(self.timezone)
                 if (datetime.now(self.timezone) - last_access).total_seconds() <= self.timeout:
@@ -139,8 +144,11 @@ class AzureTableContextStore(ContextStore):
             return
         # serialize some elements
         context_dict = context.to_dict()
-        serialized_previous_topic = dumps(context_dict["topic"]["previous"])
-        serialized_data = dumps(context_dict["data"])
+        # previous topic is small and its column is short. not compressed
+        serialized_previous_topic = dumps(
+            context_dict["topic"]["previous"], codec=self.codec)
+        serialized_data = dumps(
+            context_dict["data"], codec=self.codec, compressor=self.compressor)
         # save
         entity = {
             "PartitionKey": context.channel,
@@ -209,13 +217,16 @@ class AzureTableUserStore(UserStore):
         try:
             row = connection.get_entity(self.table_name, channel, channel_user_id)
             # convert type
-            row["data"] = loads(row["data"])
+            row["data"] = loads(
+                row["data"], datetime_decoding=self.datetime_decoding,
+                codec=self.codec)
             # restore user
             user.id = row["user_id"]
             user.name = row["name"]
             user.nickname = row["nickname"]
             user.profile_image_url = row["profile_image_url"]
             user.data = row["data"] if row["data"] else {}
+            user.mark_saved(self._to_local_time(row.get("local_timestamp")))
 
         except AzureMissingResourceHttpError as amrherr:
             # add new user if user is not found
@@ -231,6 +242,7 @@ class AzureTableUserStore(UserStore):
                     "data": dumps({})
                 }
                 connection.insert_entity(self.table_name, entity)
+                user.mark_saved(entity["local_timestamp"])
             else:
                 self.logger.error("Resouce is missing on Azure Table: " + str(amrherr) + "\n" + traceback.format_exc())
 
@@ -251,7 +263,8 @@ class AzureTableUserStore(UserStore):
             Connection
         """
         user_dict = user.to_dict()
-        serialized_data = dumps(user_dict["data"])
+        serialized_data = dumps(
+            user_dict["data"], codec=self.codec, compressor=self.compressor)
         entity = {
             "PartitionKey": user.channel,
             "RowKey": user.channel_user_id,
@@ -263,6 +276,7 @@ class AzureTableUserStore(UserStore):
             "data": serialized_data
         }
         connection.insert_or_replace_entity(self.table_name, entity)
+        user.mark_saved(entity["local_timestamp"])
 
 
 class AzureTableMessageLogStore(MessageLogStore):
@@ -312,16 +326,79 @@ class AzureTableMessageLogStore(MessageLogStore):
         connection : Connection
             Connection
         """
-        epoch_max = datetime(MAXYEAR, 12, 31, 23, 59, 59, 999999, timezone.utc).timestamp()
-        entity = self._flatten(request, response, context)
-        entity["PartitionKey"] = request.channel_user_id
-        entity["RowKey"] = str(epoch_max - time())
-        entity["request_json"] = request.to_json()
-        entity["response_json"] = response.to_json()
-        entity["context_json"] = context.to_json()
+        entity = self._to_entity(
+            self._serialize(request, response, context))
         connection.insert_entity(self.table_name, entity)
         return entity["RowKey"]
 
+    def save_records(self, records, connection):
+        """
+        Write many message logs already serialized by `_serialize`
+
+        Parameters
+        ----------
+        records : iterable of dict
+            Values of columns of message logs
+        connection : Connection
+            Connection
+        """
+        for record in records:
+            connection.insert_entity(
+                self.table_name, self._to_entity(record))
+
+    def _to_entity(self, record):
+        epoch_max = datetime(MAXYEAR, 12, 31, 23, 59, 59, 999999, timezone.utc).timestamp()
+        entity = {k: v for k, v in record.items()
+                  if k not in self._excluded_columns}
+        entity["PartitionKey"] = record["channel_user_id"]
+        entity["RowKey"] = str(epoch_max - time())
+        return entity
+
+    def _to_row_key(self, timestamp):
+        # RowKey decreases as time goes to list the latest logs first
+        epoch_max = datetime(MAXYEAR, 12, 31, 23, 59, 59, 999999, timezone.utc).timestamp()
+        return str(epoch_max - timestamp.timestamp())
+
+    def get_history(self, channel, channel_user_id, connection, limit=10,
+                    before=None, before_id=None):
+        """
+        Get the latest message logs of the user. Logs of the user are
+        in the same partition and listed in descending order of time.
+        `before_id` is not used because the logs have no id
+
+        """
+        try:
+            query = "PartitionKey eq '{}' and channel eq '{}'".format(
+                channel_user_id.replace("'", "''"),
+                channel.replace("'", "''"))
+            if before is not None:
+                query += " and RowKey gt '{}'".format(
+                    self._to_row_key(before))
+            return list(connection.query_entities(
+                self.table_name, filter=query, num_results=limit))
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in reading message logs from Azure Table: "
+                + str(ex) + "\n" + traceback.format_exc())
+            return []
+
+    def scan(self, start, end, connection, batch_size=1000):
+        """
+        Read all message logs in the period across the partitions.
+        Logs are listed in the order of partitions, not of time, and
+        pages are read by the continuation token of Azure Table
+
+        """
+        query = "RowKey gt '{}' and RowKey le '{}'".format(
+            self._to_row_key(end), self._to_row_key(start))
+        try:
+            yield from connection.query_entities(
+                self.table_name, filter=query)
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in reading message logs from Azure Table: "
+                + str(ex) + "\n" + traceback.format_exc())
+
 
 class AzureTableStores(StoreSet):
     connection_provider = AzureTableConnectionProvider
@@ -0,0 +1,335 @@
+""" Write-behind queue of message logs for any MessageLogStore """
+import atexit
+from collections import deque
+import threading
+import time
+import traceback
+
+from .messagelogstore import MessageLogStore
+
+
+class BufferedMessageLogStore(MessageLogStore):
+    """
+    MessageLogStore that queues message logs and writes them to the other
+    store in batches at the background thread, to take logging out of
+    the response time.
+
+    Logs are serialized when queued, and written with one statement and one
+    commit per batch. The logs queued are written at `close()`, that is
+    called at exit of the process. Note that the logs are written out of
+    the unit of work of the turn, so `messagelog_failure` doesn't apply.
+
+    A batch failed to write is retried once after `flush_interval` and
+    dropped if it fails again, so logs may be lost while the database is
+    unavailable. Logs queued are also lost when the process is killed
+    without `close()`.
+
+    Attributes
+    ----------
+    store : minette.MessageLogStore
+        MessageLogStore to write message logs
+    connection_provider : minette.ConnectionProvider
+        Connection provider for the background thread
+    queue_size : int
+        Max number of logs queued
+    batch_size : int
+        Max number of logs written at once
+    flush_interval : float
+        Max seconds to wait for logs to make a batch
+    overflow : str
+        What to do when the queue is full. "block" waits for space,
+        "drop_new" drops the log to queue and "drop_old" drops the oldest
+        log in queue
+    block_timeout : float
+        Max seconds to wait for space in "block" mode. The log is dropped
+        when timed out. None to wait forever
+    config : minette.Config
+        Configuration
+    timezone : pytz.timezone
+        Timezone
+    logger : logging.Logger
+        Logger
+    """
+    DEFAULT_QUEUE_SIZE = 10000
+    DEFAULT_BATCH_SIZE = 500
+    DEFAULT_FLUSH_INTERVAL = 1.0
+    OVERFLOW_POLICIES = ("block", "drop_new", "drop_old")
+
+    def __init__(self, store, connection_provider, queue_size=None,
+                 batch_size=None, flush_interval=None, overflow=None,
+                 block_timeout=1.0, **kwargs):
+        """
+        Parameters
+        ----------
+        store : minette.MessageLogStore
+            MessageLogStore to write message logs
+        connection_provider : minette.ConnectionProvider
+            Connection provider for the background thread
+        queue_size : int, default None
+            Max number of logs queued. Use `messagelog_queue_size` in
+            configuration file or 10000 by default
+        batch_size : int, default None
+            Max number of logs written at once. Use `messagelog_batch_size`
+            in configuration file or 500 by default
+        flush_interval : float, default None
+            Max seconds to wait for logs to make a batch.
+            Use `messagelog_flush_interval` in configuration file or
+            1.0 by default
+        overflow : str, default None
+            What to do when the queue is full. "block", "drop_new" or
+            "drop_old". Use `messagelog_overflow` in configuration file
+            or "block" by default
+        block_timeout : float, default 1.0
+            Max seconds to wait for space in "block" mode.
+            None to wait forever
+        """
+        self.store = store
+        config = store.config
+        super().__init__(
+            config=config, timezone=store.timezone, logger=store.logger,
+            table_name=store.table_name, codec=store.codec)
+        self.connection_provider = connection_provider
+        self.queue_size = queue_size or \
+            int(config.get("messagelog_queue_size") or 0 if config else 0) or \
+            self.DEFAULT_QUEUE_SIZE
+        self.batch_size = batch_size or \
+            int(config.get("messagelog_batch_size") or 0 if config else 0) or \
+            self.DEFAULT_BATCH_SIZE
+        self.batch_size = min(self.batch_size, self.queue_size)
+        self.flush_interval = flush_interval or \
+            float(config.get("messagelog_flush_interval") or 0
+                  if config else 0) or \
+            self.DEFAULT_FLUSH_INTERVAL
+        self.overflow = overflow or \
+            (config.get("messagelog_overflow") if config else None) or "block"
+        if self.overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(
+                "overflow must be one of {}: {}".format(
+                    self.OVERFLOW_POLICIES, self.overflow))
+        self.block_timeout = block_timeout
+        self._queue = deque()
+        self._writing = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._flush_requested = False
+        self._counters = {
+            "queued": 0, "written": 0, "dropped": 0, "failed": 0,
+            "retried": 0, "batches": 0, "blocked": 0}
+        self._thread = threading.Thread(
+            target=self._run, name="MessageLogWriterThread", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def get_sqls(self):
+        return self.store.sqls
+
+    def prepare_table(self, connection, prepare_params=None):
+        return self.store.prepare_table(connection, prepare_params)
+
+    def prepare_index(self, connection):
+        return self.store.prepare_index(connection)
+
+    def get_history(self, channel, channel_user_id, connection, limit=10,
+                    before=None, before_id=None):
+        """
+        Get the latest message logs of the user from store.
+        Logs still in queue are not included
+
+        """
+        return self.store.get_history(
+            channel, channel_user_id, connection, limit=limit, before=before,
+            before_id=before_id)
+
+    def scan(self, start, end, connection, batch_size=1000):
+        return self.store.scan(start, end, connection, batch_size=batch_size)
+
+    def purge(self, connection, before, chunk_size=1000):
+        return self.store.purge(connection, before, chunk_size=chunk_size)
+
+    def _to_record(self, request, response, context):
+        # serialize now because the objects may be changed after the turn
+        return self.store._serialize(request, response, context)
+
+    def save(self, request, response, context, connection=None):
+        """
+        Queue message log
+
+        Parameters
+        ----------
+        request : minette.Message
+            Request to chatbot
+        response : minette.Response
+            Response from chatbot
+        context : minette.Context
+            Context
+        connection : Connection, default None
+            Not used. Logs are written with the connection of
+            `connection_provider`
+        """
+        self._enqueue([self._to_record(request, response, context)])
+
+    async def save_async(self, request, response, context, connection=None):
+        self.save(request, response, context, connection)
+
+    def save_many(self, logs, connection=None):
+        """
+        Queue many message logs
+
+        Parameters
+        ----------
+        logs : iterable of tuple
+            Tuples of request, response and context
+        connection : Connection, default None
+            Not used
+        """
+        self._enqueue([self._to_record(*log) for log in logs])
+
+    def save_records(self, records, connection=None):
+        """
+        Queue many message logs already serialized by `_serialize`
+
+        Parameters
+        ----------
+        records : iterable of dict
+            Values of columns of message logs
+        connection : Connection, default None
+            Not used
+        """
+        self._enqueue(list(records))
+
+    def _enqueue(self, records):
+        with self._condition:
+            for record in records:
+                if self._closed:
+                    self._counters["dropped"] += 1
+                    continue
+                if len(self._queue) >= self.queue_size:
+                    if self.overflow == "drop_new":
+                        self._counters["dropped"] += 1
+                        continue
+                    elif self.overflow == "drop_old":
+                        self._queue.popleft()
+                        self._counters["dropped"] += 1
+                    else:
+                        self._counters["blocked"] += 1
+                        self._condition.notify_all()
+                        if not self._condition.wait_for(
+                                lambda: len(self._queue) < self.queue_size
+                                or self._closed, self.block_timeout):
+                            self._counters["dropped"] += 1
+                            continue
+                        if self._closed:
+                            self._counters["dropped"] += 1
+                            continue
+                self._queue.append(record)
+                self._counters["queued"] += 1
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + self.flush_interval
+                # wait for the logs enough to make a batch until deadline
+                while not (self._closed or self._flush_requested) and \
+                        len(self._queue) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if not self._queue:
+                    self._flush_requested = False
+                    if self._closed:
+                        return
+                    continue
+                count = min(len(self._queue), self.batch_size)
+                batch = [self._queue.popleft() for _ in range(count)]
+                self._writing = count
+                # space for the blocked threads
+                self._condition.notify_all()
+            if not self._write(batch):
+                # retry once to survive the transient errors
+                with self._condition:
+                    self._counters["retried"] += len(batch)
+                    self._condition.wait_for(
+                        lambda: self._closed, self.flush_interval)
+                if not self._write(batch):
+                    with self._condition:
+                        self._counters["failed"] += len(batch)
+            with self._condition:
+                self._writing = 0
+                self._condition.notify_all()
+
+    def _write(self, batch):
+        connection = None
+        try:
+            connection = self.connection_provider.get_connection()
+            self.store.save_records(batch, connection)
+            # Azure Table has no transaction
+            if hasattr(connection, "commit"):
+                connection.commit()
+            with self._condition:
+                self._counters["written"] += len(batch)
+                self._counters["batches"] += 1
+            return True
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in writing message logs: "
+                + str(ex) + "\n" + traceback.format_exc())
+            if hasattr(connection, "rollback"):
+                connection.rollback()
+            return False
+        finally:
+            if connection is not None:
+                self.connection_provider.release_connection(connection)
+
+    def flush(self, timeout=None):
+        """
+        Wait until the logs queued are written
+
+        Parameters
+        ----------
+        timeout : float, default None
+            Max seconds to wait. None to wait forever
+
+        Returns
+        -------
+        flushed : bool
+            False if timed out
+        """
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(
+                lambda: not self._queue and not self._writing
+                or not self._thread.is_alive(), timeout)
+
+    def close(self, timeout=None):
+        """
+        Write the logs queued and stop the background thread.
+        Logs queued after closing are dropped
+
+        Parameters
+        ----------
+        timeout : float, default None
+            Max seconds to wait. None to wait forever
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def stats(self):
+        """
+        Get metrics of the queue
+
+        Returns
+        -------
+        stats : dict
+            Number of logs queued now and counters
+        """
+        with self._condition:
+            stats = {"size": len(self._queue) + self._writing}
+            stats.update(self._counters)
+        return stats
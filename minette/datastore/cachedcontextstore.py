@@ -0,0 +1,438 @@
+""" In-process LRU cache of contexts for any ContextStore """
+import atexit
+from collections import OrderedDict
+import threading
+import time
+import traceback
+from datetime import datetime
+
+from ..serializer import dumps, loads
+from ..models import Context, Topic
+from .contextstore import ContextStore
+from .unitofwork import UnitOfWork
+
+
+class CachedContextStore(ContextStore):
+    """
+    ContextStore that caches the contexts saved by this process and serves
+    them without reading the other store until they time out.
+
+    Contexts are cached when they are saved, so use this store when the
+    messages from the same user are processed by the same process
+    (e.g. single process or sticky routing). Otherwise the context updated
+    by other processes will be overwritten by the cached one.
+
+    In write-behind mode the contexts not flushed are lost when the process
+    exits without `close()`. Pass `connection_provider` to flush them at
+    the background thread every `flush_interval` and at exit of the process.
+
+    Attributes
+    ----------
+    store : minette.ContextStore
+        ContextStore to read/write contexts
+    cache_size : int
+        Max number of contexts cached
+    write_behind : bool
+        Save contexts to `store` at `flush()` instead of every `save()`
+    flush_interval : float
+        Seconds to flush contexts automatically in write-behind mode
+    connection_provider : minette.ConnectionProvider
+        Connection provider for the background thread
+    config : minette.Config
+        Configuration
+    timezone : pytz.timezone
+        Timezone
+    logger : logging.Logger
+        Logger
+    timeout : int
+        Context timeout (Seconds). Same as `store`
+    """
+    DEFAULT_CACHE_SIZE = 10000
+    DEFAULT_FLUSH_INTERVAL = 10
+
+    def __init__(self, store, cache_size=None, write_behind=None,
+                 flush_interval=None, connection_provider=None, **kwargs):
+        """
+        Parameters
+        ----------
+        store : minette.ContextStore
+            ContextStore to read/write contexts
+        cache_size : int, default None
+            Max number of contexts cached. Use `context_cache_size` in
+            configuration file or 10000 by default
+        write_behind : bool, default None
+            Save contexts at `flush()` instead of every `save()`.
+            Use `context_cache_write_behind` in configuration file or
+            `False` (write-through) by default
+        flush_interval : float, default None
+            Seconds to flush contexts automatically in write-behind mode.
+            Use `context_cache_flush_interval` in configuration file or
+            10 by default
+        connection_provider : minette.ConnectionProvider, default None
+            Connection provider to flush contexts at the background thread
+            in write-behind mode. If None contexts are flushed at `save()`
+        """
+        self.store = store
+        config = store.config
+        super().__init__(
+            config=config, timezone=store.timezone, logger=store.logger,
+            table_name=store.table_name, timeout=store.timeout,
+            datetime_decoding=store.datetime_decoding, codec=store.codec)
+        self.cache_size = cache_size or \
+            int(config.get("context_cache_size") or 0 if config else 0) or \
+            self.DEFAULT_CACHE_SIZE
+        if write_behind is None:
+            write_behind = config.getboolean("context_cache_write_behind") \
+                if config else False
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval or \
+            float(config.get("context_cache_flush_interval") or 0
+                  if config else 0) or \
+            self.DEFAULT_FLUSH_INTERVAL
+        self._cache = OrderedDict()
+        self._dirty = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._counters = {
+            "hits": 0, "misses": 0, "expirations": 0, "evictions": 0,
+            "writes": 0}
+        self.connection_provider = connection_provider
+        self._closed = threading.Event()
+        self._thread = None
+        if self.write_behind and connection_provider:
+            self._thread = threading.Thread(
+                target=self._run, name="ContextFlushThread", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def get_sqls(self):
+        return self.store.sqls
+
+    def prepare_table(self, connection, prepare_params=None):
+        return self.store.prepare_table(connection, prepare_params)
+
+    def get(self, channel, channel_user_id, connection):
+        """
+        Get context from cache, or from store if not cached
+
+        Parameters
+        ----------
+        channel : str
+            Channel
+        channel_user_id : str
+            Channel user ID
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        context : minette.Context
+            Context for channel and channel_user_id
+        """
+        context = self._get_cached(channel, channel_user_id)
+        if context is None:
+            context = self.store.get(channel, channel_user_id, connection)
+        return context
+
+    async def get_async(self, channel, channel_user_id, connection):
+        context = self._get_cached(channel, channel_user_id)
+        if context is None:
+            context = await self.store.get_async(
+                channel, channel_user_id, connection)
+        return context
+
+    def get_many(self, keys, connection):
+        """
+        Get contexts from cache, and the others from store at once
+
+        Parameters
+        ----------
+        keys : iterable of tuple (str, str)
+            Pairs of channel and channel_user_id
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        contexts : dict
+            Contexts keyed by (channel, channel_user_id)
+        """
+        contexts = {k: self._get_cached(*k)
+                    for k in dict.fromkeys(keys)}
+        missed = [k for k, v in contexts.items() if v is None]
+        if missed:
+            contexts.update(self.store.get_many(missed, connection))
+        return contexts
+
+    def _get_cached(self, channel, channel_user_id):
+        if not channel_user_id:
+            # not stored
+            return None
+        key = (channel, channel_user_id)
+        now = datetime.now(self.timezone)
+        with self._lock:
+            entry = self._cache.get(key) or self._dirty.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            if (now - entry[0]).total_seconds() > self.timeout:
+                # timed out in the same way as the store. return new context
+                # without reading store because it has the same or older one
+                self._cache.pop(key, None)
+                self._dirty.pop(key, None)
+                self._counters["expirations"] += 1
+                entry = None
+            else:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                self._counters["hits"] += 1
+
+        if entry is None:
+            context = Context(channel, channel_user_id)
+            context.timestamp = now
+            return context
+        return self._to_context(key, entry, now)
+
+    def _to_context(self, key, entry, timestamp):
+        context = Context(*key)
+        context.timestamp = timestamp
+        context.topic.name, context.topic.status, \
+            context.topic.priority = entry[1:4]
+        context.topic.previous = Topic.from_dict(
+            loads(entry[4], datetime_decoding=self.datetime_decoding,
+                  codec=self.codec)) if entry[4] else None
+        context.data = loads(
+            entry[5], datetime_decoding=self.datetime_decoding,
+            codec=self.codec) if entry[5] else {}
+        context.is_new = False
+        return context
+
+    def save(self, context, connection):
+        """
+        Save context to cache, and to store in write-through mode
+
+        Parameters
+        ----------
+        context : minette.Context
+            Context to save
+        connection : Connection
+            Connection
+        """
+        if not context.channel_user_id:
+            return
+        if self.write_behind:
+            self._set_cached([context], connection)
+            self._flush_if_needed(connection)
+        else:
+            self.store.save(context, connection)
+            self._count_writes(1)
+            self._set_cached([context], connection)
+
+    async def save_async(self, context, connection):
+        if not context.channel_user_id:
+            return
+        if self.write_behind:
+            self._set_cached([context], connection)
+            self._flush_if_needed(connection)
+        else:
+            await self.store.save_async(context, connection)
+            self._count_writes(1)
+            self._set_cached([context], connection)
+
+    def save_many(self, contexts, connection):
+        """
+        Save many contexts to cache, and to store in write-through mode.
+        This method doesn't commit, so commit the connection after calling.
+
+        Parameters
+        ----------
+        contexts : iterable of minette.Context
+            Contexts to save
+        connection : Connection
+            Connection
+        """
+        contexts = [c for c in contexts if c.channel_user_id]
+        if self.write_behind:
+            self._set_cached(contexts, connection)
+            self._flush_if_needed(connection)
+        elif contexts:
+            self.store.save_many(contexts, connection)
+            self._count_writes(len(contexts))
+            self._set_cached(contexts, connection)
+
+    def _set_cached(self, contexts, connection):
+        now = datetime.now(self.timezone)
+        entries = [(
+            (c.channel, c.channel_user_id), (
+                c.timestamp or now, c.topic.name, c.topic.status,
+                c.topic.priority, dumps(c.topic.previous, codec=self.codec),
+                dumps(c.data, codec=self.codec))
+        ) for c in contexts]
+        previous = []
+        with self._lock:
+            for key, entry in entries:
+                previous.append((
+                    key, entry, self._cache.get(key), self._dirty.get(key)))
+                self._cache[key] = entry
+                self._cache.move_to_end(key)
+                if self.write_behind:
+                    self._dirty[key] = entry
+            # dirty entries are kept until flushed even if evicted
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self._counters["evictions"] += 1
+        if isinstance(connection, UnitOfWork):
+            connection.on_rollback(lambda: self._restore_cached(previous))
+
+    def _restore_cached(self, previous):
+        # put back the entries replaced in the turn rolled back.
+        # the entries changed by the other turns meanwhile are kept
+        with self._lock:
+            for key, entry, cached, dirty in reversed(previous):
+                if self._cache.get(key) is entry:
+                    if cached is None:
+                        del self._cache[key]
+                    else:
+                        self._cache[key] = cached
+                if self._dirty.get(key) is entry:
+                    if dirty is None:
+                        del self._dirty[key]
+                    else:
+                        self._dirty[key] = dirty
+
+    def _count_writes(self, count):
+        with self._lock:
+            self._counters["writes"] += count
+
+    def _flush_if_needed(self, connection):
+        # flushed by the background thread if running
+        if self._thread is None and \
+                time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush(connection)
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            self._flush_with_provider()
+
+    def _flush_with_provider(self):
+        connection = None
+        try:
+            connection = self.connection_provider.get_connection()
+            return self.flush(connection)
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in flushing contexts to database: "
+                + str(ex) + "\n" + traceback.format_exc())
+            return 0
+        finally:
+            if connection is not None:
+                self.connection_provider.release_connection(connection)
+
+    def flush(self, connection):
+        """
+        Save the contexts cached but not saved to store yet
+        in write-behind mode. When flushed in the unit of work of the turn,
+        the contexts are queued again if the turn is rolled back
+
+        Parameters
+        ----------
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        count : int
+            Number of contexts saved
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, OrderedDict()
+            self._last_flush = time.monotonic()
+        if not dirty:
+            return 0
+        contexts = [self._to_context(key, entry, entry[0])
+                    for key, entry in dirty.items()]
+        try:
+            self.store.save_many(contexts, connection)
+            connection.commit()
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in flushing contexts to database: "
+                + str(ex) + "\n" + traceback.format_exc())
+            self._requeue(dirty)
+            return 0
+        if isinstance(connection, UnitOfWork):
+            connection.on_rollback(lambda: self._requeue(dirty))
+        self._count_writes(len(contexts))
+        return len(contexts)
+
+    def _requeue(self, dirty):
+        # keep them to retry unless saved again meanwhile
+        with self._lock:
+            for key, entry in dirty.items():
+                self._dirty.setdefault(key, entry)
+
+    def close(self, connection=None):
+        """
+        Stop the background thread and flush the contexts not saved yet.
+        Called at exit of the process when `connection_provider` is set
+
+        Parameters
+        ----------
+        connection : Connection, default None
+            Connection to flush. Use `connection_provider` if None
+
+        Returns
+        -------
+        count : int
+            Number of contexts saved
+        """
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+            atexit.unregister(self.close)
+        if not self.write_behind:
+            return 0
+        if connection is not None:
+            return self.flush(connection)
+        if self.connection_provider:
+            return self._flush_with_provider()
+        return 0
+
+    def invalidate(self, keys):
+        """
+        Remove contexts from cache. The changes not flushed are discarded
+
+        Parameters
+        ----------
+        keys : iterable of tuple (str, str)
+            Pairs of channel and channel_user_id
+        """
+        with self._lock:
+            for key in keys:
+                self._cache.pop(key, None)
+                self._dirty.pop(key, None)
+
+    def clear(self):
+        """
+        Clear cache. The changes not flushed are discarded
+
+        """
+        with self._lock:
+            self._cache.clear()
+            self._dirty.clear()
+
+    def stats(self):
+        """
+        Get metrics of the cache
+
+        Returns
+        -------
+        stats : dict
+            Number of contexts cached, contexts not flushed and counters
+        """
+        with self._lock:
+            stats = {"size": len(self._cache), "dirty": len(self._dirty)}
+            stats.update(self._counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
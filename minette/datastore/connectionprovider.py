@@ -1,5 +1,9 @@
 """ Base class for ConnectionProvider """
 from abc import ABC, abstractmethod
+import threading
+import time
+
+from ..utils import run_in_executor
 
 
 class ConnectionProvider(ABC):
@@ -33,6 +37,30 @@ class ConnectionProvider(ABC):
         """
         pass
 
+    async def get_connection_async(self):
+        """
+        Get connection without blocking the event loop.
+        Override this method to use the native async driver.
+
+        Returns
+        -------
+        connection : Connection
+            Database connection
+        """
+        return await run_in_executor(self.get_connection)
+
+    def release_connection(self, connection):
+        """
+        Release connection after use. Close connection by default.
+
+        Parameters
+        ----------
+        connection : Connection
+            Database connection
+        """
+        if hasattr(connection, "close"):
+            connection.close()
+
     def get_prepare_params(self):
         """
         Get parameters for preparing tables
@@ -43,3 +71,269 @@ class ConnectionProvider(ABC):
             Parameters for preparing tables
         """
         return None
+
+
+class PooledConnectionProvider(ConnectionProvider):
+    """
+    Connection provider that reuses the connections created by
+    the other connection provider
+
+    Idle connections are checked out in LIFO order and the one released
+    at the current thread is preferred to keep the thread affinity.
+
+    Attributes
+    ----------
+    connection_provider : ConnectionProvider
+        Connection provider to create new connections
+    connection_str : str
+        Connection string
+    min_size : int
+        Number of connections created in advance and kept idle even if
+        they exceed idle timeout
+    max_size : int
+        Max number of connections including ones in use
+    idle_timeout : float
+        Seconds to close the idle connection. None to keep forever
+    health_check : bool or callable
+        Check connection on checkout. Pass function that takes connection
+        and returns bool to customize the check
+    checkout_timeout : float
+        Seconds to wait for the connection returned when the pool is full.
+        None to wait forever
+    """
+    def __init__(self, connection_provider, min_size=0, max_size=10,
+                 idle_timeout=300, health_check=True, checkout_timeout=None):
+        """
+        Parameters
+        ----------
+        connection_provider : ConnectionProvider
+            Connection provider to create new connections
+        min_size : int, default 0
+            Number of connections created in advance and kept idle even if
+            they exceed idle timeout
+        max_size : int, default 10
+            Max number of connections including ones in use
+        idle_timeout : float, default 300
+            Seconds to close the idle connection. None to keep forever
+        health_check : bool or callable, default True
+            Check connection on checkout. Pass function that takes
+            connection and returns bool to customize the check
+        checkout_timeout : float, default None
+            Seconds to wait for the connection returned when the pool
+            is full. None to wait forever
+        """
+        if min_size > max_size:
+            raise ValueError(
+                "min_size must be less than or equal to max_size: {} > {}"
+                .format(min_size, max_size))
+        super().__init__(connection_provider.connection_str)
+        self.connection_provider = connection_provider
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self.checkout_timeout = checkout_timeout
+        # idle connections: list of (connection, released_at, thread_id)
+        self._idle = []
+        # connections checked out: id -> connection
+        self._in_use = {}
+        # number of connections being created out of lock
+        self._creating = 0
+        self._condition = threading.Condition()
+        self._counters = {
+            "created": 0, "reused": 0, "closed": 0,
+            "waited": 0, "timeouts": 0, "health_check_failures": 0}
+        # warm up not to create connections at the first requests
+        for _ in range(min_size):
+            self._idle.append(
+                (connection_provider.get_connection(), time.monotonic(), None))
+            self._counters["created"] += 1
+
+    def get_connection(self):
+        """
+        Check out connection from the pool
+
+        Returns
+        -------
+        connection : Connection
+            Database connection
+        """
+        deadline = None if self.checkout_timeout is None \
+            else time.monotonic() + self.checkout_timeout
+        while True:
+            with self._condition:
+                self._close_expired()
+                item = self._pop_idle()
+                if item is None:
+                    if self._size() < self.max_size:
+                        # reserve a slot and create connection out of lock
+                        self._creating += 1
+                    else:
+                        self._wait(deadline)
+                        continue
+            if item is not None:
+                connection = item[0]
+                if self._check(connection):
+                    with self._condition:
+                        self._in_use[id(connection)] = connection
+                        self._counters["reused"] += 1
+                    return connection
+                self._close(connection)
+                continue
+            try:
+                connection = self.connection_provider.get_connection()
+            except Exception:
+                with self._condition:
+                    self._creating -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._creating -= 1
+                self._in_use[id(connection)] = connection
+                self._counters["created"] += 1
+            return connection
+
+    def release_connection(self, connection):
+        """
+        Return connection to the pool. Uncommitted changes are rolled back.
+        Connections not checked out from this pool are closed.
+
+        Parameters
+        ----------
+        connection : Connection
+            Database connection
+        """
+        with self._condition:
+            if self._in_use.get(id(connection)) is not connection:
+                if any(item[0] is connection for item in self._idle):
+                    # released twice
+                    return
+                untracked = True
+            else:
+                untracked = False
+        if untracked:
+            self._close(connection)
+            return
+        try:
+            if hasattr(connection, "rollback"):
+                connection.rollback()
+        except Exception:
+            # discard broken connection
+            with self._condition:
+                self._in_use.pop(id(connection), None)
+                self._condition.notify()
+            self._close(connection)
+            return
+        with self._condition:
+            self._in_use.pop(id(connection), None)
+            self._idle.append(
+                (connection, time.monotonic(), threading.get_ident()))
+            self._condition.notify()
+
+    def get_prepare_params(self):
+        """
+        Get parameters for preparing tables
+
+        Returns
+        -------
+        prepare_params : tuple or None
+            Parameters for preparing tables
+        """
+        return self.connection_provider.get_prepare_params()
+
+    def close_all(self):
+        """
+        Close all idle connections
+
+        """
+        with self._condition:
+            idle = self._idle
+            self._idle = []
+        for item in idle:
+            self._close(item[0])
+
+    def stats(self):
+        """
+        Get metrics of the pool
+
+        Returns
+        -------
+        stats : dict
+            Number of connections in the pool and counters
+        """
+        with self._condition:
+            stats = {
+                "size": self._size(),
+                "in_use": len(self._in_use) + self._creating,
+                "idle": len(self._idle)}
+            stats.update(self._counters)
+        return stats
+
+    def _size(self):
+        return len(self._in_use) + self._creating + len(self._idle)
+
+    def _pop_idle(self):
+        if not self._idle:
+            return None
+        thread_id = threading.get_ident()
+        for i in range(len(self._idle) - 1, -1, -1):
+            if self._idle[i][2] == thread_id:
+                return self._idle.pop(i)
+        return self._idle.pop()
+
+    def _wait(self, deadline):
+        self._counters["waited"] += 1
+        if deadline is None:
+            self._condition.wait()
+            return
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not self._condition.wait(remaining):
+            self._counters["timeouts"] += 1
+            raise TimeoutError(
+                "No connection is available in the pool within {} seconds"
+                .format(self.checkout_timeout))
+
+    def _close_expired(self):
+        if self.idle_timeout is None or len(self._idle) <= self.min_size:
+            return
+        limit = time.monotonic() - self.idle_timeout
+        expired = [item for item in self._idle[:len(self._idle) - self.min_size]
+                   if item[1] < limit]
+        if expired:
+            self._idle = [item for item in self._idle if item not in expired]
+            for item in expired:
+                self._close(item[0], locked=True)
+
+    def _check(self, connection):
+        if not self.health_check:
+            return True
+        try:
+            if callable(self.health_check):
+                ok = self.health_check(connection)
+            elif hasattr(connection, "cursor"):
+                cursor = connection.cursor()
+                cursor.execute("select 1")
+                cursor.fetchall()
+                ok = True
+            else:
+                ok = True
+        except Exception:
+            ok = False
+        if not ok:
+            with self._condition:
+                self._counters["health_check_failures"] += 1
+        return ok
+
+    def _close(self, connection, locked=False):
+        try:
+            if hasattr(connection, "close"):
+                connection.close()
+        except Exception:
+            pass
+        if locked:
+            self._counters["closed"] += 1
+            self._condition.notify()
+        else:
+            with self._condition:
+                self._counters["closed"] += 1
+                self._condition.notify()
@@ -6,6 +6,8 @@ from datetime import datetime
 from pytz import timezone as tz
 
 from ..serializer import dumps, loads
+from ..codec import get_codec, get_compressor
+from ..utils import run_in_executor
 from ..models import Context, Topic
 
 
@@ -27,10 +29,29 @@ class ContextStore(ABC):
         SQLs used in ContextStore
     timeout : int
         Context timeout (Seconds)
+    datetime_decoding : str
+        How to decode datetime in data. "schema" or "legacy"
+    codec : minette.codec.Codec
+        Codec to encode data. Data written by any codec can be read
+    compressor : minette.codec.Compressor
+        Compressor for large data. Call `compressor.stats()` to get
+        the bytes saved by compression
+    placeholder : str
+        Parameter marker of the database driver
+    bulk_size : int
+        Max number of keys in a query of `get_many`
+    json_data : bool
+        True if the data column accepts only JSON. Binary codecs are
+        replaced with "json" and data are not compressed
     """
+    placeholder = "?"
+    bulk_size = 500
+    json_data = False
 
     def __init__(self, config=None, timezone=None, logger=None,
-                 table_name="context", *, timeout=300, **kwargs):
+                 table_name="context", *, timeout=300,
+                 datetime_decoding=None, codec=None, compression=None,
+                 compression_threshold=None, **kwargs):
         """
         Parameters
         ----------
@@ -44,6 +65,18 @@ class ContextStore(ABC):
             Database table name for read/write context data
         timeout : int, default 300
             Context timeout (Seconds)
+        datetime_decoding : str, default None
+            Set "legacy" to decode all strings like datetime in data.
+            Use `datetime_decoding` in configuration file by default
+        codec : str, default None
+            Codec to encode data like "orjson" or "msgpack".
+            Use `store_codec` in configuration file or "json" by default
+        compression : str, default None
+            Compression for large data like "zlib" or "lz4".
+            Use `store_compression` in configuration file or no compression
+        compression_threshold : int, default None
+            Data smaller than this (in bytes) are not compressed.
+            Use `store_compression_threshold` in configuration file or 1024
         """
         self.config = config
         self.timezone = timezone or (
@@ -51,6 +84,20 @@ class ContextStore(ABC):
         self.logger = logger if logger else getLogger(__name__)
         self.table_name = table_name
         self.timeout = timeout
+        self.datetime_decoding = datetime_decoding or (
+            config.get("datetime_decoding") if config else None)
+        self.codec = get_codec(
+            codec or (config.get("store_codec") if config else None))
+        self.compressor = get_compressor(
+            compression or (
+                config.get("store_compression") if config else None),
+            compression_threshold or (
+                int(config.get("store_compression_threshold") or 0)
+                if config else None) or None)
+        if self.json_data:
+            if self.codec.binary:
+                self.codec = get_codec("json")
+            self.compressor = None
         self.sqls = self.get_sqls()
 
     @abstractmethod
@@ -111,38 +158,117 @@ class ContextStore(ABC):
                 self.sqls["get_context"], (channel, channel_user_id))
             row = cursor.fetchone()
             if row is not None:
-                # convert to dict
-                if isinstance(row, dict):
-                    record = row
-                else:
-                    record = dict(
-                        zip([column[0] for column in cursor.description], row))
-                # convert type
-                record["topic_previous"] = \
-                    loads(record["topic_previous"])
-                record["data"] = loads(record["data"])
-                # check context timeout
-                if record["timestamp"].tzinfo:
-                    last_access = record["timestamp"].astimezone(self.timezone)
-                else:
-                    last_access = self.timezone.localize(record["timestamp"])
-                gap = datetime.now(self.timezone) - last_access
-                if gap.total_seconds() <= self.timeout:
-                    # restore context if not timeout
-                    context.topic.name = record["topic_name"]
-                    context.topic.status = record["topic_status"]
-                    context.topic.priority = record["topic_priority"]
-                    context.topic.previous = Topic.from_dict(
-                        record["topic_previous"]) \
-                        if record["topic_previous"] else None
-                    context.data = record["data"] if record["data"] else {}
-                    context.is_new = False
+                self._restore(context, self._to_record(cursor, row))
         except Exception as ex:
             self.logger.error(
                 "Error occured in restoring context from database: "
                 + str(ex) + "\n" + traceback.format_exc())
         return context
 
+    def get_many(self, keys, connection):
+        """
+        Get contexts for many pairs of channel and channel_user_id at once.
+        Stores that don't provide `get_contexts` SQL get them one by one.
+
+        Parameters
+        ----------
+        keys : iterable of tuple (str, str)
+            Pairs of channel and channel_user_id
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        contexts : dict
+            Contexts keyed by (channel, channel_user_id)
+        """
+        keys = list(dict.fromkeys(keys))
+        if "get_contexts" not in self.sqls:
+            return {k: self.get(k[0], k[1], connection) for k in keys}
+        contexts = {}
+        ids_by_channel = {}
+        for channel, channel_user_id in keys:
+            context = Context(channel, channel_user_id)
+            context.timestamp = datetime.now(self.timezone)
+            contexts[(channel, channel_user_id)] = context
+            if channel_user_id:
+                ids_by_channel.setdefault(channel, []).append(channel_user_id)
+        try:
+            cursor = connection.cursor()
+            for channel, ids in ids_by_channel.items():
+                for i in range(0, len(ids), self.bulk_size):
+                    chunk = ids[i:i + self.bulk_size]
+                    cursor.execute(
+                        self.sqls["get_contexts"].format(
+                            ", ".join([self.placeholder] * len(chunk))),
+                        (channel, *chunk))
+                    for row in cursor.fetchall():
+                        record = self._to_record(cursor, row)
+                        context = contexts.get(
+                            (channel, record["channel_user_id"]))
+                        if context is not None:
+                            self._restore(context, record)
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in restoring contexts from database: "
+                + str(ex) + "\n" + traceback.format_exc())
+        return contexts
+
+    def _to_record(self, cursor, row):
+        # convert to dict
+        if isinstance(row, dict):
+            return row
+        else:
+            return dict(
+                zip([column[0] for column in cursor.description], row))
+
+    def _restore(self, context, record):
+        # convert type
+        record["topic_previous"] = loads(
+            record["topic_previous"],
+            datetime_decoding=self.datetime_decoding, codec=self.codec)
+        record["data"] = loads(
+            record["data"], datetime_decoding=self.datetime_decoding,
+            codec=self.codec)
+        # check context timeout
+        if record["timestamp"].tzinfo:
+            last_access = record["timestamp"].astimezone(self.timezone)
+        else:
+            last_access = self.timezone.localize(record["timestamp"])
+        gap = datetime.now(self.timezone) - last_access
+        if gap.total_seconds() <= self.timeout:
+            # restore context if not timeout
+            context.topic.name = record["topic_name"]
+            context.topic.status = record["topic_status"]
+            context.topic.priority = record["topic_priority"]
+            context.topic.previous = Topic.from_dict(
+                record["topic_previous"]) \
+                if record["topic_previous"] else None
+            context.data = record["data"] if record["data"] else {}
+            context.is_new = False
+
+    async def get_async(self, channel, channel_user_id, connection):
+        """
+        Get context by channel and channel_user_id without blocking
+        the event loop. Override this method to use the native async driver.
+
+        Parameters
+        ----------
+        channel : str
+            Channel
+        channel_user_id : str
+            Channel user ID
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        context : minette.Context
+            Context for channel and channel_user_id
+        """
+        return await run_in_executor(
+            self.get, channel, channel_user_id, connection)
+
     def save(self, context, connection):
         """
         Save context
@@ -156,16 +282,58 @@ class ContextStore(ABC):
         """
         if not context.channel_user_id:
             return
+        cursor = connection.cursor()
+        cursor.execute(self.sqls["save_context"], self._to_params(context))
+        connection.commit()
+
+    def save_many(self, contexts, connection):
+        """
+        Save many contexts with one statement.
+        This method doesn't commit, so commit the connection after calling.
+        Stores that don't provide `save_context` SQL save them one by one.
+
+        Parameters
+        ----------
+        contexts : iterable of minette.Context
+            Contexts to save
+        connection : Connection
+            Connection
+        """
+        contexts = [c for c in contexts if c.channel_user_id]
+        if "save_context" not in self.sqls:
+            for context in contexts:
+                self.save(context, connection)
+            return
+        if contexts:
+            cursor = connection.cursor()
+            cursor.executemany(
+                self.sqls["save_context"],
+                [self._to_params(c) for c in contexts])
+
+    def _to_params(self, context):
         # serialize some elements
         context_dict = context.to_dict()
-        serialized_previous_topic = \
-            dumps(context_dict["topic"]["previous"])
-        serialized_data = dumps(context_dict["data"])
-        # save
-        cursor = connection.cursor()
-        cursor.execute(self.sqls["save_context"], (
+        # previous topic is small and its column is short. not compressed
+        serialized_previous_topic = dumps(
+            context_dict["topic"]["previous"], codec=self.codec)
+        serialized_data = dumps(
+            context_dict["data"], codec=self.codec, compressor=self.compressor)
+        return (
             context.channel, context.channel_user_id, context.timestamp,
             context.topic.name, context.topic.status,
             serialized_previous_topic, context.topic.priority,
-            serialized_data))
-        connection.commit()
+            serialized_data)
+
+    async def save_async(self, context, connection):
+        """
+        Save context without blocking the event loop.
+        Override this method to use the native async driver.
+
+        Parameters
+        ----------
+        context : minette.Context
+            Context to save
+        connection : Connection
+            Connection
+        """
+        await run_in_executor(self.save, context, connection)
@@ -1,9 +1,12 @@
 """ Base class for MessageLogStore """
 from abc import ABC, abstractmethod
+import traceback
 from logging import getLogger
 from pytz import timezone as tz
 
-from ..serializer import dumps
+from ..serializer import dumpd
+from ..codec import get_codec, encode
+from ..utils import run_in_executor
 
 
 class MessageLogStore(ABC):
@@ -20,11 +23,30 @@ class MessageLogStore(ABC):
         Logger
     table_name : str
         Database table name for read/write message log data
+    codec : minette.codec.Codec
+        Codec to encode JSON columns
+    exclude_fields : list of str
+        Columns and the keys in JSON columns not to write
     sqls : dict
         SQLs used in ContextStore
+    placeholder : str
+        Parameter marker of the database driver
     """
+    placeholder = "?"
+    COLUMNS = (
+        "channel", "channel_detail", "channel_user_id",
+        "request_timestamp", "request_id", "request_type", "request_text",
+        "request_payloads", "request_intent", "request_is_adhoc",
+        "response_type", "response_text", "response_payloads",
+        "response_milliseconds",
+        "context_is_new", "context_topic_name", "context_topic_status",
+        "context_topic_is_new", "context_topic_keep_on",
+        "context_topic_priority", "context_error",
+        "request_json", "response_json", "context_json")
+
     def __init__(self, config=None, timezone=None, logger=None,
-                 table_name="messagelog", **kwargs):
+                 table_name="messagelog", *, codec=None, exclude_fields=None,
+                 **kwargs):
         """
         Parameters
         ----------
@@ -36,12 +58,43 @@ class MessageLogStore(ABC):
             Logger
         table_name : str, default "messagelog"
             Database table name for read/write message log data
+        codec : str, default None
+            Codec to encode JSON columns like "orjson". Binary codecs are
+            not used to keep message log readable as JSON.
+            Use `store_codec` in configuration file or "json" by default
+        exclude_fields : list of str or str, default None
+            Columns (e.g. "request_json") and the keys in JSON columns
+            (e.g. "request.channel_message", "request.words",
+            "context.data") not to write.
+            Excluded columns are written as null.
+            Use `messagelog_exclude_fields` (comma separated) in
+            configuration file or write all by default
         """
         self.config = config
         self.timezone = timezone or (
             tz(config.get("timezone", default="UTC")) if config else tz("UTC"))
         self.logger = logger if logger else getLogger(__name__)
         self.table_name = table_name
+        self.codec = get_codec(
+            codec or (config.get("store_codec") if config else None))
+        if self.codec.binary:
+            self.codec = get_codec("json")
+        exclude_fields = exclude_fields or \
+            (config.get("messagelog_exclude_fields") if config else None) or []
+        if isinstance(exclude_fields, str):
+            exclude_fields = exclude_fields.split(",")
+        self.exclude_fields = [f.strip() for f in exclude_fields if f.strip()]
+        self._excluded_columns = set()
+        self._excluded_keys = {"request": [], "response": [], "context": []}
+        for field in self.exclude_fields:
+            if "." in field:
+                obj_name, key = field.split(".", 1)
+                if obj_name not in self._excluded_keys:
+                    raise ValueError(
+                        "Unknown object in exclude_fields: " + field)
+                self._excluded_keys[obj_name].append(key)
+            else:
+                self._excluded_columns.add(field)
         self.sqls = self.get_sqls()
 
     @abstractmethod
@@ -64,13 +117,201 @@ class MessageLogStore(ABC):
         cursor.execute(self.sqls["prepare_check"], prepare_params or tuple())
         if not cursor.fetchone():
             cursor.execute(self.sqls["prepare_create"])
+            self.prepare_index(connection)
             connection.commit()
             return True
         else:
             return False
 
-    def _flatten(self, request, response, context):
-        return {
+    def prepare_index(self, connection):
+        """
+        Create indexes to read message logs by user and by time.
+        Called when the table is created. Call this to add indexes
+        to the table created by former versions.
+
+        Parameters
+        ----------
+        connection : Connection
+            Connection for prepare
+        """
+        cursor = connection.cursor()
+        for sql in self.sqls.get("prepare_index", []):
+            cursor.execute(sql)
+        connection.commit()
+
+    def _to_record(self, cursor, row):
+        # convert to dict
+        if isinstance(row, dict):
+            return row
+        else:
+            return dict(
+                zip([column[0] for column in cursor.description], row))
+
+    def _to_db_time(self, timestamp):
+        # stored in the timezone of the messages
+        if timestamp.tzinfo is not None:
+            return timestamp.astimezone(self.timezone)
+        return timestamp
+
+    def get_history(self, channel, channel_user_id, connection, limit=10,
+                    before=None, before_id=None):
+        """
+        Get the latest message logs of the user
+
+        Parameters
+        ----------
+        channel : str
+            Channel
+        channel_user_id : str
+            Channel user ID
+        connection : Connection
+            Connection
+        limit : int, default 10
+            Max number of message logs
+        before : datetime, default None
+            Get the message logs requested before this time
+        before_id : int, default None
+            Used with `before`. Get also the message logs requested at
+            `before` whose id is smaller than this. Pass the
+            `request_timestamp` and `id` of the oldest log to get next page
+            without skipping the logs at the same time
+
+        Returns
+        -------
+        records : list of dict
+            Message logs in descending order of `request_timestamp` and `id`
+        """
+        try:
+            cursor = connection.cursor()
+            if before is None:
+                cursor.execute(
+                    self.sqls["get_history"],
+                    (channel, channel_user_id, limit))
+            elif before_id is None:
+                cursor.execute(
+                    self.sqls["get_history_before"],
+                    (channel, channel_user_id, self._to_db_time(before),
+                     limit))
+            else:
+                before = self._to_db_time(before)
+                cursor.execute(
+                    self.sqls["get_history_before_id"],
+                    (channel, channel_user_id, before, before, before_id,
+                     limit))
+            return [self._to_record(cursor, r) for r in cursor.fetchall()]
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in reading message logs from database: "
+                + str(ex) + "\n" + traceback.format_exc())
+            return []
+
+    def scan(self, start, end, connection, batch_size=1000):
+        """
+        Read all message logs in the period page by page. Each page is read
+        by the last `request_timestamp` and `id` of previous page instead
+        of offset, so that the cost doesn't grow with the pages.
+
+        Parameters
+        ----------
+        start : datetime
+            Start of the period (inclusive)
+        end : datetime
+            End of the period (exclusive)
+        connection : Connection
+            Connection
+        batch_size : int, default 1000
+            Number of message logs read at once
+
+        Yields
+        ------
+        record : dict
+            Message log in ascending order of `request_timestamp` and `id`
+        """
+        end = self._to_db_time(end)
+        last_timestamp, last_id = self._to_db_time(start), -1
+        cursor = connection.cursor()
+        while True:
+            try:
+                cursor.execute(
+                    self.sqls["scan"],
+                    (end, last_timestamp, last_timestamp, last_id,
+                     batch_size))
+                records = [
+                    self._to_record(cursor, r) for r in cursor.fetchall()]
+            except Exception as ex:
+                self.logger.error(
+                    "Error occured in reading message logs from database: "
+                    + str(ex) + "\n" + traceback.format_exc())
+                return
+            yield from records
+            if len(records) < batch_size:
+                return
+            last_timestamp = records[-1]["request_timestamp"]
+            last_id = records[-1]["id"]
+
+    def purge(self, connection, before, chunk_size=1000):
+        """
+        Delete the message logs requested before the time. Logs are
+        deleted and committed chunk by chunk not to lock the table for long
+
+        Parameters
+        ----------
+        connection : Connection
+            Connection
+        before : datetime
+            Delete the message logs requested before this time
+        chunk_size : int, default 1000
+            Number of message logs deleted at once
+
+        Returns
+        -------
+        count : int
+            Number of message logs deleted
+        """
+        if "delete_before" not in self.sqls:
+            raise NotImplementedError(
+                "{} doesn't support purging message logs".format(
+                    type(self).__name__))
+        before = self._to_db_time(before)
+        deleted = 0
+        cursor = connection.cursor()
+        while True:
+            cursor.execute(self.sqls["delete_before"], (before, chunk_size))
+            count = cursor.rowcount
+            connection.commit()
+            deleted += count
+            if count < chunk_size:
+                return deleted
+
+    def _encode(self, obj):
+        return "" if obj is None else encode(obj, self.codec)
+
+    def _serialize(self, request, response, context):
+        """
+        Convert message log to the values of columns. Each object is
+        converted to dict only once, and the JSON columns and the columns
+        in them are encoded from the dicts.
+
+        Parameters
+        ----------
+        request : minette.Message
+            Request to chatbot
+        response : minette.Response
+            Response from chatbot
+        context : minette.Context
+            Context
+
+        Returns
+        -------
+        record : dict
+            Values of columns. Excluded columns are None
+        """
+        excluded = self._excluded_columns
+        request_dict = dumpd(request)
+        response_dict = dumpd(response)
+        context_dict = dumpd(context)
+        message = response.messages[0] if response.messages else None
+        record = {
             # request
             "channel": request.channel,
             "channel_detail": request.channel_detail,
@@ -79,14 +320,16 @@ class MessageLogStore(ABC):
             "request_id": request.id,
             "request_type": request.type,
             "request_text": request.text,
-            "request_payloads": dumps(
-                [p.to_dict() for p in request.payloads]),
+            "request_payloads": None if "request_payloads" in excluded
+            else self._encode(request_dict["payloads"]),
             "request_intent": request.intent,
             "request_is_adhoc": request.is_adhoc,
             # response
-            "response_type": response.messages[0].type if response.messages else "",
-            "response_text": response.messages[0].text if response.messages else "",
-            "response_payloads": dumps([p.to_dict() for p in response.messages[0].payloads]) if response.messages else "",
+            "response_type": message.type if message else "",
+            "response_text": message.text if message else "",
+            "response_payloads": None if "response_payloads" in excluded
+            else self._encode(response_dict["messages"][0]["payloads"])
+            if message else "",
             "response_milliseconds": response.performance.milliseconds,
             # context
             "context_is_new": context.is_new,
@@ -95,8 +338,23 @@ class MessageLogStore(ABC):
             "context_topic_is_new": context.topic.is_new,
             "context_topic_keep_on": context.topic.keep_on,
             "context_topic_priority": context.topic.priority,
-            "context_error": dumps(context.error),
+            "context_error": None if "context_error" in excluded
+            else self._encode(context_dict["error"]),
         }
+        for name, d in (("request", request_dict),
+                        ("response", response_dict),
+                        ("context", context_dict)):
+            column = name + "_json"
+            if column in excluded:
+                record[column] = None
+                continue
+            for key in self._excluded_keys[name]:
+                d.pop(key, None)
+            record[column] = self._encode(d)
+        for column in excluded:
+            if column in record:
+                record[column] = None
+        return record
 
     def save(self, request, response, context, connection):
         """
@@ -113,32 +371,71 @@ class MessageLogStore(ABC):
         connection : Connection
             Connection
         """
-        f = self._flatten(request, response, context)
         cursor = connection.cursor()
-        cursor.execute(self.sqls["write"], (
-            f["channel"],
-            f["channel_detail"],
-            f["channel_user_id"],
-            f["request_timestamp"],
-            f["request_id"],
-            f["request_type"],
-            f["request_text"],
-            f["request_payloads"],
-            f["request_intent"],
-            f["request_is_adhoc"],
-            f["response_type"],
-            f["response_text"],
-            f["response_payloads"],
-            f["response_milliseconds"],
-            f["context_is_new"],
-            f["context_topic_name"],
-            f["context_topic_status"],
-            f["context_topic_is_new"],
-            f["context_topic_keep_on"],
-            f["context_topic_priority"],
-            f["context_error"],
-            request.to_json(),
-            response.to_json(),
-            context.to_json())
-        )
+        cursor.execute(
+            self.sqls["write"], self._to_params(request, response, context))
         connection.commit()
+
+    def save_many(self, logs, connection):
+        """
+        Write many message logs with one statement.
+        This method doesn't commit, so commit the connection after calling.
+        Stores that don't provide `write` SQL write them one by one.
+
+        Parameters
+        ----------
+        logs : iterable of tuple
+            Tuples of request, response and context
+        connection : Connection
+            Connection
+        """
+        logs = list(logs)
+        if "write" not in self.sqls:
+            for request, response, context in logs:
+                self.save(request, response, context, connection)
+            return
+        if logs:
+            cursor = connection.cursor()
+            cursor.executemany(
+                self.sqls["write"],
+                [self._to_params(*log) for log in logs])
+
+    def save_records(self, records, connection):
+        """
+        Write many message logs already serialized by `_serialize`.
+        This method doesn't commit, so commit the connection after calling.
+
+        Parameters
+        ----------
+        records : iterable of dict
+            Values of columns of message logs
+        connection : Connection
+            Connection
+        """
+        params = [tuple(r[c] for c in self.COLUMNS) for r in records]
+        if params:
+            cursor = connection.cursor()
+            cursor.executemany(self.sqls["write"], params)
+
+    def _to_params(self, request, response, context):
+        record = self._serialize(request, response, context)
+        return tuple(record[c] for c in self.COLUMNS)
+
+    async def save_async(self, request, response, context, connection):
+        """
+        Write message log without blocking the event loop.
+        Override this method to use the native async driver.
+
+        Parameters
+        ----------
+        request : minette.Message
+            Request to chatbot
+        response : minette.Response
+            Response from chatbot
+        context : minette.Context
+            Context
+        connection : Connection
+            Connection
+        """
+        await run_in_executor(
+            self.save, request, response, context, connection)
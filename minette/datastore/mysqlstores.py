@@ -70,6 +70,10 @@ class MySQLConnectionProvider(ConnectionProvider):
 
 
 class MySQLContextStore(ContextStore):
+    placeholder = "%s"
+    # data column is JSON type
+    json_data = True
+
     def get_sqls(self):
         """
         Get SQLs used in ContextStore
@@ -83,11 +87,16 @@ class MySQLContextStore(ContextStore):
             "prepare_check": "select * from information_schema.TABLES where TABLE_NAME='{0}' and TABLE_SCHEMA=%s".format(self.table_name),
             "prepare_create": "create table {0} (channel VARCHAR(20), channel_user_id VARCHAR(100), timestamp DATETIME, topic_name VARCHAR(100), topic_status VARCHAR(100), topic_previous VARCHAR(500), topic_priority INT, data JSON, primary key(channel, channel_user_id))".format(self.table_name),
             "get_context": "select channel, channel_user_id, timestamp, topic_name, topic_status, topic_previous, topic_priority, data from {0} where channel=%s and channel_user_id=%s limit 1".format(self.table_name),
+            "get_contexts": "select channel, channel_user_id, timestamp, topic_name, topic_status, topic_previous, topic_priority, data from {0} where channel=%s and channel_user_id in ({{}})".format(self.table_name),
             "save_context": "replace into {0} (channel, channel_user_id, timestamp, topic_name, topic_status, topic_previous, topic_priority, data) values (%s,%s,%s,%s,%s,%s,%s,%s)".format(self.table_name),
         }
 
 
 class MySQLUserStore(UserStore):
+    placeholder = "%s"
+    # data column is JSON type
+    json_data = True
+
     def get_sqls(self):
         """
         Get SQLs used in UserStore
@@ -101,12 +110,15 @@ class MySQLUserStore(UserStore):
             "prepare_check": "select * from information_schema.TABLES where TABLE_NAME='{0}' and TABLE_SCHEMA=%s".format(self.table_name),
             "prepare_create": "create table {0} (channel VARCHAR(20), channel_user_id VARCHAR(100), user_id VARCHAR(100), timestamp DATETIME, name VARCHAR(100), nickname VARCHAR(100), profile_image_url VARCHAR(500), data JSON, primary key(channel, channel_user_id))".format(self.table_name),
             "get_user": "select channel, channel_user_id, user_id, timestamp, name, nickname, profile_image_url, data from {0} where channel=%s and channel_user_id=%s limit 1".format(self.table_name),
+            "get_users": "select channel, channel_user_id, user_id, timestamp, name, nickname, profile_image_url, data from {0} where channel=%s and channel_user_id in ({{}})".format(self.table_name),
             "add_user": "insert into {0} (channel, channel_user_id, user_id, timestamp, name, nickname, profile_image_url, data) values (%s,%s,%s,%s,%s,%s,%s,%s)".format(self.table_name),
             "save_user": "update {0} set timestamp=%s, name=%s, nickname=%s, profile_image_url=%s, data=%s where channel=%s and channel_user_id=%s".format(self.table_name),
         }
 
 
 class MySQLMessageLogStore(MessageLogStore):
+    placeholder = "%s"
+
     def get_sqls(self):
         """
         Get SQLs used in MessageLogStore
@@ -173,6 +185,38 @@ class MySQLMessageLogStore(MessageLogStore):
                 values (
                     %s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
                 """.format(self.table_name),
+            "prepare_index": [
+                "create index ix_{0}_user on {0} "
+                "(channel, channel_user_id, request_timestamp)"
+                .format(self.table_name),
+                "create index ix_{0}_timestamp on {0} "
+                "(request_timestamp)".format(self.table_name),
+            ],
+            "get_history": """
+                select * from {0}
+                where channel=%s and channel_user_id=%s
+                order by request_timestamp desc, id desc limit %s
+                """.format(self.table_name),
+            "get_history_before": """
+                select * from {0}
+                where channel=%s and channel_user_id=%s and request_timestamp<%s
+                order by request_timestamp desc, id desc limit %s
+                """.format(self.table_name),
+            "get_history_before_id": """
+                select * from {0}
+                where channel=%s and channel_user_id=%s and (request_timestamp<%s
+                    or (request_timestamp=%s and id<%s))
+                order by request_timestamp desc, id desc limit %s
+                """.format(self.table_name),
+            "list_partitions": "select TABLE_NAME from information_schema.TABLES where TABLE_NAME like '{0}_%%' and TABLE_SCHEMA=%s".format(self.table_name),
+            "drop_table": "drop table {0}".format(self.table_name),
+            "delete_before": "delete from {0} where request_timestamp<%s order by request_timestamp limit %s".format(self.table_name),
+            "scan": """
+                select * from {0}
+                where request_timestamp<%s and (request_timestamp>%s
+                    or (request_timestamp=%s and id>%s))
+                order by request_timestamp, id limit %s
+                """.format(self.table_name),
         }
 
 
@@ -0,0 +1,344 @@
+""" Table-per-period partitions of message log for SQL MessageLogStores """
+import re
+import threading
+import traceback
+from datetime import datetime
+
+from .messagelogstore import MessageLogStore
+
+
+class PartitionedMessageLogStore(MessageLogStore):
+    """
+    MessageLogStore that writes message logs to the table of each day or
+    month, like `messagelog_20200101` or `messagelog_202001`.
+    Tables are created when the first log of the period is written,
+    and dropped at once by `purge()` when they are out of retention period.
+
+    Logs are routed by `request.timestamp`, and `get_history` and `scan`
+    read the tables in order as if they are one table.
+
+    Only the message log stores of SQLiteStores, MySQLStores and SQLDBStores
+    are supported. The others like SQLAlchemyStores and AzureTableStores
+    raise ValueError.
+
+    Attributes
+    ----------
+    store : minette.MessageLogStore
+        SQL MessageLogStore for the base table name. The same class is
+        used to read/write each partition
+    period : str
+        "daily" or "monthly"
+    config : minette.Config
+        Configuration
+    timezone : pytz.timezone
+        Timezone
+    logger : logging.Logger
+        Logger
+    """
+    PERIOD_FORMATS = {"daily": ("%Y%m%d", 8), "monthly": ("%Y%m", 6)}
+
+    def __init__(self, store, period=None, **kwargs):
+        """
+        Parameters
+        ----------
+        store : minette.MessageLogStore
+            SQL MessageLogStore for the base table name. SQLite, MySQL or
+            SQL DB
+        period : str, default None
+            "daily" or "monthly". Use `messagelog_partition` in
+            configuration file or "monthly" by default
+        """
+        if "list_partitions" not in (store.sqls or {}):
+            raise ValueError(
+                "{} doesn't support partitions. Use the MessageLogStore of "
+                "SQLiteStores, MySQLStores or SQLDBStores".format(
+                    type(store).__name__))
+        self.store = store
+        config = store.config
+        super().__init__(
+            config=config, timezone=store.timezone, logger=store.logger,
+            table_name=store.table_name, codec=store.codec,
+            exclude_fields=store.exclude_fields)
+        self.period = period or \
+            (config.get("messagelog_partition") if config else None) or \
+            "monthly"
+        if self.period not in self.PERIOD_FORMATS:
+            raise ValueError(
+                "period must be one of {}: {}".format(
+                    tuple(self.PERIOD_FORMATS), self.period))
+        self._format, digits = self.PERIOD_FORMATS[self.period]
+        self._name_pattern = re.compile(
+            re.escape(self.table_name) + r"_\d{" + str(digits) + "}$")
+        self._stores = {}
+        self._prepared = set()
+        self._prepare_params = None
+        self._lock = threading.Lock()
+
+    def get_sqls(self):
+        # SQLs are provided by the store of each partition
+        return {}
+
+    def partition_name(self, timestamp):
+        """
+        Get the table name of the partition for the time
+
+        Parameters
+        ----------
+        timestamp : datetime
+            Time
+
+        Returns
+        -------
+        table_name : str
+            Table name of the partition
+        """
+        return "{}_{}".format(
+            self.table_name, self._to_db_time(timestamp).strftime(self._format))
+
+    def get_partition(self, table_name):
+        """
+        Get MessageLogStore for the partition
+
+        Parameters
+        ----------
+        table_name : str
+            Table name of the partition
+
+        Returns
+        -------
+        store : minette.MessageLogStore
+            MessageLogStore to read/write the partition
+        """
+        with self._lock:
+            store = self._stores.get(table_name)
+            if store is None:
+                store = type(self.store)(
+                    config=self.config, timezone=self.timezone,
+                    logger=self.logger, table_name=table_name,
+                    codec=self.codec, exclude_fields=self.exclude_fields)
+                self._stores[table_name] = store
+        return store
+
+    def list_partitions(self, connection):
+        """
+        Get the table names of the partitions in database
+
+        Parameters
+        ----------
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        table_names : list of str
+            Table names of the partitions from the oldest
+        """
+        cursor = connection.cursor()
+        cursor.execute(
+            self.store.sqls["list_partitions"],
+            self._prepare_params or tuple())
+        names = [next(iter(self._to_record(cursor, r).values()))
+                 for r in cursor.fetchall()]
+        return sorted(n for n in names if self._name_pattern.match(n))
+
+    def prepare_table(self, connection, prepare_params=None):
+        """
+        Create the partition for now if not exist
+
+        Parameters
+        ----------
+        connection : Connection
+            Connection for prepare
+        prepare_params : tuple, default None
+            Query parameters for checking table. Kept to create the
+            partitions later
+        """
+        self._prepare_params = prepare_params
+        return self._prepare_partition(
+            self.partition_name(datetime.now(self.timezone)), connection)
+
+    def _prepare_partition(self, table_name, connection):
+        if table_name in self._prepared:
+            return False
+        created = self.get_partition(table_name).prepare_table(
+            connection, self._prepare_params)
+        with self._lock:
+            self._prepared.add(table_name)
+        return created
+
+    def prepare_index(self, connection):
+        for table_name in self.list_partitions(connection):
+            self.get_partition(table_name).prepare_index(connection)
+
+    def save(self, request, response, context, connection):
+        """
+        Write message log to the partition for the time of request
+
+        Parameters
+        ----------
+        request : minette.Message
+            Request to chatbot
+        response : minette.Response
+            Response from chatbot
+        context : minette.Context
+            Context
+        connection : Connection
+            Connection
+        """
+        table_name = self.partition_name(request.timestamp)
+        self._prepare_partition(table_name, connection)
+        self.get_partition(table_name).save(
+            request, response, context, connection)
+
+    def save_many(self, logs, connection):
+        """
+        Write many message logs to the partitions for the time of requests.
+        This method doesn't commit, so commit the connection after calling.
+
+        Parameters
+        ----------
+        logs : iterable of tuple
+            Tuples of request, response and context
+        connection : Connection
+            Connection
+        """
+        logs_by_partition = {}
+        for log in logs:
+            logs_by_partition.setdefault(
+                self.partition_name(log[0].timestamp), []).append(log)
+        for table_name, partition_logs in logs_by_partition.items():
+            self._prepare_partition(table_name, connection)
+            self.get_partition(table_name).save_many(
+                partition_logs, connection)
+
+    def save_records(self, records, connection):
+        """
+        Write many message logs already serialized by `_serialize` to the
+        partitions for the time of requests.
+        This method doesn't commit, so commit the connection after calling.
+
+        Parameters
+        ----------
+        records : iterable of dict
+            Values of columns of message logs
+        connection : Connection
+            Connection
+        """
+        records_by_partition = {}
+        for record in records:
+            records_by_partition.setdefault(
+                self.partition_name(record["request_timestamp"]), []
+            ).append(record)
+        for table_name, partition_records in records_by_partition.items():
+            self._prepare_partition(table_name, connection)
+            self.get_partition(table_name).save_records(
+                partition_records, connection)
+
+    def get_history(self, channel, channel_user_id, connection, limit=10,
+                    before=None, before_id=None):
+        """
+        Get the latest message logs of the user from the latest partitions
+
+        Parameters
+        ----------
+        channel : str
+            Channel
+        channel_user_id : str
+            Channel user ID
+        connection : Connection
+            Connection
+        limit : int, default 10
+            Max number of message logs
+        before : datetime, default None
+            Get the message logs requested before this time
+        before_id : int, default None
+            Used with `before`. Get also the message logs requested at
+            `before` whose id is smaller than this. Ids are numbered in each
+            partition, so pass the id of the log in the latest page
+
+        Returns
+        -------
+        records : list of dict
+            Message logs in descending order of `request_timestamp` and `id`
+        """
+        try:
+            table_names = self.list_partitions(connection)
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in listing partitions: "
+                + str(ex) + "\n" + traceback.format_exc())
+            return []
+        last = self.partition_name(before) if before is not None else None
+        records = []
+        for table_name in reversed(table_names):
+            if last is not None and table_name > last:
+                continue
+            records.extend(self.get_partition(table_name).get_history(
+                channel, channel_user_id, connection,
+                limit=limit - len(records), before=before,
+                before_id=before_id))
+            if len(records) >= limit:
+                break
+        return records
+
+    def scan(self, start, end, connection, batch_size=1000):
+        """
+        Read all message logs in the period from the partitions
+        in the period
+
+        Parameters
+        ----------
+        start : datetime
+            Start of the period (inclusive)
+        end : datetime
+            End of the period (exclusive)
+        connection : Connection
+            Connection
+        batch_size : int, default 1000
+            Number of message logs read at once
+
+        Yields
+        ------
+        record : dict
+            Message log in ascending order of `request_timestamp` and `id`
+            in each partition
+        """
+        first, last = self.partition_name(start), self.partition_name(end)
+        for table_name in self.list_partitions(connection):
+            if first <= table_name <= last:
+                yield from self.get_partition(table_name).scan(
+                    start, end, connection, batch_size=batch_size)
+
+    def purge(self, connection, before, chunk_size=1000):
+        """
+        Drop the partitions whose whole period is before the time.
+        The partition that includes the time is kept
+
+        Parameters
+        ----------
+        connection : Connection
+            Connection
+        before : datetime
+            Drop the partitions of the periods before this time
+        chunk_size : int, default 1000
+            Not used because no rows are deleted
+
+        Returns
+        -------
+        count : int
+            Number of partitions dropped
+        """
+        current = self.partition_name(before)
+        dropped = 0
+        for table_name in self.list_partitions(connection):
+            if table_name >= current:
+                break
+            cursor = connection.cursor()
+            cursor.execute(self.get_partition(table_name).sqls["drop_table"])
+            connection.commit()
+            with self._lock:
+                self._prepared.discard(table_name)
+                self._stores.pop(table_name, None)
+            dropped += 1
+            self.logger.info("Partition dropped: " + table_name)
+        return dropped
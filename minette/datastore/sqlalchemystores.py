@@ -1,6 +1,5 @@
 import traceback
 from datetime import datetime
-from copy import deepcopy
 
 from sqlalchemy import (
     create_engine,
@@ -9,7 +8,10 @@ from sqlalchemy import (
     String,
     DateTime,
     Boolean,
-    TEXT
+    TEXT,
+    Index,
+    and_,
+    or_
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
@@ -20,7 +22,7 @@ from .userstore import UserStore
 from .messagelogstore import MessageLogStore
 from .storeset import StoreSet
 
-from ..serializer import dumps, loads, Serializable
+from ..serializer import dumps, loads, dumpd, Serializable
 from ..models import (
     Context,
     Topic,
@@ -194,24 +196,7 @@ class SQLAlchemyContextStore(ContextStore):
         try:
             stored_context = connection.query(SQLAlchemyContext).filter(SQLAlchemyContext.channel==channel, SQLAlchemyContext.channel_user_id==channel_user_id).first()
             if stored_context is not None:
-                # check context timeout
-                if stored_context.timestamp.tzinfo:
-                    last_access = stored_context.timestamp.astimezone(self.timezone)
-                else:
-                    last_access = self.timezone.localize(stored_context.timestamp)
-
-                gap = datetime.now(self.timezone) - last_access
-                if gap.total_seconds() <= self.timeout:
-                    # restore context if not timeout
-                    context.topic.name = stored_context.topic_name
-                    context.topic.status = stored_context.topic_status
-                    context.topic.priority = stored_context.topic_priority
-                    context.topic.previous = Topic.from_json(
-                        stored_context.topic_previous) \
-                        if stored_context.topic_previous else None
-                    context.data = loads(stored_context.data) \
-                        if stored_context.data else {}
-                    context.is_new = False
+                self._restore(context, stored_context)
 
         except Exception as ex:
             self.logger.error(
@@ -220,6 +205,70 @@ class SQLAlchemyContextStore(ContextStore):
 
         return context
 
+    def get_many(self, keys, connection):
+        """
+        Get contexts for many pairs of channel and channel_user_id at once
+
+        Parameters
+        ----------
+        keys : iterable of tuple (str, str)
+            Pairs of channel and channel_user_id
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        contexts : dict
+            Contexts keyed by (channel, channel_user_id)
+        """
+        contexts = {}
+        ids_by_channel = {}
+        for channel, channel_user_id in dict.fromkeys(keys):
+            context = SQLAlchemyContext(channel, channel_user_id)
+            context.timestamp = datetime.now(self.timezone)
+            contexts[(channel, channel_user_id)] = context
+            if channel_user_id:
+                ids_by_channel.setdefault(channel, []).append(channel_user_id)
+
+        try:
+            for channel, ids in ids_by_channel.items():
+                for i in range(0, len(ids), self.bulk_size):
+                    stored_contexts = connection.query(SQLAlchemyContext).filter(SQLAlchemyContext.channel==channel, SQLAlchemyContext.channel_user_id.in_(ids[i:i + self.bulk_size])).all()
+                    for stored_context in stored_contexts:
+                        context = contexts.get((channel, stored_context.channel_user_id))
+                        if context is not None:
+                            self._restore(context, stored_context)
+
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in restoring contexts from database: "
+                + str(ex) + "\n" + traceback.format_exc())
+
+        return contexts
+
+    def _restore(self, context, stored_context):
+        # check context timeout
+        if stored_context.timestamp.tzinfo:
+            last_access = stored_context.timestamp.astimezone(self.timezone)
+        else:
+            last_access = self.timezone.localize(stored_context.timestamp)
+
+        gap = datetime.now(self.timezone) - last_access
+        if gap.total_seconds() <= self.timeout:
+            # restore context if not timeout
+            context.topic.name = stored_context.topic_name
+            context.topic.status = stored_context.topic_status
+            context.topic.priority = stored_context.topic_priority
+            context.topic.previous = Topic.from_json(
+                stored_context.topic_previous,
+                datetime_decoding=self.datetime_decoding, codec=self.codec) \
+                if stored_context.topic_previous else None
+            context.data = loads(
+                stored_context.data,
+                datetime_decoding=self.datetime_decoding, codec=self.codec) \
+                if stored_context.data else {}
+            context.is_new = False
+
     def save(self, context, connection):
         """
         Save context
@@ -234,18 +283,40 @@ class SQLAlchemyContextStore(ContextStore):
         if not context.channel_user_id:
             return
 
-        # copy and serialize values to store
-        context_to_store = deepcopy(context)
-        context_to_store.topic_name = context_to_store.topic.name
-        context_to_store.topic_status = context_to_store.topic.status
-        context_to_store.topic_previous = dumps(context_to_store.topic.previous)
-        context_to_store.topic_priority = context_to_store.topic.priority
-        context_to_store.data = dumps(context_to_store.data)
-
         # save
-        connection.merge(instance=context_to_store)
+        connection.merge(instance=self._to_store(context))
         connection.commit()
 
+    def save_many(self, contexts, connection):
+        """
+        Save many contexts without commit
+
+        Parameters
+        ----------
+        contexts : iterable of SQLAlchemyContext
+            Contexts to save
+        connection : Session
+            Connection
+        """
+        for context in contexts:
+            if context.channel_user_id:
+                connection.merge(instance=self._to_store(context))
+
+    def _to_store(self, context):
+        # serialize values to new instance to store
+        context_to_store = SQLAlchemyContext(
+            context.channel, context.channel_user_id)
+        context_to_store.timestamp = context.timestamp
+        context_to_store.topic_name = context.topic.name
+        context_to_store.topic_status = context.topic.status
+        # previous topic is small and its column is short. not compressed
+        context_to_store.topic_previous = dumps(
+            context.topic.previous, codec=self.codec)
+        context_to_store.topic_priority = context.topic.priority
+        context_to_store.data = dumps(
+            context.data, codec=self.codec, compressor=self.compressor)
+        return context_to_store
+
 
 class SQLAlchemyUserStore(UserStore):
     """
@@ -315,11 +386,7 @@ class SQLAlchemyUserStore(UserStore):
             stored_user = connection.query(SQLAlchemyUser).filter(SQLAlchemyUser.channel==channel, SQLAlchemyUser.channel_user_id==channel_user_id).first()
 
             if stored_user is not None:
-                user.id = stored_user.id
-                user.name = stored_user.name
-                user.nickname = stored_user.nickname
-                user.profile_image_url = stored_user.profile_image_url
-                user.data = loads(stored_user.data) if stored_user.data else {}
+                self._restore(user, stored_user)
 
             else:
                 self.save(user, connection)
@@ -331,6 +398,63 @@ class SQLAlchemyUserStore(UserStore):
 
         return user
 
+    def get_many(self, keys, connection):
+        """
+        Get users for many pairs of channel and channel_user_id at once.
+        Users not found are added without commit.
+
+        Parameters
+        ----------
+        keys : iterable of tuple (str, str)
+            Pairs of channel and channel_user_id
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        users : dict
+            Users keyed by (channel, channel_user_id)
+        """
+        users = {}
+        ids_by_channel = {}
+        for channel, channel_user_id in dict.fromkeys(keys):
+            users[(channel, channel_user_id)] = SQLAlchemyUser(channel=channel, channel_user_id=channel_user_id)
+            if channel_user_id:
+                ids_by_channel.setdefault(channel, []).append(channel_user_id)
+
+        try:
+            for channel, ids in ids_by_channel.items():
+                for i in range(0, len(ids), self.bulk_size):
+                    chunk = ids[i:i + self.bulk_size]
+                    stored_users = connection.query(SQLAlchemyUser).filter(SQLAlchemyUser.channel==channel, SQLAlchemyUser.channel_user_id.in_(chunk)).all()
+                    found = set()
+                    for stored_user in stored_users:
+                        user = users.get((channel, stored_user.channel_user_id))
+                        if user is not None:
+                            self._restore(user, stored_user)
+                            found.add(stored_user.channel_user_id)
+                    for channel_user_id in chunk:
+                        if channel_user_id not in found:
+                            self._merge(users[(channel, channel_user_id)], connection)
+
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in restoring users from database: "
+                + str(ex) + "\n" + traceback.format_exc())
+
+        return users
+
+    def _restore(self, user, stored_user):
+        user.id = stored_user.id
+        user.name = stored_user.name
+        user.nickname = stored_user.nickname
+        user.profile_image_url = stored_user.profile_image_url
+        user.data = loads(
+            stored_user.data, datetime_decoding=self.datetime_decoding,
+            codec=self.codec) \
+            if stored_user.data else {}
+        user.mark_saved(self._to_local_time(stored_user.timestamp))
+
     def save(self, user, connection):
         """
         Save user
@@ -342,15 +466,41 @@ class SQLAlchemyUserStore(UserStore):
         connection : Connection
             Connection
         """
-        # copy and serialize values to store
-        user_to_store = deepcopy(user)
-        user_to_store.timestamp = datetime.now(self.timezone)
-        user_to_store.data = dumps(user_to_store.data)
-
         # save
-        connection.merge(instance=user_to_store)
+        self._merge(user, connection)
         connection.commit()
 
+    def save_many(self, users, connection):
+        """
+        Save many users without commit
+
+        Parameters
+        ----------
+        users : iterable of User
+            Users to save
+        connection : Connection
+            Connection
+        """
+        for user in users:
+            self._merge(user, connection)
+
+    def _merge(self, user, connection):
+        user_to_store = self._to_store(user)
+        connection.merge(instance=user_to_store)
+        user.mark_saved(user_to_store.timestamp)
+
+    def _to_store(self, user):
+        # serialize values to new instance to store
+        user_to_store = SQLAlchemyUser(user.channel, user.channel_user_id)
+        user_to_store.id = user.id
+        user_to_store.timestamp = datetime.now(self.timezone)
+        user_to_store.name = user.name
+        user_to_store.nickname = user.nickname
+        user_to_store.profile_image_url = user.profile_image_url
+        user_to_store.data = dumps(
+            user.data, codec=self.codec, compressor=self.compressor)
+        return user_to_store
+
 
 class SQLAlchemyMessageLogStore(MessageLogStore):
     """
@@ -382,9 +532,85 @@ class SQLAlchemyMessageLogStore(MessageLogStore):
             Query parameters for checking table
         """
         Base.metadata.create_all(bind=connection.bind, tables=[SQLAlchemyMessageLog.__table__])
+        self.prepare_index(connection)
         # Always return `False` because the result can't be handled
         return False
 
+    def prepare_index(self, connection):
+        """
+        Create indexes to read message logs by user and by time
+        if not exist
+
+        Parameters
+        ----------
+        connection : Connection
+            Connection for prepare
+        """
+        table = SQLAlchemyMessageLog.__table__
+        for name, columns in (
+                ("user", (table.c.channel, table.c.channel_user_id,
+                          table.c.request_timestamp)),
+                ("timestamp", (table.c.request_timestamp, ))):
+            index = Index("ix_{}_{}".format(self.table_name, name), *columns)
+            try:
+                index.create(bind=connection.bind, checkfirst=True)
+            finally:
+                # not to create it for the other table names
+                table.indexes.discard(index)
+
+    def get_history(self, channel, channel_user_id, connection, limit=10,
+                    before=None, before_id=None):
+        try:
+            query = connection.query(SQLAlchemyMessageLog).filter(
+                SQLAlchemyMessageLog.channel == channel,
+                SQLAlchemyMessageLog.channel_user_id == channel_user_id)
+            if before is not None:
+                before = self._to_db_time(before)
+                if before_id is None:
+                    query = query.filter(
+                        SQLAlchemyMessageLog.request_timestamp < before)
+                else:
+                    query = query.filter(or_(
+                        SQLAlchemyMessageLog.request_timestamp < before,
+                        and_(SQLAlchemyMessageLog.request_timestamp ==
+                             before,
+                             SQLAlchemyMessageLog.id < before_id)))
+            return [dumpd(r) for r in query.order_by(
+                SQLAlchemyMessageLog.request_timestamp.desc(),
+                SQLAlchemyMessageLog.id.desc()).limit(limit).all()]
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in reading message logs from database: "
+                + str(ex) + "\n" + traceback.format_exc())
+            return []
+
+    def scan(self, start, end, connection, batch_size=1000):
+        end = self._to_db_time(end)
+        last_timestamp, last_id = self._to_db_time(start), -1
+        while True:
+            try:
+                records = [dumpd(r) for r in connection.query(
+                    SQLAlchemyMessageLog).filter(
+                        SQLAlchemyMessageLog.request_timestamp < end,
+                        or_(SQLAlchemyMessageLog.request_timestamp >
+                            last_timestamp,
+                            and_(SQLAlchemyMessageLog.request_timestamp ==
+                                 last_timestamp,
+                                 SQLAlchemyMessageLog.id > last_id))
+                    ).order_by(
+                        SQLAlchemyMessageLog.request_timestamp,
+                        SQLAlchemyMessageLog.id).limit(batch_size).all()]
+            except Exception as ex:
+                self.logger.error(
+                    "Error occured in reading message logs from database: "
+                    + str(ex) + "\n" + traceback.format_exc())
+                return
+            yield from records
+            if len(records) < batch_size:
+                return
+            last_timestamp = records[-1]["request_timestamp"]
+            last_id = records[-1]["id"]
+
     def save(self, request, response, context, connection):
         """
         Write message log
@@ -402,14 +628,41 @@ class SQLAlchemyMessageLogStore(MessageLogStore):
         connection : Connection
             Connection
         """
-        f = self._flatten(request, response, context)
-        messagelog = SQLAlchemyMessageLog.from_dict(f)
-        messagelog.request_json = request.to_json()
-        messagelog.response_json = response.to_json()
-        messagelog.context_json = context.to_json()
-        connection.add(instance=messagelog)
+        connection.add(instance=self._to_store(request, response, context))
         connection.commit()
 
+    def save_many(self, logs, connection):
+        """
+        Write many message logs without commit
+
+        Parameters
+        ----------
+        logs : iterable of tuple
+            Tuples of request, response and context
+        connection : Connection
+            Connection
+        """
+        connection.add_all([self._to_store(*log) for log in logs])
+
+    def save_records(self, records, connection):
+        """
+        Write many message logs already serialized by `_serialize`
+        without commit
+
+        Parameters
+        ----------
+        records : iterable of dict
+            Values of columns of message logs
+        connection : Connection
+            Connection
+        """
+        connection.add_all(
+            [SQLAlchemyMessageLog.from_dict(r) for r in records])
+
+    def _to_store(self, request, response, context):
+        return SQLAlchemyMessageLog.from_dict(
+            self._serialize(request, response, context))
+
 
 class SQLAlchemyStores(StoreSet):
     connection_provider = SQLAlchemyConnectionProvider
@@ -46,6 +46,7 @@ class SQLDBContextStore(ContextStore):
             "prepare_check": "select id from dbo.sysobjects where id = object_id('{0}')".format(self.table_name),
             "prepare_create": "create table {0} (channel NVARCHAR(20), channel_user_id NVARCHAR(100), timestamp DATETIME2, topic_name NVARCHAR(100), topic_status NVARCHAR(100), topic_previous NVARCHAR(4000), topic_priority INT, data NVARCHAR(MAX), primary key(channel, channel_user_id))".format(self.table_name),
             "get_context": "select top 1 * from {0} where channel=? and channel_user_id=?".format(self.table_name),
+            "get_contexts": "select * from {0} where channel=? and channel_user_id in ({{}})".format(self.table_name),
             "save_context": """
                             merge into {0} as A
                             using (select ? as channel, ? as channel_user_id, ? as timestamp, ? as topic_name, ? as topic_status, ? as topic_previous, ? as topic_priority, ? as data) as B
@@ -76,6 +77,7 @@ class SQLDBUserStore(UserStore):
             "prepare_check": "select id from dbo.sysobjects where id = object_id('{0}')".format(self.table_name),
             "prepare_create": "create table {0} (channel NVARCHAR(20), channel_user_id NVARCHAR(100), user_id NVARCHAR(100), timestamp DATETIME2, name NVARCHAR(100), nickname NVARCHAR(100), profile_image_url NVARCHAR(500), data NVARCHAR(MAX), primary key(channel, channel_user_id))".format(self.table_name),
             "get_user": "select top 1 channel, channel_user_id, user_id, timestamp, name, nickname, profile_image_url, data from {0} where channel=? and channel_user_id=?".format(self.table_name),
+            "get_users": "select channel, channel_user_id, user_id, timestamp, name, nickname, profile_image_url, data from {0} where channel=? and channel_user_id in ({{}})".format(self.table_name),
             "add_user": "insert into {0} (channel, channel_user_id, user_id, timestamp, name, nickname, profile_image_url, data) values (?,?,?,?,?,?,?,?)".format(self.table_name),
             "save_user": "update {0} set timestamp=?, name=?, nickname=?, profile_image_url=?, data=? where channel=? and channel_user_id=?".format(self.table_name),
         }
@@ -153,6 +155,42 @@ class SQLDBMessageLogStore(MessageLogStore):
                 values (
                     ?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
                 """.format(self.table_name),
+            "prepare_index": [
+                "create index ix_{0}_user on {0} "
+                "(channel, channel_user_id, request_timestamp)"
+                .format(self.table_name),
+                "create index ix_{0}_timestamp on {0} "
+                "(request_timestamp)".format(self.table_name),
+            ],
+            "get_history": """
+                select * from {0}
+                where channel=? and channel_user_id=?
+                order by request_timestamp desc, id desc offset 0 rows fetch next ? rows only
+                """.format(self.table_name),
+            "get_history_before": """
+                select * from {0}
+                where channel=? and channel_user_id=? and request_timestamp<?
+                order by request_timestamp desc, id desc offset 0 rows fetch next ? rows only
+                """.format(self.table_name),
+            "get_history_before_id": """
+                select * from {0}
+                where channel=? and channel_user_id=? and (request_timestamp<?
+                    or (request_timestamp=? and id<?))
+                order by request_timestamp desc, id desc offset 0 rows fetch next ? rows only
+                """.format(self.table_name),
+            "list_partitions": "select name from sys.tables where name like '{0}_%'".format(self.table_name),
+            "drop_table": "drop table {0}".format(self.table_name),
+            "delete_before": """
+                delete from {0} where id in (
+                    select id from {0} where request_timestamp<?
+                    order by request_timestamp offset 0 rows fetch next ? rows only)
+                """.format(self.table_name),
+            "scan": """
+                select * from {0}
+                where request_timestamp<? and (request_timestamp>?
+                    or (request_timestamp=? and id>?))
+                order by request_timestamp, id offset 0 rows fetch next ? rows only
+                """.format(self.table_name),
         }
 
 
@@ -1,5 +1,6 @@
 """ Set of data stores and connection provider using SQLite """
 import sqlite3
+from datetime import datetime
 
 from .connectionprovider import ConnectionProvider
 from .contextstore import ContextStore
@@ -26,8 +27,10 @@ class SQLiteConnectionProvider(ConnectionProvider):
         connection : Connection
             Database connection
         """
+        # allow to use the connection at the worker threads of chat_async
         connection = sqlite3.connect(
-            self.connection_str, detect_types=sqlite3.PARSE_DECLTYPES)
+            self.connection_str, detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False)
         connection.row_factory = sqlite3.Row
         return connection
 
@@ -64,6 +67,14 @@ class SQLiteContextStore(ContextStore):
                 where
                     channel=? and channel_user_id=? limit 1
                 """.format(self.table_name),
+            "get_contexts": """
+                select
+                    channel, channel_user_id, timestamp, topic_name,
+                    topic_status, topic_previous, topic_priority, data
+                from {0}
+                where
+                    channel=? and channel_user_id in ({{}})
+                """.format(self.table_name),
             "save_context": """
                 replace into {0} (
                     channel, channel_user_id, timestamp, topic_name,
@@ -107,6 +118,14 @@ class SQLiteUserStore(UserStore):
                 where
                     channel=? and channel_user_id=? limit 1
                 """.format(self.table_name),
+            "get_users": """
+                select
+                    channel, channel_user_id, user_id,timestamp, name,
+                    nickname, profile_image_url, data
+                from {0}
+                where
+                    channel=? and channel_user_id in ({{}})
+                """.format(self.table_name),
             "add_user": """
                 insert into {0} (
                     channel, channel_user_id, user_id, timestamp, name,
@@ -139,6 +158,9 @@ class SQLiteMessageLogStore(MessageLogStore):
         sqls : dict
             SQLs used in MessageLogStore
         """
+        columns = ", ".join(["id"] + [
+            "cast(request_timestamp as text) as request_timestamp"
+            if c == "request_timestamp" else c for c in self.COLUMNS])
         return {
             "prepare_check": """
                 select * from sqlite_master where type='table' and name='{0}'
@@ -198,8 +220,62 @@ class SQLiteMessageLogStore(MessageLogStore):
                 values (
                     ?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
                 """.format(self.table_name),
+            "prepare_index": [
+                "create index if not exists ix_{0}_user on {0} "
+                "(channel, channel_user_id, request_timestamp)"
+                .format(self.table_name),
+                "create index if not exists ix_{0}_timestamp on {0} "
+                "(request_timestamp)".format(self.table_name),
+            ],
+            "get_history": """
+                select {1} from {0}
+                where channel=? and channel_user_id=?
+                order by request_timestamp desc, id desc limit ?
+                """.format(self.table_name, columns),
+            "get_history_before": """
+                select {1} from {0}
+                where channel=? and channel_user_id=? and request_timestamp<?
+                order by request_timestamp desc, id desc limit ?
+                """.format(self.table_name, columns),
+            "get_history_before_id": """
+                select {1} from {0}
+                where channel=? and channel_user_id=? and (request_timestamp<?
+                    or (request_timestamp=? and id<?))
+                order by request_timestamp desc, id desc limit ?
+                """.format(self.table_name, columns),
+            "list_partitions": """
+                select name from sqlite_master
+                where type='table' and name like '{0}_%'
+                """.format(self.table_name),
+            "drop_table": "drop table {0}".format(self.table_name),
+            "delete_before": """
+                delete from {0} where id in (
+                    select id from {0} where request_timestamp<?
+                    order by request_timestamp limit ?)
+                """.format(self.table_name),
+            "scan": """
+                select {1} from {0}
+                where request_timestamp<? and (request_timestamp>?
+                    or (request_timestamp=? and id>?))
+                order by request_timestamp, id limit ?
+                """.format(self.table_name, columns),
         }
 
+    def prepare_table(self, connection, prepare_params=None):
+        created = super().prepare_table(connection, prepare_params)
+        if not created:
+            # add indexes to the table created by former versions
+            self.prepare_index(connection)
+        return created
+
+    def _to_record(self, cursor, row):
+        record = super()._to_record(cursor, row)
+        # read as text to keep timezone that default converter drops
+        if isinstance(record.get("request_timestamp"), str):
+            record["request_timestamp"] = datetime.fromisoformat(
+                record["request_timestamp"])
+        return record
+
 
 class SQLiteStores(StoreSet):
     """
@@ -0,0 +1,85 @@
+""" Connection wrapper to commit all changes in a turn at once """
+
+
+class UnitOfWork:
+    """
+    Connection wrapper that defers `commit()` called by data stores
+    until `complete()`, to commit all changes in a turn at once.
+    Other attributes are delegated to the original connection.
+
+    Attributes
+    ----------
+    connection : Connection
+        Original database connection
+    has_changes : bool
+        True if commit is requested and not completed yet
+    """
+    def __init__(self, connection):
+        """
+        Parameters
+        ----------
+        connection : Connection
+            Original database connection
+        """
+        self.connection = connection
+        self.has_changes = False
+        self._rollback_callbacks = []
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def commit(self):
+        """
+        Defer commit until `complete()`
+
+        """
+        self.has_changes = True
+
+    def complete(self):
+        """
+        Commit all changes requested in this unit of work
+
+        """
+        if self.has_changes and hasattr(self.connection, "commit"):
+            self.connection.commit()
+        self.has_changes = False
+        self._rollback_callbacks.clear()
+
+    def on_rollback(self, callback):
+        """
+        Register the function called when this unit of work is rolled back,
+        to discard the changes kept out of the database like caches.
+        Functions are called in the reverse order of registration
+
+        Parameters
+        ----------
+        callback : callable
+            Function called without arguments
+        """
+        self._rollback_callbacks.append(callback)
+
+    def rollback(self):
+        """
+        Discard all changes in this unit of work
+
+        """
+        if hasattr(self.connection, "rollback"):
+            self.connection.rollback()
+        self.has_changes = False
+        callbacks, self._rollback_callbacks = self._rollback_callbacks, []
+        for callback in reversed(callbacks):
+            callback()
+
+    def close(self):
+        """
+        Close original connection
+
+        """
+        if hasattr(self.connection, "close"):
+            self.connection.close()
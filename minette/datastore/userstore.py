@@ -6,6 +6,8 @@ from datetime import datetime
 from pytz import timezone as tz
 
 from ..serializer import dumps, loads
+from ..codec import get_codec, get_compressor
+from ..utils import run_in_executor
 from ..models import User
 
 
@@ -23,12 +25,34 @@ class UserStore(ABC):
         Logger
     table_name : str
         Database table name for read/write user data
+    datetime_decoding : str
+        How to decode datetime in data. "schema" or "legacy"
+    codec : minette.codec.Codec
+        Codec to encode data. Data written by any codec can be read
+    compressor : minette.codec.Compressor
+        Compressor for large data. Call `compressor.stats()` to get
+        the bytes saved by compression
+    touch_interval : int
+        Seconds to update the timestamp of the user not changed.
+        None not to save unchanged users
     sqls : dict
         SQLs used in ContextStore
+    placeholder : str
+        Parameter marker of the database driver
+    bulk_size : int
+        Max number of keys in a query of `get_many`
+    json_data : bool
+        True if the data column accepts only JSON. Binary codecs are
+        replaced with "json" and data are not compressed
     """
+    placeholder = "?"
+    bulk_size = 500
+    json_data = False
 
     def __init__(self, config=None, timezone=None, logger=None,
-                 table_name="user", **kwargs):
+                 table_name="user", *, datetime_decoding=None, codec=None,
+                 compression=None, compression_threshold=None,
+                 touch_interval=None, **kwargs):
         """
         Parameters
         ----------
@@ -40,12 +64,46 @@ class UserStore(ABC):
             Logger
         table_name : str, default "user"
             Database table name for read/write user data
+        datetime_decoding : str, default None
+            Set "legacy" to decode all strings like datetime in data.
+            Use `datetime_decoding` in configuration file by default
+        codec : str, default None
+            Codec to encode data like "orjson" or "msgpack".
+            Use `store_codec` in configuration file or "json" by default
+        compression : str, default None
+            Compression for large data like "zlib" or "lz4".
+            Use `store_compression` in configuration file or no compression
+        compression_threshold : int, default None
+            Data smaller than this (in bytes) are not compressed.
+            Use `store_compression_threshold` in configuration file or 1024
+        touch_interval : int, default None
+            Seconds to update the timestamp of the user not changed.
+            0 saves users every turn. Use `user_touch_interval` in
+            configuration file or users are saved only when changed
         """
         self.config = config
         self.timezone = timezone or (
             tz(config.get("timezone", default="UTC")) if config else tz("UTC"))
         self.logger = logger if logger else getLogger(__name__)
         self.table_name = table_name
+        self.datetime_decoding = datetime_decoding or (
+            config.get("datetime_decoding") if config else None)
+        self.codec = get_codec(
+            codec or (config.get("store_codec") if config else None))
+        self.compressor = get_compressor(
+            compression or (
+                config.get("store_compression") if config else None),
+            compression_threshold or (
+                int(config.get("store_compression_threshold") or 0)
+                if config else None) or None)
+        if self.json_data:
+            if self.codec.binary:
+                self.codec = get_codec("json")
+            self.compressor = None
+        if touch_interval is None and config and \
+                config.get("user_touch_interval") is not None:
+            touch_interval = int(config.get("user_touch_interval"))
+        self.touch_interval = touch_interval
         self.sqls = self.get_sqls()
 
     @abstractmethod
@@ -99,33 +157,159 @@ class UserStore(ABC):
             cursor.execute(self.sqls["get_user"], (channel, channel_user_id))
             row = cursor.fetchone()
             if row is not None:
-                # convert to dict
-                if isinstance(row, dict):
-                    record = row
-                else:
-                    record = dict(
-                        zip([column[0] for column in cursor.description], row))
-                # convert type
-                record["data"] = loads(record["data"])
-                # restore user
-                user.id = record["user_id"]
-                user.name = record["name"]
-                user.nickname = record["nickname"]
-                user.profile_image_url = record["profile_image_url"]
-                user.data = record["data"] if record["data"] else {}
+                self._restore(user, self._to_record(cursor, row))
             else:
-                cursor.execute(self.sqls["add_user"], (
-                    channel, channel_user_id, user.id,
-                    datetime.now(self.timezone), user.name, user.nickname,
-                    user.profile_image_url, None)
-                )
+                params = self._to_new_params(user)
+                cursor.execute(self.sqls["add_user"], params)
                 connection.commit()
+                user.mark_saved(params[3])
         except Exception as ex:
             self.logger.error(
                 "Error occured in restoring user from database: "
                 + str(ex) + "\n" + traceback.format_exc())
         return user
 
+    def get_many(self, keys, connection):
+        """
+        Get users for many pairs of channel and channel_user_id at once.
+        Users not found are added with one statement without commit,
+        so commit the connection after calling.
+        Stores that don't provide `get_users` SQL get them one by one.
+
+        Parameters
+        ----------
+        keys : iterable of tuple (str, str)
+            Pairs of channel and channel_user_id
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        users : dict
+            Users keyed by (channel, channel_user_id)
+        """
+        keys = list(dict.fromkeys(keys))
+        if "get_users" not in self.sqls:
+            return {k: self.get(k[0], k[1], connection) for k in keys}
+        users = {}
+        ids_by_channel = {}
+        for channel, channel_user_id in keys:
+            users[(channel, channel_user_id)] = \
+                User(channel=channel, channel_user_id=channel_user_id)
+            if channel_user_id:
+                ids_by_channel.setdefault(channel, []).append(channel_user_id)
+        try:
+            cursor = connection.cursor()
+            new_users = []
+            for channel, ids in ids_by_channel.items():
+                for i in range(0, len(ids), self.bulk_size):
+                    chunk = ids[i:i + self.bulk_size]
+                    cursor.execute(
+                        self.sqls["get_users"].format(
+                            ", ".join([self.placeholder] * len(chunk))),
+                        (channel, *chunk))
+                    found = set()
+                    for row in cursor.fetchall():
+                        record = self._to_record(cursor, row)
+                        user = users.get((channel, record["channel_user_id"]))
+                        if user is not None:
+                            self._restore(user, record)
+                            found.add(record["channel_user_id"])
+                    new_users.extend(
+                        [users[(channel, cuid)] for cuid in chunk
+                         if cuid not in found])
+            if new_users:
+                params = [self._to_new_params(u) for u in new_users]
+                cursor.executemany(self.sqls["add_user"], params)
+                for user, p in zip(new_users, params):
+                    user.mark_saved(p[3])
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in restoring users from database: "
+                + str(ex) + "\n" + traceback.format_exc())
+        return users
+
+    def _to_record(self, cursor, row):
+        # convert to dict
+        if isinstance(row, dict):
+            return row
+        else:
+            return dict(
+                zip([column[0] for column in cursor.description], row))
+
+    def _restore(self, user, record):
+        # convert type
+        record["data"] = loads(
+            record["data"], datetime_decoding=self.datetime_decoding,
+            codec=self.codec)
+        # restore user
+        user.id = record["user_id"]
+        user.name = record["name"]
+        user.nickname = record["nickname"]
+        user.profile_image_url = record["profile_image_url"]
+        user.data = record["data"] if record["data"] else {}
+        user.mark_saved(self._to_local_time(record.get("timestamp")))
+
+    def _to_local_time(self, timestamp):
+        if timestamp is None or not isinstance(timestamp, datetime):
+            return None
+        elif timestamp.tzinfo:
+            return timestamp.astimezone(self.timezone)
+        else:
+            return self.timezone.localize(timestamp)
+
+    def should_save(self, user):
+        """
+        Check whether the user should be saved
+
+        Parameters
+        ----------
+        user : minette.User
+            User
+
+        Returns
+        -------
+        should_save : bool
+            True if user is changed or `touch_interval` has passed
+            since the last save
+        """
+        if user.is_changed():
+            return True
+        if self.touch_interval is None:
+            return False
+        if user.saved_at is None:
+            return True
+        gap = datetime.now(self.timezone) - user.saved_at
+        return gap.total_seconds() >= self.touch_interval
+
+    def _to_new_params(self, user):
+        return (
+            user.channel, user.channel_user_id, user.id,
+            datetime.now(self.timezone), user.name, user.nickname,
+            user.profile_image_url, None)
+
+    async def get_async(self, channel, channel_user_id, connection):
+        """
+        Get user by channel and channel_user_id without blocking
+        the event loop. Override this method to use the native async driver.
+
+        Parameters
+        ----------
+        channel : str
+            Channel
+        channel_user_id : str
+            Channel user ID
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        user : minette.User
+            User
+        """
+        return await run_in_executor(
+            self.get, channel, channel_user_id, connection)
+
     def save(self, user, connection):
         """
         Save user
@@ -137,12 +321,56 @@ class UserStore(ABC):
         connection : Connection
             Connection
         """
-        user_dict = user.to_dict()
-        serialized_data = dumps(user_dict["data"])
+        params = self._to_params(user)
         cursor = connection.cursor()
-        cursor.execute(self.sqls["save_user"], (
+        cursor.execute(self.sqls["save_user"], params)
+        connection.commit()
+        user.mark_saved(params[0])
+
+    def save_many(self, users, connection):
+        """
+        Save many users with one statement.
+        This method doesn't commit, so commit the connection after calling.
+        Stores that don't provide `save_user` SQL save them one by one.
+
+        Parameters
+        ----------
+        users : iterable of minette.User
+            Users to save
+        connection : Connection
+            Connection
+        """
+        users = list(users)
+        if "save_user" not in self.sqls:
+            for user in users:
+                self.save(user, connection)
+            return
+        if users:
+            params = [self._to_params(u) for u in users]
+            cursor = connection.cursor()
+            cursor.executemany(self.sqls["save_user"], params)
+            for user, p in zip(users, params):
+                user.mark_saved(p[0])
+
+    def _to_params(self, user):
+        user_dict = user.to_dict()
+        serialized_data = dumps(
+            user_dict["data"], codec=self.codec, compressor=self.compressor)
+        return (
             datetime.now(self.timezone), user.name, user.nickname,
             user.profile_image_url, serialized_data, user.channel,
             user.channel_user_id)
-        )
-        connection.commit()
+
+    async def save_async(self, user, connection):
+        """
+        Save user without blocking the event loop.
+        Override this method to use the native async driver.
+
+        Parameters
+        ----------
+        user : minette.User
+            User to save
+        connection : Connection
+            Connection
+        """
+        await run_in_executor(self.save, user, connection)
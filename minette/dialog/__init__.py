@@ -4,4 +4,7 @@ from .service import (
     ErrorDialogService,
 )
 from .router import DialogRouter
+from .patternrouter import PatternDialogRouter
+from .classifierrouter import ClassifierDialogRouter, TfidfIntentClassifier
+from .faqservice import FAQDialogService, FAQIndex, BM25Index
 from .dependency import DependencyContainer
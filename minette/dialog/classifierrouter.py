@@ -0,0 +1,382 @@
+""" DialogRouter that classifies intent by TF-IDF of the words """
+import csv
+import json
+import os
+import traceback
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ..models import Priority
+from .router import DialogRouter
+
+
+def _to_tokens(words):
+    # base form of words. surface for the words without base form
+    if words and not isinstance(words[0], str):
+        words = [w.word if w.word and w.word != "*" else w.surface
+                 for w in words]
+    return [w.lower() for w in words if w and not w.isspace()]
+
+
+class TfidfIntentClassifier:
+    """
+    Intent classifier that compares the TF-IDF vector of the words with
+    the normalized centroid of each intent
+
+    Attributes
+    ----------
+    tagger : minette.Tagger
+        Tagger to parse the texts passed to `fit`
+    vocabulary : dict
+        Index of each token
+    intents : list of str
+        Intents
+    idf : numpy.ndarray
+        Inverse document frequency of each token
+    weights : numpy.ndarray
+        Weight matrix (intents x tokens)
+    """
+    def __init__(self, tagger=None):
+        """
+        Parameters
+        ----------
+        tagger : minette.Tagger, default None
+            Tagger to parse the texts passed to `fit`.
+            Texts are split by whitespace if None
+        """
+        if np is None:
+            raise ImportError(
+                "NumPy is required to use TfidfIntentClassifier")
+        self.tagger = tagger
+        self.vocabulary = {}
+        self.intents = []
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.weights = np.zeros((0, 0), dtype=np.float32)
+
+    def tokenize(self, document):
+        """
+        Convert document to tokens
+
+        Parameters
+        ----------
+        document : str or list of str or list of minette.WordNode
+            Text, tokens or words
+
+        Returns
+        -------
+        tokens : list of str
+            Tokens
+        """
+        if isinstance(document, str):
+            document = self.tagger.parse(document) if self.tagger \
+                else document.split()
+        return _to_tokens(list(document))
+
+    def fit(self, documents, intents):
+        """
+        Train classifier
+
+        Parameters
+        ----------
+        documents : list
+            Texts, tokens or words. See `tokenize`
+        intents : list of str
+            Intent of each document
+
+        Returns
+        -------
+        self : TfidfIntentClassifier
+            Trained classifier
+        """
+        tokens_list = [self.tokenize(d) for d in documents]
+        df = Counter()
+        for tokens in tokens_list:
+            df.update(set(tokens))
+        self.vocabulary = {t: i for i, t in enumerate(sorted(df))}
+        self.intents = sorted(set(intents))
+        n_docs = len(tokens_list)
+        self.idf = np.array(
+            [np.log((1 + n_docs) / (1 + df[t])) + 1
+             for t in sorted(df)], dtype=np.float32)
+
+        intent_index = {intent: i for i, intent in enumerate(self.intents)}
+        weights = np.zeros(
+            (len(self.intents), len(self.vocabulary)), dtype=np.float32)
+        for tokens, intent in zip(tokens_list, intents):
+            indexes, values = self._to_vector(tokens)
+            weights[intent_index[intent], indexes] += values
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        self.weights = weights / norms
+        return self
+
+    def fit_csv(self, path, text_column="text", intent_column="intent",
+                encoding="utf-8"):
+        """
+        Train classifier with labelled CSV file
+
+        Parameters
+        ----------
+        path : str
+            Path to CSV file with header
+        text_column : str, default "text"
+            Column name of text
+        intent_column : str, default "intent"
+            Column name of intent
+        encoding : str, default "utf-8"
+            Encoding of the file
+
+        Returns
+        -------
+        self : TfidfIntentClassifier
+            Trained classifier
+        """
+        with open(path, encoding=encoding, newline="") as f:
+            rows = [r for r in csv.DictReader(f) if r[intent_column]]
+        return self.fit(
+            [r[text_column] for r in rows], [r[intent_column] for r in rows])
+
+    def fit_messagelog(self, connection, table_name="messagelog"):
+        """
+        Train classifier with the text and intent in message log
+
+        Parameters
+        ----------
+        connection : Connection
+            Connection of the database of message log
+        table_name : str, default "messagelog"
+            Table name of message log
+
+        Returns
+        -------
+        self : TfidfIntentClassifier
+            Trained classifier
+        """
+        cursor = connection.cursor()
+        cursor.execute(
+            "select request_text, request_intent from {0} "
+            "where request_intent is not null and request_intent <> ''"
+            .format(table_name))
+        rows = [r for r in cursor.fetchall() if r[0]]
+        return self.fit([r[0] for r in rows], [r[1] for r in rows])
+
+    def _to_vector(self, tokens):
+        # indexes and L2-normalized TF-IDF values of known tokens
+        counts = Counter(
+            self.vocabulary[t] for t in tokens if t in self.vocabulary)
+        if not counts:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float32)
+        indexes = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        values = np.fromiter(
+            counts.values(), dtype=np.float32, count=len(counts)) * \
+            self.idf[indexes]
+        return indexes, values / np.linalg.norm(values)
+
+    def scores(self, documents):
+        """
+        Get cosine similarity of documents to each intent at once
+
+        Parameters
+        ----------
+        documents : list
+            Texts, tokens or words. See `tokenize`
+
+        Returns
+        -------
+        scores : numpy.ndarray
+            Scores (documents x intents)
+        """
+        vectors = [self._to_vector(self.tokenize(d)) for d in documents]
+        scores = np.zeros((len(vectors), len(self.intents)), dtype=np.float32)
+        lengths = np.array([len(v[0]) for v in vectors], dtype=np.intp)
+        if not lengths.sum():
+            return scores
+        indexes = np.concatenate([v[0] for v in vectors])
+        values = np.concatenate([v[1] for v in vectors])
+        # sum weights of the tokens in each document
+        contributions = self.weights[:, indexes] * values
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        has_tokens = lengths > 0
+        scores[has_tokens] = np.add.reduceat(
+            contributions, starts[has_tokens], axis=1).T
+        return scores
+
+    def predict(self, documents, threshold=0.0):
+        """
+        Predict intents of documents
+
+        Parameters
+        ----------
+        documents : list
+            Texts, tokens or words. See `tokenize`
+        threshold : float, default 0.0
+            Min score to accept the intent
+
+        Returns
+        -------
+        predictions : list of tuple (str, float)
+            Intent and score. Intent is None when score is not
+            greater than threshold
+        """
+        if not self.intents:
+            return [(None, 0.0) for _ in documents]
+        scores = self.scores(documents)
+        best = scores.argmax(axis=1)
+        return [
+            (self.intents[i] if s > threshold else None, float(s))
+            for i, s in zip(best, scores[np.arange(len(best)), best])]
+
+    def save(self, path):
+        """
+        Save model to directory
+
+        Parameters
+        ----------
+        path : str
+            Directory to save model
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "weights.npy"), self.weights)
+        np.save(os.path.join(path, "idf.npy"), self.idf)
+        with open(os.path.join(path, "model.json"), "w",
+                  encoding="utf-8") as f:
+            json.dump({"intents": self.intents,
+                       "vocabulary": self.vocabulary}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path, tagger=None, mmap=True):
+        """
+        Load model from directory
+
+        Parameters
+        ----------
+        path : str
+            Directory of model
+        tagger : minette.Tagger, default None
+            Tagger to parse texts
+        mmap : bool, default True
+            Map the weight matrix to memory instead of reading it,
+            to share it among the processes
+
+        Returns
+        -------
+        classifier : TfidfIntentClassifier
+            Classifier loaded
+        """
+        classifier = cls(tagger=tagger)
+        mmap_mode = "r" if mmap else None
+        classifier.weights = np.load(
+            os.path.join(path, "weights.npy"), mmap_mode=mmap_mode)
+        classifier.idf = np.load(os.path.join(path, "idf.npy"))
+        with open(os.path.join(path, "model.json"), encoding="utf-8") as f:
+            model = json.load(f)
+        classifier.intents = model["intents"]
+        classifier.vocabulary = model["vocabulary"]
+        return classifier
+
+
+class ClassifierDialogRouter(DialogRouter):
+    """
+    DialogRouter that classifies intent by the base forms of
+    `request.words` with `TfidfIntentClassifier`
+
+    Attributes
+    ----------
+    classifier : TfidfIntentClassifier
+        Classifier of intent
+    threshold : float
+        Min score to accept the intent classified
+    intent_priority : int
+        Priority of the intent classified
+    """
+    def __init__(self, config=None, timezone=None, logger=None,
+                 default_dialog_service=None, intent_resolver=None, *,
+                 classifier=None, threshold=None, intent_priority=None,
+                 **kwargs):
+        """
+        Parameters
+        ----------
+        config : minette.Config, default None
+            Configuration
+        timezone : pytz.timezone, default None
+            Timezone
+        logger : logging.Logger, default None
+            Logger
+        default_dialog_service : minette.DialogService or type, default None
+            Dialog service used when intent is not clear.
+        classifier : TfidfIntentClassifier or str, default None
+            Classifier or the directory of the model to load.
+            Use `intent_model` in configuration file by default
+        threshold : float, default None
+            Min score to accept the intent classified.
+            Use `intent_threshold` in configuration file or 0.3 by default
+        intent_priority : int, default None
+            Priority of the intent classified. Priority.Normal by default
+        """
+        super().__init__(
+            config=config, timezone=timezone, logger=logger,
+            default_dialog_service=default_dialog_service,
+            intent_resolver=intent_resolver, **kwargs)
+        classifier = classifier or \
+            (config.get("intent_model") if config else None)
+        if isinstance(classifier, str):
+            classifier = TfidfIntentClassifier.load(classifier)
+        self.classifier = classifier
+        if threshold is None:
+            threshold = float(
+                (config.get("intent_threshold") if config else None) or 0.3)
+        self.threshold = threshold
+        self.intent_priority = intent_priority or Priority.Normal
+
+    def extract_intent(self, request, context, connection):
+        """
+        Classify intent of request message
+
+        Parameters
+        ----------
+        request : minette.Message
+            Request message
+        context : minette.Context
+            Context
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        response : tuple of (str, dict, int)
+            Intent, entities and priority
+        """
+        return self.extract_intents([request])[0]
+
+    def extract_intents(self, requests):
+        """
+        Classify intents of many request messages at once
+
+        Parameters
+        ----------
+        requests : list of minette.Message
+            Request messages
+
+        Returns
+        -------
+        extracted : list of tuple (str, dict, int)
+            Intent, entities and priority of each request. Intent and
+            entities in request are returned when intent is not classified
+        """
+        predictions = [(None, 0.0)] * len(requests)
+        if self.classifier is not None:
+            try:
+                predictions = self.classifier.predict(
+                    [r.words for r in requests], self.threshold)
+            except Exception as ex:
+                self.logger.error(
+                    "Error occured in classifying intent: "
+                    + str(ex) + "\n" + traceback.format_exc())
+        return [
+            (intent, {}, self.intent_priority) if intent
+            else (r.intent, r.entities, r.intent_priority)
+            for r, (intent, _) in zip(requests, predictions)]
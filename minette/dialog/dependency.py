@@ -8,7 +8,8 @@ class DependencyContainer:
             setattr(self, k, v)
         # set dialog specific dependencies
         if dependency_rules:
-            dialog_dependencies = dependency_rules.get(type(dialog))
+            dialog_dependencies = dependency_rules.get(
+                dialog if isinstance(dialog, type) else type(dialog))
             if dialog_dependencies:
                 for k, v in dialog_dependencies.items():
                     setattr(self, k, v)
@@ -0,0 +1,482 @@
+""" DialogService that answers FAQ retrieved by BM25 """
+from array import array
+from collections import defaultdict
+import heapq
+import json
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+from .service import DialogService
+from .classifierrouter import _to_tokens
+
+
+class BM25Index:
+    """
+    Inverted index to search documents by BM25. Postings are kept as
+    arrays of int, and the index loaded from file refers the postings
+    in the memory-mapped file until they are updated.
+
+    Attributes
+    ----------
+    k1 : float
+        Parameter of BM25 to saturate term frequency
+    b : float
+        Parameter of BM25 to normalize document length
+    doc_count : int
+        Number of documents not removed
+    """
+    MAGIC = b"MNTBM25\x01"
+
+    def __init__(self, k1=1.5, b=0.75):
+        """
+        Parameters
+        ----------
+        k1 : float, default 1.5
+            Parameter of BM25 to saturate term frequency
+        b : float, default 0.75
+            Parameter of BM25 to normalize document length
+        """
+        self.k1 = k1
+        self.b = b
+        # term -> (doc ids, term frequencies)
+        self._postings = {}
+        self._doc_lengths = array("i")
+        self._removed = set()
+        self._total_length = 0
+        self._lock = threading.Lock()
+        self._mmap = None
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    @property
+    def doc_count(self):
+        return len(self._doc_lengths) - len(self._removed)
+
+    def add(self, tokens):
+        """
+        Add document
+
+        Parameters
+        ----------
+        tokens : list of str
+            Tokens of document
+
+        Returns
+        -------
+        doc_id : int
+            Id of the document added
+        """
+        counts = defaultdict(int)
+        for t in tokens:
+            counts[t] += 1
+        with self._lock:
+            doc_id = len(self._doc_lengths)
+            for t, count in counts.items():
+                posting = self._postings.get(t)
+                if posting is None or not isinstance(posting[0], array):
+                    # copy postings in the mapped file to update
+                    posting = (array("i", posting[0] if posting else []),
+                               array("i", posting[1] if posting else []))
+                    self._postings[t] = posting
+                posting[0].append(doc_id)
+                posting[1].append(count)
+            self._doc_lengths.append(len(tokens))
+            self._total_length += len(tokens)
+        return doc_id
+
+    def remove(self, doc_id):
+        """
+        Remove document. Postings are kept and skipped at search
+
+        Parameters
+        ----------
+        doc_id : int
+            Id of the document
+        """
+        with self._lock:
+            if doc_id not in self._removed:
+                self._removed.add(doc_id)
+                self._total_length -= self._doc_lengths[doc_id]
+
+    def search(self, tokens, top_k=1):
+        """
+        Search documents
+
+        Parameters
+        ----------
+        tokens : list of str
+            Tokens of query
+        top_k : int, default 1
+            Max number of documents returned
+
+        Returns
+        -------
+        results : list of tuple (int, float)
+            Id and score of documents in descending order of score
+        """
+        with self._lock:
+            return self._search(tokens, top_k)
+
+    def _search(self, tokens, top_k):
+        doc_count = self.doc_count
+        if not doc_count:
+            return []
+        avgdl = self._total_length / doc_count
+        k1, b = self.k1, self.b
+        doc_lengths = self._doc_lengths
+        removed = self._removed
+        scores = defaultdict(float)
+        # only the postings of query terms are scanned
+        for t in set(tokens):
+            posting = self._postings.get(t)
+            if posting is None:
+                continue
+            doc_ids, tfs = posting
+            df = len(doc_ids)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for doc_id, tf in zip(doc_ids, tfs):
+                if doc_id in removed:
+                    continue
+                norm = k1 * (1 - b + b * doc_lengths[doc_id] / avgdl)
+                scores[doc_id] += idf * tf * (k1 + 1) / (tf + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda s: s[1])
+
+    def save(self, path, extra=None):
+        """
+        Save index to file. The file is replaced at once, so the index
+        loaded from the same file can be saved to it
+
+        Parameters
+        ----------
+        path : str
+            Path to file
+        extra : dict, default None
+            JSON serializable values saved with index
+        """
+        with self._lock:
+            terms = {}
+            offset = len(self._doc_lengths)
+            for t, (doc_ids, _) in self._postings.items():
+                terms[t] = [offset, len(doc_ids)]
+                offset += len(doc_ids) * 2
+            header = json.dumps({
+                "k1": self.k1, "b": self.b, "terms": terms,
+                "removed": sorted(self._removed), "extra": extra
+            }, ensure_ascii=False).encode("utf-8")
+            # align arrays to 8 bytes
+            header += b" " * (-(len(self.MAGIC) + 8 + len(header)) % 8)
+            # write to temporary file not to truncate the mapped file
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(path)))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(self.MAGIC)
+                    f.write(struct.pack("<Q", len(header)))
+                    f.write(header)
+                    array("i", self._doc_lengths).tofile(f)
+                    for doc_ids, tfs in self._postings.values():
+                        array("i", doc_ids).tofile(f)
+                        array("i", tfs).tofile(f)
+                os.replace(temp_path, path)
+            except Exception:
+                os.remove(temp_path)
+                raise
+            if self._mmap is not None:
+                # map the new file and release the old one
+                old_mmap = self._mmap
+                self._map(path)
+                try:
+                    old_mmap.close()
+                except BufferError:
+                    # still referred. closed when released
+                    pass
+
+    def _map(self, path):
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(self.MAGIC)] != self.MAGIC:
+            mapped.close()
+            raise ValueError("Not a BM25 index file: {}".format(path))
+        start = len(self.MAGIC) + 8
+        header_length = struct.unpack("<Q", mapped[len(self.MAGIC):start])[0]
+        header = json.loads(
+            mapped[start:start + header_length].decode("utf-8"))
+        ints = memoryview(mapped)[start + header_length:].cast("i")
+
+        self.k1, self.b = header["k1"], header["b"]
+        self._mmap = mapped
+        # document lengths are copied because they are updated by add
+        lengths_end = min(
+            [o for o, _ in header["terms"].values()] or [len(ints)])
+        self._doc_lengths = array("i", ints[:lengths_end])
+        self._removed = set(header["removed"])
+        self._total_length = sum(
+            l for i, l in enumerate(self._doc_lengths)
+            if i not in self._removed)
+        self._postings = {
+            t: (ints[o:o + n], ints[o + n:o + n * 2])
+            for t, (o, n) in header["terms"].items()}
+        return header["extra"]
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load index from file. Postings are memory-mapped
+
+        Parameters
+        ----------
+        path : str
+            Path to file
+
+        Returns
+        -------
+        index : BM25Index
+            Index loaded
+        extra : dict
+            Values saved with index
+        """
+        index = cls()
+        extra = index._map(path)
+        return index, extra
+
+
+class FAQIndex:
+    """
+    Index of FAQ entries searched by the words of question
+
+    Attributes
+    ----------
+    tagger : minette.Tagger
+        Tagger to parse texts. Texts are split by whitespace if None
+    entries : list of dict
+        FAQ entries with `question` and `answer`.
+        Removed entries are None
+    index : BM25Index
+        Inverted index of questions
+    """
+    def __init__(self, tagger=None, k1=1.5, b=0.75):
+        """
+        Parameters
+        ----------
+        tagger : minette.Tagger, default None
+            Tagger to parse texts. Texts are split by whitespace if None
+        k1 : float, default 1.5
+            Parameter of BM25 to saturate term frequency
+        b : float, default 0.75
+            Parameter of BM25 to normalize document length
+        """
+        self.tagger = tagger
+        self.entries = []
+        self.index = BM25Index(k1=k1, b=b)
+
+    def tokenize(self, document):
+        """
+        Convert document to tokens
+
+        Parameters
+        ----------
+        document : str or list of str or list of minette.WordNode
+            Text, tokens or words
+
+        Returns
+        -------
+        tokens : list of str
+            Tokens
+        """
+        if isinstance(document, str):
+            document = self.tagger.parse(document) if self.tagger \
+                else document.split()
+        return _to_tokens(list(document))
+
+    def add(self, question, answer, **attributes):
+        """
+        Add FAQ entry
+
+        Parameters
+        ----------
+        question : str
+            Question
+        answer : str
+            Answer
+        attributes : dict
+            Other JSON serializable attributes of the entry
+
+        Returns
+        -------
+        entry_id : int
+            Id of the entry
+        """
+        entry_id = self.index.add(self.tokenize(question))
+        entry = {"question": question, "answer": answer}
+        entry.update(attributes)
+        self.entries.append(entry)
+        return entry_id
+
+    def update(self, entry_id, question, answer, **attributes):
+        """
+        Replace FAQ entry. New id is issued for the entry
+
+        Parameters
+        ----------
+        entry_id : int
+            Id of the entry to replace
+        question : str
+            Question
+        answer : str
+            Answer
+        attributes : dict
+            Other JSON serializable attributes of the entry
+
+        Returns
+        -------
+        entry_id : int
+            New id of the entry
+        """
+        self.remove(entry_id)
+        return self.add(question, answer, **attributes)
+
+    def remove(self, entry_id):
+        """
+        Remove FAQ entry
+
+        Parameters
+        ----------
+        entry_id : int
+            Id of the entry
+        """
+        self.index.remove(entry_id)
+        self.entries[entry_id] = None
+
+    def search(self, query, top_k=1):
+        """
+        Search FAQ entries
+
+        Parameters
+        ----------
+        query : str or list of str or list of minette.WordNode
+            Text, tokens or words of question
+        top_k : int, default 1
+            Max number of entries returned
+
+        Returns
+        -------
+        results : list of tuple (dict, float)
+            Entry and score in descending order of score
+        """
+        return [(self.entries[doc_id], score) for doc_id, score
+                in self.index.search(self.tokenize(query), top_k)]
+
+    def save(self, path):
+        """
+        Save FAQ entries and index to file
+
+        Parameters
+        ----------
+        path : str
+            Path to file
+        """
+        self.index.save(path, extra={"entries": self.entries})
+
+    @classmethod
+    def load(cls, path, tagger=None):
+        """
+        Load FAQ entries and index from file
+
+        Parameters
+        ----------
+        path : str
+            Path to file
+        tagger : minette.Tagger, default None
+            Tagger to parse texts
+
+        Returns
+        -------
+        faq_index : FAQIndex
+            FAQ index loaded
+        """
+        faq_index = cls(tagger=tagger)
+        faq_index.index, extra = BM25Index.load(path)
+        faq_index.entries = extra["entries"]
+        return faq_index
+
+
+class FAQDialogService(DialogService):
+    """
+    DialogService that answers the FAQ entry most similar to request.
+    Set `FAQIndex` as `faq_index` by `Minette.dialog_uses` or class attribute,
+    or set the path of the index file to `faq_index` in configuration file.
+
+    >>> bot.dialog_uses(faq_index=FAQIndex.load("faq.idx", bot.tagger))
+
+    Attributes
+    ----------
+    faq_index : FAQIndex
+        FAQ index used when `faq_index` is not in dependencies
+    min_score : float
+        Min score to answer
+    not_found_message : str
+        Response when no entries are found
+    """
+    reusable = True
+    faq_index = None
+    min_score = 0.0
+    not_found_message = "Sorry, I couldn't find the answer."
+    _loaded_indexes = {}
+    _load_lock = threading.Lock()
+
+    def get_faq_index(self):
+        """
+        Get FAQ index to search
+
+        Returns
+        -------
+        faq_index : FAQIndex
+            FAQ index
+        """
+        faq_index = getattr(self.dependencies, "faq_index", None) \
+            or self.faq_index
+        if faq_index is None and self.config:
+            path = self.config.get("faq_index")
+            if path:
+                # load once and share among the instances
+                with self._load_lock:
+                    faq_index = self._loaded_indexes.get(path)
+                    if faq_index is None:
+                        faq_index = FAQIndex.load(path)
+                        self._loaded_indexes[path] = faq_index
+        return faq_index
+
+    def search(self, request, top_k=1):
+        """
+        Search FAQ entries for request
+
+        Parameters
+        ----------
+        request : minette.Message
+            Request message
+        top_k : int, default 1
+            Max number of entries returned
+
+        Returns
+        -------
+        results : list of tuple (dict, float)
+            Entry and score in descending order of score
+        """
+        faq_index = self.get_faq_index()
+        if faq_index is None:
+            return []
+        # use the words parsed by the tagger of minette if available
+        query = request.words or request.text or ""
+        return [(e, s) for e, s in faq_index.search(query, top_k)
+                if s > self.min_score]
+
+    def compose_response(self, request, context, connection):
+        results = self.search(request)
+        if not results:
+            return self.not_found_message
+        return results[0][0]["answer"]
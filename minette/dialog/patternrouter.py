@@ -0,0 +1,364 @@
+""" DialogRouter that extracts intent by keyword/regex/token patterns """
+from collections import deque
+import re
+import threading
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+from ..models import Priority
+from .router import DialogRouter
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton to find all registered patterns in a sequence
+    at once. Patterns are sequences of hashable symbols, like str
+    (sequence of characters) or list of words.
+
+    """
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        self._built = True
+
+    def __len__(self):
+        return len(self._goto)
+
+    @property
+    def built(self):
+        return self._built
+
+    def add(self, pattern, value):
+        """
+        Add pattern
+
+        Parameters
+        ----------
+        pattern : sequence
+            Sequence of symbols to find
+        value : object
+            Value returned when the pattern is found
+        """
+        node = 0
+        for symbol in pattern:
+            next_node = self._goto[node].get(symbol)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][symbol] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = next_node
+        self._outputs[node].append(value)
+        self._built = False
+
+    def build(self):
+        """
+        Build failure links. Called automatically at `find` after adding
+        patterns
+
+        """
+        queue = deque(self._goto[0].values())
+        for node in queue:
+            self._fail[node] = 0
+        while queue:
+            node = queue.popleft()
+            for symbol, next_node in self._goto[node].items():
+                queue.append(next_node)
+                fail = self._fail[node]
+                while fail and symbol not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_node] = self._goto[fail].get(symbol, 0)
+                # outputs of suffix are also found at this node
+                self._outputs[next_node] = self._outputs[next_node] + \
+                    self._outputs[self._fail[next_node]]
+        self._built = True
+
+    def find(self, sequence):
+        """
+        Find all patterns in sequence
+
+        Parameters
+        ----------
+        sequence : sequence
+            Sequence of symbols
+
+        Returns
+        -------
+        found : list of tuple (int, object)
+            End position (exclusive) of the pattern found and its value
+        """
+        if not self._built:
+            self.build()
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found = []
+        node = 0
+        for i, symbol in enumerate(sequence):
+            while node and symbol not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(symbol, 0)
+            if outputs[node]:
+                found.extend((i + 1, v) for v in outputs[node])
+        return found
+
+
+class PatternRule:
+    """
+    Rule to extract intent
+
+    Attributes
+    ----------
+    intent : str
+        Intent
+    priority : int
+        Priority of intent
+    entities : dict
+        Entities set when matched
+    entity_name : str
+        Name of the entity to set the matched keyword
+    regex : re.Pattern
+        Regular expression to match. Named groups are set to entities
+    order : int
+        Order of registration. Former rule wins when priorities are the same
+    """
+    def __init__(self, intent, priority=None, entities=None,
+                 entity_name=None, regex=None, order=0):
+        self.intent = intent
+        self.priority = Priority.Normal if priority is None else priority
+        self.entities = entities or {}
+        self.entity_name = entity_name
+        self.regex = regex
+        self.order = order
+
+    @property
+    def rank(self):
+        return (-self.priority, self.order)
+
+
+def _longest_literal(parsed):
+    best = ""
+    literal = ""
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            literal += chr(av)
+            continue
+        best = max(best, literal, key=len)
+        literal = ""
+        if op is sre_parse.SUBPATTERN:
+            # group is required as a whole
+            best = max(best, _longest_literal(av[-1]), key=len)
+    return max(best, literal, key=len)
+
+
+def _required_literal(regex):
+    # longest literal that every match of the regex contains
+    try:
+        return _longest_literal(
+            sre_parse.parse(regex.pattern, regex.flags)).lower()
+    except Exception:
+        return ""
+
+
+class PatternDialogRouter(DialogRouter):
+    """
+    DialogRouter that extracts intent by keyword, regex and token patterns.
+    All patterns are compiled into Aho-Corasick automata, so the time to
+    extract intent doesn't depend on the number of patterns.
+
+    Register patterns in `register_patterns`.
+
+    >>> def register_patterns(self):
+            self.add_keywords("PizzaIntent", ["pizza", "ピザ"])
+            self.add_keywords(
+                "SobaIntent", ["tanuki soba", "kitsune soba"],
+                entity_name="soba_name", priority=Priority.High)
+            self.add_regex("OrderIntent", r"(?P<count>\\d+) pizzas")
+            self.add_tokens("WeatherIntent", ["天気", "を", "教え"])
+
+    When some patterns match, the intent with higher priority wins,
+    and then the one registered earlier.
+    Keywords are matched ignoring case. Regexes are checked only when
+    the longest literal in them is found in the text, so regexes
+    without literal (e.g. `\\d+`) are checked for every request.
+    Token patterns are matched to the surfaces of `request.words`.
+
+    Attributes
+    ----------
+    rules : list of PatternRule
+        Rules registered
+    """
+    def __init__(self, config=None, timezone=None, logger=None,
+                 default_dialog_service=None, intent_resolver=None, **kwargs):
+        self.rules = []
+        self._text_automaton = AhoCorasick()
+        self._token_automaton = AhoCorasick()
+        self._unfiltered_rules = []
+        self._lock = threading.Lock()
+        super().__init__(
+            config=config, timezone=timezone, logger=logger,
+            default_dialog_service=default_dialog_service,
+            intent_resolver=intent_resolver, **kwargs)
+        self.register_patterns()
+        self._build()
+
+    def register_patterns(self):
+        """
+        Register patterns to extract intent by `add_keywords`,
+        `add_regex` and `add_tokens`
+
+        """
+        pass
+
+    def _add_rule(self, intent, priority, entities, entity_name=None,
+                  regex=None):
+        rule = PatternRule(
+            intent, priority=priority, entities=entities,
+            entity_name=entity_name, regex=regex, order=len(self.rules))
+        self.rules.append(rule)
+        return rule
+
+    def add_keywords(self, intent, keywords, priority=None, entities=None,
+                     entity_name=None):
+        """
+        Add keywords to extract intent
+
+        Parameters
+        ----------
+        intent : str
+            Intent
+        keywords : list of str
+            Keywords. Intent is extracted when any of them is in the text
+        priority : int, default None
+            Priority of intent. Priority.Normal if None
+        entities : dict, default None
+            Entities set when matched
+        entity_name : str, default None
+            Name of the entity to set the matched keyword
+        """
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        rule = self._add_rule(intent, priority, entities, entity_name)
+        with self._lock:
+            for keyword in keywords:
+                self._text_automaton.add(keyword.lower(), (rule, keyword))
+
+    def add_regex(self, intent, pattern, priority=None, entities=None,
+                  flags=0):
+        """
+        Add regular expression to extract intent
+
+        Parameters
+        ----------
+        intent : str
+            Intent
+        pattern : str or re.Pattern
+            Regular expression searched in the text.
+            Named groups matched are set to entities
+        priority : int, default None
+            Priority of intent. Priority.Normal if None
+        entities : dict, default None
+            Entities set when matched
+        flags : int, default 0
+            Flags to compile pattern
+        """
+        regex = re.compile(pattern, flags) if isinstance(pattern, str) \
+            else pattern
+        rule = self._add_rule(intent, priority, entities, regex=regex)
+        literal = _required_literal(regex)
+        with self._lock:
+            if literal:
+                self._text_automaton.add(literal, (rule, None))
+            else:
+                self._unfiltered_rules.append(rule)
+
+    def add_tokens(self, intent, tokens, priority=None, entities=None,
+                   entity_name=None):
+        """
+        Add sequence of tokens to extract intent
+
+        Parameters
+        ----------
+        intent : str
+            Intent
+        tokens : list of str
+            Surfaces of the successive words
+        priority : int, default None
+            Priority of intent. Priority.Normal if None
+        entities : dict, default None
+            Entities set when matched
+        entity_name : str, default None
+            Name of the entity to set the matched tokens joined
+        """
+        rule = self._add_rule(intent, priority, entities, entity_name)
+        with self._lock:
+            self._token_automaton.add(tuple(tokens), (rule, "".join(tokens)))
+
+    def _build(self):
+        with self._lock:
+            self._text_automaton.build()
+            self._token_automaton.build()
+
+    def extract_intent(self, request, context, connection):
+        """
+        Extract intent and entities by the patterns registered
+
+        Parameters
+        ----------
+        request : minette.Message
+            Request message
+        context : minette.Context
+            Context
+        connection : Connection
+            Connection
+
+        Returns
+        -------
+        response : tuple of (str, dict, int)
+            Intent, entities and priority
+        """
+        matched = self.match(request.text or "", request)
+        if matched is None:
+            return request.intent, request.entities
+        return matched
+
+    def match(self, text, request=None):
+        """
+        Get the intent of the best rule that matches text
+
+        Parameters
+        ----------
+        text : str
+            Text
+        request : minette.Message, default None
+            Request message to match token patterns to its words
+
+        Returns
+        -------
+        matched : tuple of (str, dict, int)
+            Intent, entities and priority. None if no rules match
+        """
+        if not (self._text_automaton.built and self._token_automaton.built):
+            self._build()
+        candidates = self._text_automaton.find(text.lower())
+        if request is not None and len(self._token_automaton) > 1:
+            candidates.extend(self._token_automaton.find(
+                [w.surface for w in request.words]))
+        candidates.extend((0, (r, None)) for r in self._unfiltered_rules)
+
+        for _, (rule, matched) in sorted(
+                candidates, key=lambda c: (c[1][0].rank, c[0])):
+            entities = dict(rule.entities)
+            if rule.regex is not None:
+                m = rule.regex.search(text)
+                if m is None:
+                    continue
+                entities.update(
+                    {k: v for k, v in m.groupdict().items() if v is not None})
+            elif rule.entity_name:
+                entities[rule.entity_name] = matched
+            return rule.intent, entities, rule.priority
+        return None
@@ -1,9 +1,11 @@
 """ Base class for DialogRouter that routes proper dialog for the intent """
 from abc import ABC, abstractmethod
 import traceback
+import threading
 from logging import Logger, getLogger
 
 from ..models import Message, Priority
+from ..utils import await_if_needed
 from .service import DialogService, ErrorDialogService
 from .dependency import DependencyContainer
 
@@ -99,28 +101,59 @@ class DialogRouter:
             # extract intent and entities
             extracted = self.extract_intent(
                 request=request, context=context, connection=connection)
-            if isinstance(extracted, tuple):
-                request.intent = extracted[0]
-                request.entities = extracted[1]
-                if len(extracted) > 2:
-                    request.intent_priority = extracted[2]
-            elif isinstance(extracted, str):
-                request.intent = extracted
+            self._set_intent(request, extracted)
             performance.append("dialog_router.extract_intent")
             # preprocess before route
             self.before_route(request, context, connection)
             performance.append("dialog_router.before_route")
             # route dialog
-            dialog_service = self.route(request, context, connection)
-            if issubclass(dialog_service, DialogService):
-                dialog_service = dialog_service(
-                    config=self.config, timezone=self.timezone,
-                    logger=self.logger
-                )
-            dialog_service.dependencies = DependencyContainer(
-                dialog_service,
-                self.dependency_rules,
-                **self.default_dependencies)
+            dialog_service = self._get_dialog_service(
+                self.route(request, context, connection))
+            performance.append("dialog_router.route")
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in dialog_router: "
+                + str(ex) + "\n" + traceback.format_exc())
+            dialog_service = \
+                self.handle_exception(request, context, ex, connection)
+
+        return dialog_service
+
+    async def execute_async(self, request, context, connection, performance):
+        """
+        Main logic of DialogRouter for asyncio.
+        `extract_intent` and `before_route` can be both sync and async.
+
+        Parameters
+        ----------
+        request : minette.Message
+            Request message
+        context : minette.Context
+            Context
+        connection : Connection
+            Connection
+        performance : minette.PerformanceInfo
+            Performance information
+
+        Returns
+        -------
+        dialog_service : minette.DialogService
+            DialogService to process request message
+        """
+        try:
+            # extract intent and entities
+            extracted = await await_if_needed(self.extract_intent(
+                request=request, context=context, connection=connection))
+            self._set_intent(request, extracted)
+            performance.append("dialog_router.extract_intent")
+            # preprocess before route
+            await await_if_needed(
+                self.before_route(request, context, connection))
+            performance.append("dialog_router.before_route")
+            # route dialog (not reused because the coroutines in the same
+            # thread process requests at the same time)
+            dialog_service = self._get_dialog_service(
+                self.route(request, context, connection), reuse=False)
             performance.append("dialog_router.route")
         except Exception as ex:
             self.logger.error(
@@ -131,6 +164,95 @@ class DialogRouter:
 
         return dialog_service
 
+    def _set_intent(self, request, extracted):
+        if isinstance(extracted, tuple):
+            request.intent = extracted[0]
+            request.entities = extracted[1]
+            if len(extracted) > 2:
+                request.intent_priority = extracted[2]
+        elif isinstance(extracted, str):
+            request.intent = extracted
+
+    @property
+    def dependency_rules(self):
+        return self._dependency_rules
+
+    @dependency_rules.setter
+    def dependency_rules(self, value):
+        self._dependency_rules = value
+        self.clear_dialog_services()
+
+    @property
+    def default_dependencies(self):
+        return self._default_dependencies
+
+    @default_dependencies.setter
+    def default_dependencies(self, value):
+        self._default_dependencies = value
+        self.clear_dialog_services()
+
+    def clear_dialog_services(self):
+        """
+        Clear dependency containers and reusable dialog services cached.
+        Called automatically when dependencies are changed
+
+        """
+        self._dependency_containers = {}
+        self._local = threading.local()
+
+    def prepare_dependencies(self):
+        """
+        Create dependency containers for the reusable dialog services
+        registered in advance not to create them while processing requests
+
+        """
+        dialog_classes = set(self.topic_resolver.values())
+        dialog_classes.update(self.dependency_rules or {})
+        for dialog_class in dialog_classes:
+            if isinstance(dialog_class, type) and \
+                    issubclass(dialog_class, DialogService) and \
+                    dialog_class.reusable:
+                self._get_dependencies(dialog_class)
+
+    def _get_dependencies(self, dialog_class):
+        if not dialog_class.reusable:
+            # dialog services may keep the state of request in container
+            return DependencyContainer(
+                dialog_class,
+                self.dependency_rules,
+                **(self.default_dependencies or {}))
+        # containers are shared among the instances of reusable class
+        dependencies = self._dependency_containers.get(dialog_class)
+        if dependencies is None:
+            dependencies = DependencyContainer(
+                dialog_class,
+                self.dependency_rules,
+                **(self.default_dependencies or {}))
+            self._dependency_containers[dialog_class] = dependencies
+        return dependencies
+
+    def _get_dialog_service(self, dialog_service, reuse=True):
+        if not isinstance(dialog_service, type):
+            dialog_service.dependencies = \
+                self._get_dependencies(type(dialog_service))
+            return dialog_service
+        if reuse and dialog_service.reusable:
+            instances = getattr(self._local, "instances", None)
+            if instances is None:
+                instances = self._local.instances = {}
+            instance = instances.get(dialog_service)
+            if instance is None:
+                instance = instances[dialog_service] = \
+                    self._create_dialog_service(dialog_service)
+            return instance
+        return self._create_dialog_service(dialog_service)
+
+    def _create_dialog_service(self, dialog_class):
+        dialog_service = dialog_class(
+            config=self.config, timezone=self.timezone, logger=self.logger)
+        dialog_service.dependencies = self._get_dependencies(dialog_class)
+        return dialog_service
+
     def extract_intent(self, request, context, connection):
         """
         Extract intent and entities from request message
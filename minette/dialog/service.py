@@ -8,6 +8,7 @@ from ..models import (
     Context,
     PerformanceInfo
 )
+from ..utils import await_if_needed
 
 
 class DialogService:
@@ -24,7 +25,13 @@ class DialogService:
         Logger
     dependencies : DependencyContainer
         Container to attach objects DialogRouter depends
+    reusable : bool
+        Set True to reuse the instance of this dialog service and its
+        dependencies for the requests processed in the same thread by
+        `chat`. Set only when the dialog service doesn't keep any state of
+        request in its members. Not reused by `chat_async`
     """
+    reusable = False
 
     @classmethod
     def topic_name(cls):
@@ -97,19 +104,9 @@ class DialogService:
             performance.append("dialog_service.process_request")
 
             # compose response
-            response_messages = \
-                self.compose_response(request, context, connection)
-            if not response_messages:
-                self.logger.info("No response")
-                response_messages = []
-            elif not isinstance(response_messages, list):
-                response_messages = [response_messages]
-            response = Response()
-            for rm in response_messages:
-                if isinstance(rm, Message):
-                    response.messages.append(rm)
-                elif isinstance(rm, str):
-                    response.messages.append(request.to_reply(text=rm))
+            response = self._to_response(
+                request,
+                self.compose_response(request, context, connection))
             performance.append("dialog_service.compose_response")
 
         except Exception as ex:
@@ -121,6 +118,78 @@ class DialogService:
 
         return response
 
+    async def execute_async(self, request, context, connection, performance):
+        """
+        Main logic of DialogService for asyncio.
+        `extract_entities`, `get_slots`, `process_request` and
+        `compose_response` can be both sync and async.
+
+        Parameters
+        ----------
+        request : minette.Message
+            Request message
+        context : minette.Context
+            Context
+        connection : Connection
+            Connection
+        performance : minette.PerformanceInfo
+            Performance information
+
+        Returns
+        -------
+        response : minette.Response
+            Response from chatbot
+        """
+        try:
+            # extract entities
+            entities = await await_if_needed(
+                self.extract_entities(request, context, connection))
+            for k, v in entities.items():
+                if not request.entities.get(k, ""):
+                    request.entities[k] = v
+            performance.append("dialog_service.extract_entities")
+
+            # initialize context data
+            if context.topic.is_new:
+                context.data = await await_if_needed(
+                    self.get_slots(request, context, connection))
+            performance.append("dialog_service.get_slots")
+
+            # process request
+            await await_if_needed(
+                self.process_request(request, context, connection))
+            performance.append("dialog_service.process_request")
+
+            # compose response
+            response = self._to_response(
+                request,
+                await await_if_needed(
+                    self.compose_response(request, context, connection)))
+            performance.append("dialog_service.compose_response")
+
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in dialog_service: "
+                + str(ex) + "\n" + traceback.format_exc())
+            response = Response(messages=[
+                self.handle_exception(request, context, ex, connection)])
+
+        return response
+
+    def _to_response(self, request, response_messages):
+        if not response_messages:
+            self.logger.info("No response")
+            response_messages = []
+        elif not isinstance(response_messages, list):
+            response_messages = [response_messages]
+        response = Response()
+        for rm in response_messages:
+            if isinstance(rm, Message):
+                response.messages.append(rm)
+            elif isinstance(rm, str):
+                response.messages.append(request.to_reply(text=rm))
+        return response
+
     def extract_entities(self, request, context, connection):
         """
         Extract entities from request message
@@ -8,3 +8,4 @@ from .message import Message
 from .performance import PerformanceInfo
 from .response import Response
 from .wordnode import WordNode
+from .tokentable import TokenTable, PartOfSpeechVocabulary
@@ -1,5 +1,6 @@
 import traceback
-from copy import deepcopy
+from copy import copy
+from datetime import datetime
 
 from ..serializer import Serializable
 from .priority import Priority
@@ -56,7 +57,7 @@ class Context(Serializable):
         """
         # backup previous topic
         self.topic.previous = None
-        self.topic.previous = deepcopy(self.topic)
+        self.topic.previous = self.topic.copy()
         # remove data if topic not keep_on
         if not self.topic.keep_on:
             self.topic.name = ""
@@ -65,6 +66,21 @@ class Context(Serializable):
             self.data = self.data if keep_data else {}
             self.error = {}
 
+    def snapshot(self):
+        """
+        Copy this context to keep the values at this moment without copying
+        `data` recursively. `data` and `error` are shared with the snapshot
+        because `reset()` replaces them instead of modifying.
+
+        Returns
+        -------
+        context : minette.Context
+            Snapshot of this context
+        """
+        context = copy(self)
+        context.topic = self.topic.copy()
+        return context
+
     def set_error(self, ex, info=None):
         """
         Set error info
@@ -84,5 +100,6 @@ class Context(Serializable):
     @classmethod
     def _types(cls):
         return {
+            "timestamp": datetime,
             "topic": Topic
         }
@@ -2,7 +2,7 @@ from datetime import datetime
 from pytz import timezone as tz
 from copy import copy
 
-from ..serializer import Serializable
+from ..serializer import Serializable, dumpd
 from .payload import Payload
 from .priority import Priority
 from .user import User
@@ -37,7 +37,8 @@ class Message(Serializable):
     text : str
         Body of message
     words : list of minette.WordNode
-        Word nodes parsed by tagger
+        Word nodes parsed by tagger. When the parser is set by
+        `set_words_parser`, the text is parsed at the first access
     payloads : list of minette.Payload
         Payloads
     intent : str
@@ -87,13 +88,40 @@ class Message(Serializable):
         self.user = user
         self.group = group
         self.text = text or ""
-        self.words = []
+        self._words = []
+        self._words_parser = None
         self.payloads = payloads or []
         self.intent = intent or ""
         self.intent_priority = intent_priority or Priority.Normal
         self.entities = entities or {}
         self.is_adhoc = is_adhoc
 
+    @property
+    def words(self):
+        if self._words_parser is not None:
+            parser = self._words_parser
+            self._words_parser = None
+            self._words = parser()
+        return self._words
+
+    @words.setter
+    def words(self, value):
+        self._words = value
+        self._words_parser = None
+
+    def set_words_parser(self, parser):
+        """
+        Set function to parse text into words at the first access of `words`
+
+        Parameters
+        ----------
+        parser : callable
+            Function that takes no arguments and returns list of
+            minette.WordNode
+        """
+        self._words = []
+        self._words_parser = parser
+
     def to_reply(self, text=None, payloads=None, type="text"):
         """
         Get reply message for this message
@@ -138,6 +166,14 @@ class Message(Serializable):
             Message dictionary
         """
         message_dict = super().to_dict()
+        # words not parsed yet are not parsed for serialization
+        if isinstance(self._words, (list, tuple)):
+            message_dict["words"] = [
+                w.to_dict() if hasattr(w, "to_dict") else
+                dumpd(w) if hasattr(w, "__dict__") else w
+                for w in self._words]
+        else:
+            message_dict["words"] = self._words
         # channel_message is not JSON serializable
         message_dict["channel_message"] = str(message_dict["channel_message"])
         return message_dict
@@ -145,6 +181,7 @@ class Message(Serializable):
     @classmethod
     def _types(cls):
         return {
+            "timestamp": datetime,
             "user": User,
             "payloads": Payload
         }
@@ -0,0 +1,250 @@
+from array import array
+from sys import intern
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class PartOfSpeechVocabulary:
+    """
+    Vocabulary to encode the combination of part-of-speech and inflection
+    into integer id. Ids are shared among all token tables.
+
+    Attributes
+    ----------
+    FIELDS : tuple of str
+        Names of the fields in the combination
+    """
+    FIELDS = ("part", "part_detail1", "part_detail2", "part_detail3",
+              "stem_type", "stem_form")
+
+    def __init__(self):
+        self._ids = {}
+        self._values = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def get_id(self, pos):
+        """
+        Get id of the part-of-speech. New id is issued if not registered
+
+        Parameters
+        ----------
+        pos : tuple of str
+            Values of `FIELDS`
+
+        Returns
+        -------
+        pos_id : int
+            Id of the part-of-speech
+        """
+        pos_id = self._ids.get(pos)
+        if pos_id is None:
+            with self._lock:
+                pos_id = self._ids.get(pos)
+                if pos_id is None:
+                    pos_id = len(self._values)
+                    self._values.append(tuple(
+                        intern(p) if type(p) is str else p for p in pos))
+                    self._ids[self._values[pos_id]] = pos_id
+        return pos_id
+
+    def get(self, pos_id):
+        """
+        Get part-of-speech of the id
+
+        Parameters
+        ----------
+        pos_id : int
+            Id of the part-of-speech
+
+        Returns
+        -------
+        pos : tuple of str
+            Values of `FIELDS`
+        """
+        return self._values[pos_id]
+
+    def find_ids(self, **conditions):
+        """
+        Get ids of part-of-speech matching all conditions
+
+        Parameters
+        ----------
+        conditions : dict
+            Values of the field in `FIELDS` like `part="名詞"`
+
+        Returns
+        -------
+        pos_ids : list of int
+            Ids of matched part-of-speech
+        """
+        indexes = [(self.FIELDS.index(k), v) for k, v in conditions.items()]
+        return [i for i, pos in enumerate(self._values)
+                if all(pos[idx] == v for idx, v in indexes)]
+
+
+class TokenTable:
+    """
+    Columnar representation of parsed words
+
+    Attributes
+    ----------
+    text : str
+        Parsed text
+    surfaces : list of str
+        Surface of each token
+    words : list of str
+        Base form of each token
+    kanas : list of str
+        Japanese kana of each token
+    pronunciations : list of str
+        Pronunciation of each token
+    pos_ids : array.array
+        Id of part-of-speech and inflection of each token.
+        Decode with `TokenTable.vocabulary`
+    starts : array.array
+        Start offset of each token in text
+    ends : array.array
+        End offset of each token in text
+    node_class : type
+        Class of WordNode to restore
+    """
+    vocabulary = PartOfSpeechVocabulary()
+
+    def __init__(self, text="", node_class=None):
+        """
+        Parameters
+        ----------
+        text : str, default ""
+            Parsed text
+        node_class : type, default None
+            Class of WordNode to restore
+        """
+        self.text = text
+        self.surfaces = []
+        self.words = []
+        self.kanas = []
+        self.pronunciations = []
+        self.pos_ids = array("i")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.node_class = node_class
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def append(self, node, start, end):
+        """
+        Append word node
+
+        Parameters
+        ----------
+        node : minette.WordNode
+            Word node
+        start : int
+            Start offset of the word in text
+        end : int
+            End offset of the word in text
+        """
+        self.surfaces.append(node.surface)
+        self.words.append(node.word)
+        self.kanas.append(node.kana)
+        self.pronunciations.append(node.pronunciation)
+        self.pos_ids.append(self.vocabulary.get_id((
+            node.part, node.part_detail1, node.part_detail2,
+            node.part_detail3, node.stem_type, node.stem_form)))
+        self.starts.append(start)
+        self.ends.append(end)
+        if self.node_class is None:
+            self.node_class = type(node)
+
+    @classmethod
+    def from_words(cls, words, text=None):
+        """
+        Create token table from word nodes
+
+        Parameters
+        ----------
+        words : iterable of minette.WordNode
+            Word nodes
+        text : str, default None
+            Parsed text to locate the offset of each word.
+            Words are assumed to be contiguous if None
+
+        Returns
+        -------
+        table : minette.TokenTable
+            Token table
+        """
+        table = cls(text=text or "")
+        pos = 0
+        for w in words:
+            start = text.find(w.surface, pos) if text else -1
+            if start < 0:
+                start = pos
+            end = start + len(w.surface)
+            table.append(w, start, end)
+            pos = end
+        if text is None:
+            table.text = "".join(table.surfaces)
+        return table
+
+    def to_words(self):
+        """
+        Convert to the list of word nodes
+
+        Returns
+        -------
+        words : list of minette.WordNode
+            Word nodes
+        """
+        if self.node_class is None:
+            return []
+        get_pos = self.vocabulary.get
+        return [
+            self.node_class(s, *get_pos(p), w, k, pr)
+            for s, p, w, k, pr in zip(
+                self.surfaces, self.pos_ids, self.words,
+                self.kanas, self.pronunciations)]
+
+    def find(self, **conditions):
+        """
+        Get indexes of the tokens whose part-of-speech matches all conditions
+
+        Parameters
+        ----------
+        conditions : dict
+            Part-of-speech conditions like `part="名詞"`
+
+        Returns
+        -------
+        indexes : list of int
+            Indexes of matched tokens
+        """
+        pos_ids = set(self.vocabulary.find_ids(**conditions))
+        return [i for i, p in enumerate(self.pos_ids) if p in pos_ids]
+
+    def to_numpy(self):
+        """
+        Get columns as NumPy arrays
+
+        Returns
+        -------
+        columns : dict
+            NumPy arrays of `surfaces`, `words`, `pos_ids`, `starts` and `ends`
+        """
+        if np is None:
+            raise ImportError("NumPy is required to use `to_numpy`")
+        return {
+            "surfaces": np.array(self.surfaces, dtype=object),
+            "words": np.array(self.words, dtype=object),
+            "pos_ids": np.array(self.pos_ids, dtype=np.intc),
+            "starts": np.array(self.starts, dtype=np.intc),
+            "ends": np.array(self.ends, dtype=np.intc),
+        }
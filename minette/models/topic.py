@@ -1,3 +1,5 @@
+from copy import copy
+
 from ..serializer import Serializable
 from .priority import Priority
 
@@ -31,6 +33,17 @@ class Topic(Serializable):
         self.previous = None
         self.priority = Priority.Normal
 
+    def copy(self):
+        """
+        Copy this topic. `previous` is shared with the copy
+
+        Returns
+        -------
+        topic : minette.Topic
+            Copy of this topic
+        """
+        return copy(self)
+
     @property
     def is_changed(self):
         if self.previous and self.previous.name == self.name:
@@ -1,5 +1,5 @@
 from uuid import uuid4
-from ..serializer import Serializable
+from ..serializer import Serializable, dumps
 
 
 class User(Serializable):
@@ -20,7 +20,12 @@ class User(Serializable):
         Channel user ID
     data : dict
         User data
+    saved_at : datetime
+        When this user was saved to data store last time
     """
+    _saved = None
+    _saved_at = None
+
     def __init__(self, channel=None, channel_user_id=None):
         """
         Parameters
@@ -38,3 +43,35 @@ class User(Serializable):
             channel_user_id if isinstance(channel_user_id, str) else ""
         self.profile_image_url = ""
         self.data = {}
+
+    @property
+    def saved_at(self):
+        return self._saved_at
+
+    def mark_saved(self, timestamp=None):
+        """
+        Remember current values as saved to data store
+
+        Parameters
+        ----------
+        timestamp : datetime, default None
+            When this user was saved
+        """
+        self._saved = self._get_state()
+        self._saved_at = timestamp
+
+    def is_changed(self):
+        """
+        Check whether any value is changed after restored or saved.
+        Changes in `data` are detected even if nested values are modified.
+
+        Returns
+        -------
+        changed : bool
+            True if changed or not saved yet
+        """
+        return self._saved is None or self._saved != self._get_state()
+
+    def _get_state(self):
+        return (self.id, self.name, self.nickname, self.profile_image_url,
+                dumps(self.data))
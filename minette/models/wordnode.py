@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
+from sys import intern
 from ..serializer import Serializable
 
 
+def _intern(value):
+    return intern(value) if type(value) is str else value
+
+
 class WordNode(ABC, Serializable):
     """
     Base class of parsed word
@@ -29,15 +34,21 @@ class WordNode(ABC, Serializable):
     pronunciation : str
         Pronunciation of the word
     """
+    # no __dict__ for each node to save memory
+    __slots__ = ("surface", "part", "part_detail1", "part_detail2",
+                 "part_detail3", "stem_type", "stem_form", "word", "kana",
+                 "pronunciation")
+
     def __init__(self, surface, part, part_detail1, part_detail2, part_detail3,
                  stem_type, stem_form, word, kana, pronunciation):
         self.surface = surface
-        self.part = part
-        self.part_detail1 = part_detail1
-        self.part_detail2 = part_detail2
-        self.part_detail3 = part_detail3
-        self.stem_type = stem_type
-        self.stem_form = stem_form
+        # share the strings of part-of-speech that has small vocabulary
+        self.part = _intern(part)
+        self.part_detail1 = _intern(part_detail1)
+        self.part_detail2 = _intern(part_detail2)
+        self.part_detail3 = _intern(part_detail3)
+        self.stem_type = _intern(stem_type)
+        self.stem_form = _intern(stem_form)
         self.word = word
         self.kana = kana
         self.pronunciation = pronunciation
@@ -46,3 +57,14 @@ class WordNode(ABC, Serializable):
     @abstractmethod
     def create(cls, surface, features):
         pass
+
+    def to_dict(self):
+        """
+        Convert this object to dict
+
+        Returns
+        -------
+        d : dict
+            Object as dict
+        """
+        return {k: getattr(self, k) for k in WordNode.__slots__}
@@ -1 +1,2 @@
 from .base import Task, Scheduler
+from .tasks import MessageLogRetentionTask
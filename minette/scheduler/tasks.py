@@ -0,0 +1,61 @@
+""" Built-in tasks """
+from datetime import datetime, timedelta
+import traceback
+
+from .base import Task
+
+
+class MessageLogRetentionTask(Task):
+    """
+    Task to delete the message logs older than retention period.
+    Partitions are dropped at once when the store is
+    `PartitionedMessageLogStore`, otherwise logs are deleted in chunks.
+
+    >>> scheduler.every_days(
+            MessageLogRetentionTask,
+            messagelog_store=bot.messagelog_store, retention_days=90)
+
+    """
+    def do(self, messagelog_store, retention_days=None, chunk_size=1000):
+        """
+        Delete the message logs older than retention period
+
+        Parameters
+        ----------
+        messagelog_store : minette.MessageLogStore
+            MessageLogStore to purge
+        retention_days : int, default None
+            Days to keep message logs. Use `messagelog_retention_days`
+            in configuration file by default
+        chunk_size : int, default 1000
+            Number of message logs deleted at once
+
+        Returns
+        -------
+        count : int
+            Number of message logs deleted, or partitions dropped
+        """
+        retention_days = retention_days or int(
+            self.config.get("messagelog_retention_days") or 0
+            if self.config else 0)
+        if not retention_days:
+            self.logger.error("Retention days of message log is not set")
+            return 0
+        before = datetime.now(
+            self.timezone or messagelog_store.timezone) - \
+            timedelta(days=retention_days)
+        connection = self.connection_provider.get_connection()
+        try:
+            count = messagelog_store.purge(
+                connection, before, chunk_size=chunk_size)
+            self.logger.info(
+                "Message logs before {} are purged: {}".format(
+                    before, count))
+            return count
+        except Exception as ex:
+            self.logger.error(
+                "Error occured in purging message logs: "
+                + str(ex) + "\n" + traceback.format_exc())
+            return 0
+        finally:
+            self.connection_provider.release_connection(connection)
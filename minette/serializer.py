@@ -1,7 +1,8 @@
 import json
 from datetime import datetime
 import re
-from .utils import date_to_str, str_to_date
+from .utils import str_to_date
+from .codec import TAG_PREFIX, encode, decode, _encode_datetime
 
 
 def _is_datestring(s):
@@ -9,9 +10,25 @@ def _is_datestring(s):
         re.match(r"(\d{4})-(\d{2})-(\d{2})T(\d{2})\:(\d{2})\:(\d{2})", s)
 
 
-def _encode_datetime(obj):
-    if isinstance(obj, datetime):
-        return date_to_str(obj, obj.tzinfo is not None)
+def _parse_datetime(s):
+    # fast path for the ISO 8601 format that `date_to_str` writes
+    try:
+        return datetime.fromisoformat(s)
+    except ValueError:
+        pass
+    try:
+        return str_to_date(s)
+    except (ValueError, IndexError):
+        # keep the value that is not datetime
+        return s
+
+
+def _decode_typed_datetime(value):
+    if isinstance(value, str):
+        return _parse_datetime(value) if value else value
+    elif isinstance(value, list):
+        return [_decode_typed_datetime(v) for v in value]
+    return value
 
 
 def _decode_datetime(d):
@@ -25,6 +42,122 @@ def _decode_datetime(d):
     return d
 
 
+# kinds of value to encode
+_RAW, _LIST, _DICT, _TO_DICT, _DUMPD = range(5)
+_value_kinds = {
+    str: _RAW, int: _RAW, float: _RAW, bool: _RAW, type(None): _RAW,
+    datetime: _RAW, list: _LIST, tuple: _LIST, set: _LIST, dict: _DICT
+}
+# encoder and decoder compiled for each class
+_encoders = {}
+_decoders = {}
+
+
+def _get_value_kind(value):
+    value_type = type(value)
+    kind = _value_kinds.get(value_type)
+    if kind is None:
+        if isinstance(value, (list, tuple, set)):
+            kind = _LIST
+        elif isinstance(value, dict):
+            kind = _DICT
+        elif hasattr(value, "to_dict"):
+            kind = _TO_DICT
+        elif hasattr(value, "__dict__"):
+            kind = _DUMPD
+        else:
+            kind = _RAW
+        _value_kinds[value_type] = kind
+    return kind
+
+
+def _encode_item(value):
+    # items in list or dict are not converted when they are list or dict
+    kind = _value_kinds.get(type(value))
+    if kind is None:
+        kind = _get_value_kind(value)
+    if kind < _TO_DICT:
+        return value
+    elif kind == _TO_DICT:
+        return value.to_dict()
+    return dumpd(value)
+
+
+def _encode_value(value):
+    kind = _value_kinds.get(type(value))
+    if kind is None:
+        kind = _get_value_kind(value)
+    if kind == _RAW:
+        return value
+    elif kind == _LIST:
+        return [_encode_item(v) for v in value]
+    elif kind == _DICT:
+        return {k: _encode_item(v) for k, v in value.items()}
+    elif kind == _TO_DICT:
+        return value.to_dict()
+    return dumpd(value)
+
+
+def _get_slots(obj_cls):
+    slots = []
+    for cls in obj_cls.__mro__:
+        cls_slots = cls.__dict__.get("__slots__", ())
+        slots.extend([cls_slots] if isinstance(cls_slots, str) else cls_slots)
+    return [s for s in slots if not s.startswith("_")]
+
+
+def _compile_encoder(obj):
+    slots = _get_slots(type(obj))
+
+    def encode_slots(obj, data):
+        for key in slots:
+            data[key] = _encode_value(getattr(obj, key, None))
+        return data
+
+    if not hasattr(obj, "__dict__"):
+        if not hasattr(type(obj), "__slots__"):
+            # raise AttributeError for the object that has no members
+            obj.__dict__
+        return lambda obj: encode_slots(obj, {})
+
+    def encode(obj):
+        data = {}
+        for key, value in obj.__dict__.items():
+            if not key.startswith("_"):
+                # skip function call for the primitive values
+                data[key] = value if _value_kinds.get(type(value)) == _RAW \
+                    else _encode_value(value)
+        return encode_slots(obj, data) if slots else data
+
+    return encode
+
+
+def _compile_decoder(obj_cls):
+    types = obj_cls._types() if getattr(obj_cls, "_types", None) else {}
+    type_decoders = {}
+    for k, t in types.items():
+        if t is datetime:
+            type_decoders[k] = _decode_typed_datetime
+        elif hasattr(t, "from_dict"):
+            type_decoders[k] = t.from_dict
+        else:
+            type_decoders[k] = (lambda t: lambda v: loadd(v, t))(t)
+    create_object = getattr(obj_cls, "create_object", None)
+
+    def decode(d):
+        # use `create_object` instead of its constructor
+        obj = create_object(d) if create_object else obj_cls()
+        # use setattr to respect properties and slots
+        for k, v in d.items():
+            if k in type_decoders:
+                setattr(obj, k, type_decoders[k](v))
+            else:
+                setattr(obj, k, v)
+        return obj
+
+    return decode
+
+
 def dumpd(obj):
     """
     Convert object to dict
@@ -45,39 +178,18 @@ def dumpd(obj):
     # return list of dict
     elif isinstance(obj, (list, tuple, set)):
         return [dumpd(o) for o in obj]
-    # convert to dict
-    data = {}
-    for key in obj.__dict__.keys():
-        if not key.startswith("_"):
-            # convert each items in list-like object
-            if isinstance(getattr(obj, key, None), (list, tuple, set)):
-                data[key] = []
-                for v in getattr(obj, key, None):
-                    if hasattr(v, "to_dict"):
-                        data[key].append(v.to_dict())
-                    elif hasattr(v, "__dict__"):
-                        data[key].append(dumpd(v))
-                    else:
-                        data[key].append(v)
-            # convert each items in dict
-            elif isinstance(getattr(obj, key, None), dict):
-                data[key] = {}
-                for k, v in getattr(obj, key, None).items():
-                    if hasattr(v, "to_dict"):
-                        data[key][k] = v.to_dict()
-                    elif hasattr(v, "__dict__"):
-                        data[key][k] = dumpd(v)
-                    else:
-                        data[key][k] = v
-            # convert object with `to_dict`
-            elif hasattr(getattr(obj, key, None), "to_dict"):
-                data[key] = getattr(obj, key).to_dict()
-            # convert plain object
-            elif hasattr(getattr(obj, key, None), "__dict__"):
-                data[key] = dumpd(getattr(obj, key))
-            else:
-                data[key] = getattr(obj, key, None)
-    return data
+    # use `to_dict` of the object like the members of the object
+    if _get_value_kind(obj) == _TO_DICT:
+        return obj.to_dict()
+    return _encode_object(obj)
+
+
+def _encode_object(obj):
+    # convert to dict by the encoder compiled for its class
+    encoder = _encoders.get(type(obj))
+    if encoder is None:
+        encoder = _encoders[type(obj)] = _compile_encoder(obj)
+    return encoder(obj)
 
 
 def loadd(d, obj_cls):
@@ -102,26 +214,14 @@ def loadd(d, obj_cls):
     # return the list of objects when input is list
     if isinstance(d, list):
         return [loadd(di, obj_cls) for di in d]
-    # use `create_object` instead of its constructor
-    if hasattr(obj_cls, "create_object"):
-        obj = obj_cls.create_object(d)
-    else:
-        obj = obj_cls()
-    # get member's type info
-    types = obj_cls._types() if getattr(obj_cls, "_types", None) else {}
-    # set values to object
-    for k, v in d.items():
-        if k in types:
-            if hasattr(types[k], "from_dict"):
-                setattr(obj, k, types[k].from_dict(v))
-            else:
-                setattr(obj, k, loadd(v, types[k]))
-        else:
-            setattr(obj, k, v)
-    return obj
+    # convert by the decoder compiled for the class
+    decoder = _decoders.get(obj_cls)
+    if decoder is None:
+        decoder = _decoders[obj_cls] = _compile_decoder(obj_cls)
+    return decoder(d)
 
 
-def dumps(obj, **kwargs):
+def dumps(obj, codec=None, compressor=None, **kwargs):
     """
     Encode object/dict to JSON
 
@@ -129,19 +229,26 @@ def dumps(obj, **kwargs):
     ----------
     obj : object
         Object to encode
+    codec : str or minette.codec.Codec, default None
+        Codec to encode like "orjson" or "msgpack". If None, encode to JSON
+        using json in standard library with kwargs
+    compressor : minette.codec.Compressor, default None
+        Compressor to compress large values
 
     Returns
     -------
     s : str
-        JSON string
+        JSON string (or tagged string for binary codec and compressed value)
     """
     if obj is None:
         return ""
     d = dumpd(obj)
+    if codec is not None or compressor is not None:
+        return encode(d, codec, compressor)
     return json.dumps(d, default=_encode_datetime, **kwargs)
 
 
-def loads(s, obj_cls=None, **kwargs):
+def loads(s, obj_cls=None, *, datetime_decoding=None, codec=None, **kwargs):
     """
     Decode JSON to dict/object
 
@@ -151,6 +258,13 @@ def loads(s, obj_cls=None, **kwargs):
         JSON string to decode
     obj_cls : type, default None
         Class of object to convert. If None, convert to dict
+    datetime_decoding : str, default None
+        How to decode datetime. "schema" (default) decodes only the members
+        declared as `datetime` in `_types()` of obj_cls. "legacy" converts
+        all strings that look like datetime.
+    codec : str or minette.codec.Codec, default None
+        Codec to decode JSON like "orjson". Values written by binary codecs
+        are decoded by the codec recorded in the value regardless of this.
 
     Returns
     -------
@@ -159,7 +273,12 @@ def loads(s, obj_cls=None, **kwargs):
     """
     if s is None or s == "":
         return None
-    d = json.loads(s, object_hook=_decode_datetime, **kwargs)
+    if datetime_decoding == "legacy":
+        kwargs["object_hook"] = _decode_datetime
+    if codec is not None or s.startswith(TAG_PREFIX):
+        d = decode(s, codec=codec, object_hook=kwargs.get("object_hook"))
+    else:
+        d = json.loads(s, **kwargs)
     if obj_cls is None:
         return d
     else:
@@ -171,17 +290,20 @@ class Serializable:
     Base class for serializable object
 
     """
+    __slots__ = ()
 
     @classmethod
     def _types(cls):
         """
         Override this method to create instance of specific class for members.
         Configure like below then instance of `Foo` will be set to `self.foo`
-        and `Bar` to `self.bar`
+        and `Bar` to `self.bar`, and ISO 8601 string to `self.baz` is
+        decoded as `datetime`
         ```
         return {
             "foo": Foo,
-            "bar": Bar
+            "bar": Bar,
+            "baz": datetime
         }
         ```
         """
@@ -206,7 +328,7 @@ class Serializable:
         d : dict
             Object as dict
         """
-        return dumpd(self)
+        return _encode_object(self)
 
     def to_json(self, **kwargs):
         """
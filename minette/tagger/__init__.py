@@ -1 +1,2 @@
 from .base import Tagger
+from .cachedtagger import CachedTagger
@@ -1,6 +1,9 @@
 """ Base for Taggers """
 from logging import getLogger
 
+from ..utils import run_in_executor
+from ..models import TokenTable
+
 
 class Tagger:
     """
@@ -82,3 +85,59 @@ class Tagger:
             Word nodes
         """
         return [wn for wn in self.parse_as_generator(text, max_length)]
+
+    def fallback(self, text, max_length=None):
+        """
+        Get words used when parsing fails. Override this method for
+        the taggers that raise errors from `parse_as_generator`
+
+        Parameters
+        ----------
+        text : str
+            Text to analyze
+        max_length : int, default None
+            Max length of the text to parse
+
+        Returns
+        -------
+        words : list of minette.WordNode (empty)
+            Word nodes
+        """
+        return []
+
+    def parse_as_table(self, text, max_length=None):
+        """
+        Analyze and parse text, returns columnar token table
+
+        Parameters
+        ----------
+        text : str
+            Text to analyze
+        max_length : int, default None
+            Max length of the text to parse
+
+        Returns
+        -------
+        table : minette.TokenTable
+            Token table
+        """
+        return TokenTable.from_words(
+            self.parse_as_generator(text, max_length), text=text or "")
+
+    async def parse_async(self, text, max_length=None):
+        """
+        Analyze and parse text without blocking the event loop
+
+        Parameters
+        ----------
+        text : str
+            Text to analyze
+        max_length : int, default None
+            Max length of the text to parse
+
+        Returns
+        -------
+        words : list of minette.WordNode (empty)
+            Word nodes
+        """
+        return await run_in_executor(self.parse, text, max_length)
@@ -0,0 +1,145 @@
+""" LRU cache of parsed words for any tagger """
+from collections import OrderedDict
+import threading
+import unicodedata
+
+from .base import Tagger
+
+
+class CachedTagger(Tagger):
+    """
+    Tagger that caches the words parsed by the other tagger
+
+    Texts are normalized (NFC and stripped) to make the key of cache.
+    The parsed words are returned as new list for each request, but the
+    word nodes are shared among the requests. Don't modify them.
+
+    Attributes
+    ----------
+    tagger : minette.Tagger
+        Tagger to parse text
+    cache_size : int
+        Max number of texts cached
+    config : minette.Config
+        Configuration
+    timezone : pytz.timezone
+        Timezone
+    logger : logging.Logger
+        Logger
+    """
+    DEFAULT_CACHE_SIZE = 1024
+
+    def __init__(self, tagger, cache_size=None, **kwargs):
+        """
+        Parameters
+        ----------
+        tagger : minette.Tagger
+            Tagger to parse text
+        cache_size : int, default None
+            Max number of texts cached. Use `tagger_cache_size` in
+            configuration file or 1024 by default
+        """
+        super().__init__(
+            config=tagger.config, timezone=tagger.timezone,
+            logger=tagger.logger, max_length=tagger.max_length)
+        self.tagger = tagger
+        self.cache_size = cache_size or \
+            int(tagger.config.get("tagger_cache_size") or 0
+                if tagger.config else 0) or \
+            self.DEFAULT_CACHE_SIZE
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def validate(self, text, max_length=None):
+        return self.tagger.validate(text, max_length)
+
+    def fallback(self, text, max_length=None):
+        return self.tagger.fallback(text, max_length)
+
+    def parse_as_generator(self, text, max_length=None):
+        """
+        Analyze and parse text using cache, returns Generator
+
+        Parameters
+        ----------
+        text : str
+            Text to analyze
+        max_length : int, default None
+            Max length of the text to parse
+
+        Returns
+        -------
+        words : Generator of minette.WordNode
+            Word nodes
+        """
+        yield from self.parse(text, max_length)
+
+    def parse(self, text, max_length=None):
+        """
+        Analyze and parse text using cache
+
+        Parameters
+        ----------
+        text : str
+            Text to analyze
+        max_length : int, default None
+            Max length of the text to parse
+
+        Returns
+        -------
+        words : list of minette.WordNode
+            Word nodes
+        """
+        if self.validate(text, max_length) is False:
+            return []
+
+        key = unicodedata.normalize("NFC", text).strip()
+        with self._lock:
+            words = self._cache.get(key)
+            if words is not None:
+                self._cache.move_to_end(key)
+                self._counters["hits"] += 1
+                return list(words)
+            self._counters["misses"] += 1
+
+        # parse out of lock not to block the other threads
+        try:
+            words = tuple(self.tagger.parse_as_generator(text, max_length))
+        except Exception as ex:
+            # not cached to parse again at the next time
+            self.logger.warning(
+                "Error occured in parsing, words are not cached: " + str(ex))
+            return self.tagger.fallback(text, max_length)
+
+        with self._lock:
+            self._cache[key] = words
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self._counters["evictions"] += 1
+        return list(words)
+
+    def clear(self):
+        """
+        Clear cache
+
+        """
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        """
+        Get metrics of the cache
+
+        Returns
+        -------
+        stats : dict
+            Number of texts cached and counters
+        """
+        with self._lock:
+            stats = {"size": len(self._cache)}
+            stats.update(self._counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -33,6 +33,7 @@ class JanomeNode(WordNode):
     pronunciation : str
         Pronunciation of the word
     """
+    __slots__ = ()
 
     @classmethod
     def create(cls, surface, features):
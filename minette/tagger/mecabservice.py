@@ -1,6 +1,9 @@
 """ Tagger using mecab-service """
+import time
 import traceback
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from ..models import WordNode
 from .base import Tagger
@@ -33,6 +36,7 @@ class MeCabServiceNode(WordNode):
     pronunciation : str
         Pronunciation of the word
     """
+    __slots__ = ()
 
     @classmethod
     def create(cls, surface, features):
@@ -74,10 +78,29 @@ class MeCabServiceTagger(Tagger):
         Logger
     api_url : str
         URL for MeCabService API
+    batch_api_url : str
+        URL for MeCabService API to parse multiple texts at once
+    session : requests.Session
+        HTTP session that keeps and reuses the connections
+    connect_timeout : float
+        Seconds to wait for connecting to the service
+    read_timeout : float
+        Seconds to wait for the response from the service
+    retries : int
+        Max number of retries on connection errors and 502/503/504
+    latency_budget : float
+        Seconds to give up waiting for the service and use fallback
+    fallback_tagger : minette.Tagger
+        Tagger used when the service fails or exceeds latency budget
     """
+    RETRY_STATUSES = (502, 503, 504)
+    BACKOFF_FACTOR = 0.1
 
     def __init__(self, config=None, timezone=None, logger=None, *,
-                 api_url=None, **kwargs):
+                 max_length=Tagger.MAX_LENGTH, api_url=None,
+                 batch_api_url=None, pool_size=10, connect_timeout=3.05,
+                 read_timeout=10, retries=2, latency_budget=None,
+                 fallback_tagger=None, **kwargs):
         """
         Parameters
         ----------
@@ -87,11 +110,35 @@ class MeCabServiceTagger(Tagger):
             Timezone
         logger : Logger, default None
             Logger
+        max_length : int, default 1000
+            Max length of the text to parse
         api_url : str, default None
             URL for MeCabService API.
             If None trial URL is used.
+        batch_api_url : str, default None
+            URL for MeCabService API that takes `{"texts": [...]}` and
+            returns `{"results": [{"nodes": [...]}, ...]}`.
+            If None texts are parsed one by one in `parse_batch`.
+        pool_size : int, default 10
+            Max number of connections kept alive
+        connect_timeout : float, default 3.05
+            Seconds to wait for connecting to the service
+        read_timeout : float, default 10
+            Seconds to wait for the response from the service
+        retries : int, default 2
+            Max number of retries on connection errors and 502/503/504
+        latency_budget : float, default None
+            Seconds to give up waiting for the service including retries.
+            Timeouts are shortened to the time remaining, retries are
+            given up when the budget is exceeded and `fallback_tagger`
+            is used. No budget if None.
+        fallback_tagger : Tagger, default None
+            Tagger used when the service fails or exceeds latency budget.
+            Empty list is returned if None.
         """
-        super().__init__(config=config, timezone=timezone, logger=logger)
+        super().__init__(
+            config=config, timezone=timezone, logger=logger,
+            max_length=max_length)
         if not api_url:
             self.api_url = "https://api.uezo.net/mecab/parse"
             self.logger.warning(
@@ -100,32 +147,184 @@ class MeCabServiceTagger(Tagger):
                 "Install MeCab and use MeCabTagger instead.")
         else:
             self.api_url = api_url
+        self.batch_api_url = batch_api_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.latency_budget = latency_budget
+        self.fallback_tagger = fallback_tagger
+        # retried by _post not to exceed latency budget
+        self.session = self._get_session(
+            pool_size, retries if latency_budget is None else 0)
 
-    def parse(self, text):
+    def _get_session(self, pool_size, retries):
+        retry_params = {
+            "total": retries, "backoff_factor": self.BACKOFF_FACTOR,
+            "status_forcelist": self.RETRY_STATUSES,
+            "raise_on_status": False
+        }
+        try:
+            # parsing is idempotent so POST can be retried
+            retry = Retry(allowed_methods=frozenset(["POST"]), **retry_params)
+        except TypeError:
+            # urllib3 < 1.26
+            retry = Retry(method_whitelist=frozenset(["POST"]), **retry_params)
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"content-type": "application/json"})
+        return session
+
+    def _post(self, url, data):
+        if self.latency_budget is None:
+            resp = self.session.post(
+                url, json=data,
+                timeout=(self.connect_timeout, self.read_timeout))
+            resp.raise_for_status()
+            return resp.json()
+
+        # retry in the latency budget instead of urllib3
+        deadline = time.monotonic() + self.latency_budget
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                resp = self.session.post(url, json=data, timeout=(
+                    min(self.connect_timeout, remaining),
+                    min(self.read_timeout, remaining)))
+                if resp.status_code not in self.RETRY_STATUSES or \
+                        attempt >= self.retries:
+                    resp.raise_for_status()
+                    return resp.json()
+            except requests.RequestException as ex:
+                if not isinstance(
+                        ex, (requests.ConnectionError, requests.Timeout)) \
+                        or attempt >= self.retries:
+                    raise
+            attempt += 1
+            backoff = self.BACKOFF_FACTOR * (2 ** (attempt - 1))
+            if deadline - time.monotonic() <= backoff:
+                raise requests.Timeout(
+                    "Latency budget exceeded: {} seconds".format(
+                        self.latency_budget))
+            time.sleep(backoff)
+
+    def _log_error(self, ex):
+        if isinstance(ex, requests.Timeout):
+            self.logger.warning(
+                "MeCab Service timeout, use fallback: " + str(ex))
+        else:
+            self.logger.error(
+                "MeCab Service parsing error: "
+                + str(ex) + "\n" + traceback.format_exc())
+
+    def fallback(self, text, max_length=None):
+        """
+        Parse text by `fallback_tagger` when the service fails
+
+        Parameters
+        ----------
+        text : str
+            Text to analyze
+        max_length : int, default None
+            Max length of the text to parse
+
+        Returns
+        -------
+        words : list of minette.WordNode
+            Word nodes. Empty list if `fallback_tagger` is None
+        """
+        if self.fallback_tagger:
+            return self.fallback_tagger.parse(text, max_length)
+        return []
+
+    def parse_as_generator(self, text, max_length=None):
+        """
+        Parse and annotate using MeCab Service, returns Generator.
+        Errors of the service are raised without fallback
+
+        Parameters
+        ----------
+        text : str
+            Text to analyze
+        max_length : int, default None
+            Max length of the text to parse
+
+        Returns
+        -------
+        words : Generator of minette.MeCabServiceNode
+            MeCabService nodes
+        """
+        if self.validate(text, max_length) is False:
+            return
+        parsed_json = self._post(self.api_url, {"text": text})
+        for n in parsed_json["nodes"]:
+            yield MeCabServiceNode.create(n["surface"], n["features"])
+
+    def parse(self, text, max_length=None):
         """
-        Parse and annotate using MeCab Service
+        Parse and annotate using MeCab Service. `fallback_tagger` is used
+        when the service fails
 
         Parameters
         ----------
         text : str
             Text to analyze
+        max_length : int, default None
+            Max length of the text to parse
 
         Returns
         -------
         words : list of minette.MeCabServiceNode
             MeCabService nodes
         """
-        ret = []
-        if not text:
+        try:
+            return list(self.parse_as_generator(text, max_length))
+        except Exception as ex:
+            self._log_error(ex)
+            return self.fallback(text, max_length)
+
+    def parse_batch(self, texts, max_length=None):
+        """
+        Parse and annotate multiple texts using MeCab Service
+
+        Parameters
+        ----------
+        texts : list of str
+            Texts to analyze
+        max_length : int, default None
+            Max length of each text to parse
+
+        Returns
+        -------
+        words_list : list of list of minette.MeCabServiceNode
+            MeCabService nodes for each text
+        """
+        if not self.batch_api_url:
+            return [self.parse(t, max_length) for t in texts]
+
+        ret = [[] for _ in texts]
+        indexes = [i for i, t in enumerate(texts)
+                   if self.validate(t, max_length) is not False]
+        if not indexes:
             return ret
         try:
-            parsed_json = requests.post(
-                self.api_url, headers={"content-type": "application/json"},
-                json={"text": text}, timeout=10).json()
-            ret = [MeCabServiceNode.create(
-                n["surface"], n["features"]) for n in parsed_json["nodes"]]
+            parsed_json = self._post(
+                self.batch_api_url, {"texts": [texts[i] for i in indexes]})
+            for i, result in zip(indexes, parsed_json["results"]):
+                ret[i] = [MeCabServiceNode.create(
+                    n["surface"], n["features"]) for n in result["nodes"]]
         except Exception as ex:
-            self.logger.error(
-                "MeCab Service parsing error: "
-                + str(ex) + "\n" + traceback.format_exc())
+            self._log_error(ex)
+            for i in indexes:
+                ret[i] = self.fallback(texts[i], max_length)
         return ret
+
+    def close(self):
+        """
+        Close the connections kept alive
+
+        """
+        self.session.close()
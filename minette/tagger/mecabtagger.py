@@ -1,4 +1,5 @@
 """ tagger using mecab """
+import threading
 import traceback
 import MeCab
 
@@ -33,6 +34,7 @@ class MeCabNode(WordNode):
     pronunciation : str
         Pronunciation of the word
     """
+    __slots__ = ()
 
     @classmethod
     def create(cls, surface, features):
@@ -72,7 +74,56 @@ class MeCabTagger(Tagger):
         Timezone
     logger : logging.Logger
         Logger
+    options : str
+        Options for MeCab.Tagger
+    user_dic : str
+        Path to user dictionary
     """
+    DEFAULT_OPTIONS = "-Ochasen"
+
+    def __init__(self, config=None, timezone=None, logger=None, *,
+                 max_length=Tagger.MAX_LENGTH, options=None, user_dic=None,
+                 **kwargs):
+        """
+        Parameters
+        ----------
+        config : Config, default None
+            Configuration
+        timezone : timezone, default None
+            Timezone
+        logger : Logger, default None
+            Logger
+        max_length : int, default 1000
+            Max length of the text to parse
+        options : str, default None
+            Options for MeCab.Tagger. Use `mecab_options` in configuration
+            file or "-Ochasen" by default
+        user_dic : str, default None
+            Path to user dictionary compiled by mecab-dict-index.
+            Use `mecab_userdic` in configuration file by default
+        """
+        super().__init__(logger=logger, config=config, timezone=timezone, max_length=max_length)
+        self.options = options or \
+            (config.get("mecab_options") if config else None) or \
+            self.DEFAULT_OPTIONS
+        self.user_dic = user_dic or \
+            (config.get("mecab_userdic") if config else None)
+        # MeCab.Tagger is not thread-safe so keep one for each thread
+        self._local = threading.local()
+        # create at startup to find errors of options or dictionaries early
+        self._get_mecab()
+
+    def _get_mecab(self):
+        m = getattr(self._local, "mecab", None)
+        if m is None:
+            options = self.options
+            if self.user_dic:
+                options += " -u " + self.user_dic
+            m = MeCab.Tagger(options)
+            # m.parse("") before m.parseToNode(text) against the bug that node.surface is not set
+            m.parse("")
+            self._local.mecab = m
+        return m
 
     def parse_as_generator(self, text, max_length=None):
         """
@@ -94,10 +145,7 @@ class MeCabTagger(Tagger):
             return
 
         try:
-            m = MeCab.Tagger("-Ochasen")
-            # m.parse("") before m.parseToNode(text) against the bug that node.surface is not set
-            m.parse("")
-            node = m.parseToNode(text)
+            node = self._get_mecab().parseToNode(text)
             while node:
                 features = node.feature.split(",")
                 if features[0] != "BOS/EOS":
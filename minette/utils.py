@@ -1,6 +1,9 @@
 """ Utilities functions for minette """
 from datetime import datetime
 import calendar
+import asyncio
+import inspect
+from functools import partial
 
 
 def date_to_str(dt, with_timezone=False):
@@ -84,3 +87,43 @@ def unixtime_to_date(unixtime, tz=None):
         datetime
     """
     return datetime.fromtimestamp(unixtime, tz=tz)
+
+
+async def run_in_executor(func, *args, executor=None, **kwargs):
+    """
+    Run synchronous function in executor and await its result
+
+    Parameters
+    ----------
+    func : callable
+        Synchronous function to run
+    executor : concurrent.futures.Executor, default None
+        Executor to run function. Use default executor of the loop if None.
+
+    Returns
+    -------
+    result : Any
+        Return value of func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, partial(func, *args, **kwargs))
+
+
+async def await_if_needed(value):
+    """
+    Await value if it is awaitable
+
+    Parameters
+    ----------
+    value : Any
+        Return value of the hook that can be both sync and async
+
+    Returns
+    -------
+    result : Any
+        Awaited value or value itself
+    """
+    if inspect.isawaitable(value):
+        return await value
+    return value
@@ -0,0 +1,194 @@
+import pytest
+import threading
+from datetime import datetime
+from pytz import timezone
+
+from minette import (
+    ConnectionProvider,
+    SQLiteConnectionProvider,
+    SQLiteMessageLogStore,
+    BufferedMessageLogStore,
+    Message,
+    Response,
+    Context
+)
+from minette.utils import date_to_unixtime
+
+now = datetime.now(tz=timezone("Asia/Tokyo"))
+table_name = "bufferedlog" + str(date_to_unixtime(now))
+
+
+def get_store(suffix, **kwargs):
+    provider = SQLiteConnectionProvider("test.db")
+    store = SQLiteMessageLogStore(table_name=table_name + suffix)
+    with provider.get_connection() as connection:
+        store.prepare_table(connection)
+    return provider, BufferedMessageLogStore(store, provider, **kwargs)
+
+
+def count_logs(provider, suffix):
+    connection = provider.get_connection()
+    cursor = connection.cursor()
+    cursor.execute("select count(*) from {}".format(table_name + suffix))
+    count = cursor.fetchone()[0]
+    connection.close()
+    return count
+
+
+def test_write_in_batches():
+    provider, bs = get_store("_b", batch_size=10, flush_interval=3600)
+    for i in range(25):
+        bs.save(Message(text="hello" + str(i)), Response(), Context(), None)
+    # full batches are written without waiting for flush interval
+    assert bs.flush(timeout=10) is True
+    assert count_logs(provider, "_b") == 25
+    stats = bs.stats()
+    assert stats["queued"] == 25
+    assert stats["written"] == 25
+    assert stats["batches"] == 3
+    assert stats["size"] == 0
+
+    bs.save_many(
+        [(Message(text="many"), Response(), Context()) for _ in range(3)])
+    bs.close()
+    assert count_logs(provider, "_b") == 28
+    # logs after closing are dropped
+    bs.save(Message(text="closed"), Response(), Context(), None)
+    assert bs.stats()["dropped"] == 1
+
+
+def test_flattened_when_queued():
+    provider, bs = get_store("_f", flush_interval=3600)
+    request = Message(text="before")
+    bs.save(request, Response(), Context(), None)
+    request.text = "after"
+    bs.close()
+    connection = provider.get_connection()
+    cursor = connection.cursor()
+    cursor.execute("select request_text from {}".format(table_name + "_f"))
+    assert cursor.fetchone()[0] == "before"
+    connection.close()
+
+
+@pytest.mark.parametrize("overflow,expected", [
+    ("drop_new", ["0", "1"]),
+    ("drop_old", ["2", "3"]),
+])
+def test_drop(overflow, expected):
+    provider, bs = get_store(
+        "_" + overflow, queue_size=2, flush_interval=3600, overflow=overflow)
+    # stop the writer while queueing
+    with bs._condition:
+        bs._enqueue([bs._to_record(
+            Message(text=str(i)), Response(), Context()) for i in range(4)])
+    assert bs.stats()["dropped"] == 2
+    bs.close()
+    connection = provider.get_connection()
+    cursor = connection.cursor()
+    cursor.execute(
+        "select request_text from {} order by id".format(
+            table_name + "_" + overflow))
+    assert [r[0] for r in cursor.fetchall()] == expected
+    connection.close()
+
+
+def test_block():
+    provider, bs = get_store(
+        "_block", queue_size=2, batch_size=2, flush_interval=3600,
+        overflow="block", block_timeout=10)
+    threads = [threading.Thread(target=bs.save, args=(
+        Message(text=str(i)), Response(), Context(), None))
+        for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    bs.close()
+    assert count_logs(provider, "_block") == 6
+    assert bs.stats()["dropped"] == 0
+
+
+def test_invalid_overflow():
+    store = SQLiteMessageLogStore(table_name=table_name)
+    with pytest.raises(ValueError):
+        BufferedMessageLogStore(
+            store, SQLiteConnectionProvider("test.db"), overflow="unknown")
+
+
+class TableConnection:
+    # connection without transaction like Azure Table
+    def __init__(self):
+        self.entities = []
+
+
+class TableConnectionProvider(ConnectionProvider):
+    def __init__(self):
+        self.connection = TableConnection()
+
+    def get_connection(self):
+        return self.connection
+
+
+class TableMessageLogStore(SQLiteMessageLogStore):
+    def get_sqls(self):
+        return {}
+
+    def save_records(self, records, connection):
+        connection.entities.extend(records)
+
+
+def test_write_without_sql():
+    provider = TableConnectionProvider()
+    bs = BufferedMessageLogStore(
+        TableMessageLogStore(), provider, flush_interval=3600)
+    request = Message(text="before")
+    context = Context()
+    context.data["key"] = "before"
+    bs.save(request, Response(), context, None)
+    # serialized when queued
+    request.text = "after"
+    context.data["key"] = "after"
+    bs.close()
+    assert bs.stats()["written"] == 1
+    assert bs.stats()["failed"] == 0
+    record = provider.connection.entities[0]
+    assert record["request_text"] == "before"
+    assert '"before"' in record["context_json"]
+
+
+class FailingMessageLogStore(TableMessageLogStore):
+    def __init__(self, fail_count, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_count = fail_count
+
+    def save_records(self, records, connection):
+        if self.fail_count > 0:
+            self.fail_count -= 1
+            raise Exception("write error")
+        super().save_records(records, connection)
+
+
+def test_write_retry():
+    # written at retry
+    provider = TableConnectionProvider()
+    bs = BufferedMessageLogStore(
+        FailingMessageLogStore(1), provider, flush_interval=0.1)
+    bs.save(Message(text="hello"), Response(), Context(), None)
+    bs.close()
+    assert len(provider.connection.entities) == 1
+    stats = bs.stats()
+    assert stats["written"] == 1
+    assert stats["retried"] == 1
+    assert stats["failed"] == 0
+
+    # dropped when retry fails
+    provider = TableConnectionProvider()
+    bs = BufferedMessageLogStore(
+        FailingMessageLogStore(2), provider, flush_interval=0.1)
+    bs.save(Message(text="hello"), Response(), Context(), None)
+    bs.close()
+    assert provider.connection.entities == []
+    stats = bs.stats()
+    assert stats["written"] == 0
+    assert stats["retried"] == 1
+    assert stats["failed"] == 1
@@ -0,0 +1,191 @@
+import pytest
+import time
+from datetime import datetime, timedelta
+from pytz import timezone
+
+from minette import (
+    SQLiteConnectionProvider,
+    SQLiteContextStore,
+    CachedContextStore,
+    Context
+)
+from minette.datastore import UnitOfWork
+from minette.utils import date_to_unixtime
+
+now = datetime.now(tz=timezone("Asia/Tokyo"))
+table_name = "cachedcontext" + str(date_to_unixtime(now))
+user_id = "user_id" + str(date_to_unixtime(now))
+
+
+@pytest.fixture
+def connection():
+    with SQLiteConnectionProvider("test.db").get_connection() as connection:
+        yield connection
+
+
+def get_store(connection, **kwargs):
+    store = SQLiteContextStore(
+        table_name=table_name, timezone=timezone("Asia/Tokyo"), timeout=300)
+    store.prepare_table(connection)
+    return store, CachedContextStore(store, **kwargs)
+
+
+def test_write_through(connection):
+    store, cs = get_store(connection, cache_size=2)
+    assert cs.timeout == 300
+
+    ctx = cs.get("TEST", user_id + "_wt", connection)
+    assert ctx.is_new is True
+    ctx.topic.name = "cached"
+    ctx.data["key"] = "value"
+    cs.save(ctx, connection)
+
+    # saved to the store at the same time
+    ctx_stored = store.get("TEST", user_id + "_wt", connection)
+    assert ctx_stored.topic.name == "cached"
+    assert ctx_stored.data == {"key": "value"}
+
+    # served from cache
+    ctx = cs.get("TEST", user_id + "_wt", connection)
+    assert ctx.is_new is False
+    assert ctx.topic.name == "cached"
+    assert ctx.data == {"key": "value"}
+    # cached context is not shared
+    ctx.data["key"] = "changed"
+    assert cs.get("TEST", user_id + "_wt", connection).data["key"] == "value"
+    stats = cs.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["writes"] == 1
+    assert stats["hit_ratio"] == 2 / 3
+
+    # eviction
+    for i in range(3):
+        cs.save(Context("TEST", user_id + "_wt" + str(i)), connection)
+    assert cs.stats()["size"] == 2
+    assert cs.stats()["evictions"] == 2
+    # evicted context is read from the store
+    ctx = cs.get("TEST", user_id + "_wt", connection)
+    assert ctx.data == {"key": "value"}
+    assert cs.stats()["misses"] == 2
+
+
+def test_timeout(connection):
+    store, cs = get_store(connection)
+    ctx = cs.get("TEST", user_id + "_to", connection)
+    ctx.data["key"] = "value"
+    ctx.timestamp = datetime.now(timezone("Asia/Tokyo")) - timedelta(seconds=301)
+    cs.save(ctx, connection)
+    ctx = cs.get("TEST", user_id + "_to", connection)
+    assert ctx.is_new is True
+    assert ctx.data == {}
+    assert cs.stats()["expirations"] == 1
+    assert cs.stats()["size"] == 0
+
+
+def test_write_behind(connection):
+    store, cs = get_store(connection, write_behind=True, flush_interval=3600)
+    keys = [("TEST", user_id + "_wb" + str(i)) for i in range(3)]
+    contexts = cs.get_many(keys, connection)
+    for ctx in contexts.values():
+        ctx.data["key"] = ctx.channel_user_id
+    cs.save_many(contexts.values(), connection)
+
+    # not saved to the store yet
+    assert store.get(*keys[0], connection).is_new is True
+    assert cs.stats()["dirty"] == 3
+    contexts = cs.get_many(keys, connection)
+    assert [c.data["key"] for c in contexts.values()] == [k[1] for k in keys]
+
+    assert cs.flush(connection) == 3
+    assert cs.stats()["dirty"] == 0
+    ctx = store.get(*keys[0], connection)
+    assert ctx.is_new is False
+    assert ctx.data == {"key": keys[0][1]}
+
+
+def test_rollback(connection):
+    store, cs = get_store(connection)
+    uow = UnitOfWork(connection)
+    ctx = cs.get("TEST", user_id + "_rb", connection)
+    ctx.data["key"] = "value"
+    cs.save(ctx, uow)
+    assert cs.stats()["size"] == 1
+    uow.rollback()
+    assert cs.stats()["size"] == 0
+    assert cs.get("TEST", user_id + "_rb", connection).is_new is True
+
+
+
+def test_rollback_write_behind(connection):
+    store, cs = get_store(connection, write_behind=True, flush_interval=3600)
+    ctx = cs.get("TEST", user_id + "_rbwb", connection)
+    ctx.data["key"] = "first"
+    cs.save(ctx, connection)
+
+    # the change in the turn rolled back is discarded
+    uow = UnitOfWork(connection)
+    ctx = cs.get("TEST", user_id + "_rbwb", connection)
+    ctx.data["key"] = "second"
+    cs.save(ctx, uow)
+    uow.rollback()
+
+    # the change not flushed before the turn is kept
+    assert cs.stats()["dirty"] == 1
+    assert cs.get("TEST", user_id + "_rbwb", connection).data == {"key": "first"}
+    assert cs.flush(connection) == 1
+    assert store.get("TEST", user_id + "_rbwb", connection).data == {"key": "first"}
+
+
+def test_background_flush(connection):
+    provider = SQLiteConnectionProvider("test.db")
+    store, cs = get_store(
+        connection, write_behind=True, flush_interval=0.1,
+        connection_provider=provider)
+    ctx = cs.get("TEST", user_id + "_bg", connection)
+    ctx.data["key"] = "value"
+    cs.save(ctx, connection)
+    assert cs.stats()["dirty"] == 1
+
+    # flushed by the background thread
+    time.sleep(0.5)
+    assert cs.stats()["dirty"] == 0
+    assert store.get("TEST", user_id + "_bg", connection).data == {"key": "value"}
+    cs.close()
+    assert cs._thread.is_alive() is False
+
+
+def test_close(connection):
+    provider = SQLiteConnectionProvider("test.db")
+    store, cs = get_store(
+        connection, write_behind=True, flush_interval=3600,
+        connection_provider=provider)
+    ctx = cs.get("TEST", user_id + "_cl", connection)
+    ctx.data["key"] = "value"
+    cs.save(ctx, connection)
+
+    # flushed at close
+    assert cs.close() == 1
+    assert store.get("TEST", user_id + "_cl", connection).data == {"key": "value"}
+
+
+def test_rollback_flush(connection):
+    store, cs = get_store(connection, write_behind=True, flush_interval=3600)
+    other = cs.get("TEST", user_id + "_rbfo", connection)
+    other.data["key"] = "other"
+    cs.save(other, connection)
+
+    # flushed in the turn rolled back
+    uow = UnitOfWork(connection)
+    ctx = cs.get("TEST", user_id + "_rbf", connection)
+    ctx.data["key"] = "value"
+    cs.save(ctx, uow)
+    assert cs.flush(uow) == 2
+    uow.rollback()
+
+    # the context of the other user is queued again
+    assert cs.stats()["dirty"] == 1
+    assert store.get("TEST", user_id + "_rbfo", connection).is_new is True
+    assert cs.get("TEST", user_id + "_rbf", connection).is_new is True
+    assert cs.flush(connection) == 1
+    assert store.get("TEST", user_id + "_rbfo", connection).data == {"key": "other"}
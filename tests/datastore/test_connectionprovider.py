@@ -1,9 +1,12 @@
 import pytest
 import sqlite3
+import threading
+import time
 
 # SQLite
 from minette import (
     SQLiteConnectionProvider,
+    PooledConnectionProvider,
     Config
 )
 
@@ -76,3 +79,134 @@ def test_get_connection(connection_class, connection_provider_class, connection_
     with cp.get_connection() as connection:
         connection = cp.get_connection()
         assert isinstance(connection, connection_class)
+
+
+def test_pooled_connection():
+    cp = PooledConnectionProvider(SQLiteConnectionProvider("test.db"), max_size=2)
+    assert cp.connection_str == "test.db"
+
+    # reuse connection released at this thread
+    connection = cp.get_connection()
+    assert isinstance(connection, sqlite3.Connection)
+    cp.release_connection(connection)
+    assert cp.get_connection() is connection
+    assert cp.stats()["in_use"] == 1
+
+    # new connection is created when no idle connection
+    connection2 = cp.get_connection()
+    assert connection2 is not connection
+    cp.release_connection(connection)
+    cp.release_connection(connection2)
+    stats = cp.stats()
+    assert stats["size"] == 2
+    assert stats["idle"] == 2
+    assert stats["created"] == 2
+    assert stats["reused"] == 1
+
+    # released twice
+    cp.release_connection(connection)
+    assert cp.stats()["idle"] == 2
+
+    # connection not from the pool is closed
+    other = SQLiteConnectionProvider("test.db").get_connection()
+    cp.release_connection(other)
+    with pytest.raises(sqlite3.ProgrammingError):
+        other.cursor()
+    stats = cp.stats()
+    assert stats["size"] == 2
+    assert stats["closed"] == 1
+
+    cp.close_all()
+    assert cp.stats()["size"] == 0
+    assert cp.stats()["closed"] == 3
+
+
+def test_pooled_connection_uncommitted():
+    cp = PooledConnectionProvider(SQLiteConnectionProvider("test.db"))
+    connection = cp.get_connection()
+    cursor = connection.cursor()
+    cursor.execute("create table if not exists pool_test (value TEXT)")
+    connection.commit()
+    cursor.execute("insert into pool_test (value) values ('uncommitted')")
+    cp.release_connection(connection)
+
+    # changes are rolled back on release
+    connection = cp.get_connection()
+    cursor = connection.cursor()
+    cursor.execute("select * from pool_test where value='uncommitted'")
+    assert cursor.fetchall() == []
+    cp.release_connection(connection)
+    cp.close_all()
+
+
+def test_pooled_connection_timeout():
+    cp = PooledConnectionProvider(
+        SQLiteConnectionProvider("test.db"), max_size=1, checkout_timeout=0.1)
+    connection = cp.get_connection()
+    with pytest.raises(TimeoutError):
+        cp.get_connection()
+    assert cp.stats()["timeouts"] == 1
+
+    # wait for the connection released at the other thread
+    timer = threading.Timer(0.05, cp.release_connection, args=(connection, ))
+    timer.start()
+    assert cp.get_connection() is connection
+    timer.join()
+
+
+def test_pooled_connection_health_check():
+    cp = PooledConnectionProvider(SQLiteConnectionProvider("test.db"))
+    connection = cp.get_connection()
+    cp.release_connection(connection)
+    connection.close()
+
+    # broken connection is replaced
+    new_connection = cp.get_connection()
+    assert new_connection is not connection
+    new_connection.cursor().execute("select 1")
+    assert cp.stats()["health_check_failures"] == 1
+
+    # custom health check
+    cp = PooledConnectionProvider(
+        SQLiteConnectionProvider("test.db"), health_check=lambda c: False)
+    connection = cp.get_connection()
+    cp.release_connection(connection)
+    assert cp.get_connection() is not connection
+
+
+def test_pooled_connection_idle_timeout():
+    cp = PooledConnectionProvider(
+        SQLiteConnectionProvider("test.db"), min_size=1, idle_timeout=0.05)
+    connection1 = cp.get_connection()
+    connection2 = cp.get_connection()
+    cp.release_connection(connection1)
+    cp.release_connection(connection2)
+    time.sleep(0.1)
+
+    # idle connections over min_size are closed
+    cp.get_connection()
+    stats = cp.stats()
+    assert stats["closed"] == 1
+    assert stats["size"] == 1
+
+
+def test_pooled_connection_min_size():
+    # connections are created in advance
+    cp = PooledConnectionProvider(
+        SQLiteConnectionProvider("test.db"), min_size=2, max_size=3)
+    stats = cp.stats()
+    assert stats["size"] == 2
+    assert stats["idle"] == 2
+    assert stats["created"] == 2
+    connection = cp.get_connection()
+    assert cp.stats()["reused"] == 1
+    cp.release_connection(connection)
+    cp.close_all()
+
+    with pytest.raises(ValueError):
+        PooledConnectionProvider(
+            SQLiteConnectionProvider("test.db"), min_size=2, max_size=1)
+    # unknown arguments are not ignored
+    with pytest.raises(TypeError):
+        PooledConnectionProvider(
+            SQLiteConnectionProvider("test.db"), pool_size=2)
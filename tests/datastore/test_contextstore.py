@@ -6,6 +6,7 @@ from time import sleep
 from minette import (
     SQLiteStores,
     Context,
+    Topic,
     Config
 )
 
@@ -41,7 +42,8 @@ try:
 except Exception:
     pass
 
-from minette.utils import date_to_unixtime
+from minette.codec import orjson, msgpack
+from minette.utils import date_to_unixtime, date_to_str
 
 now = datetime.now(tz=timezone("Asia/Tokyo"))
 table_name = "context" + str(date_to_unixtime(now))
@@ -176,16 +178,51 @@ def test_save(datastore_class, connection_str):
         assert ctx.data == {
             "strvalue": "value1",
             "intvalue": 2,
-            "dtvalue": now,
+            "dtvalue": date_to_str(now, with_timezone=True),
             "dictvalue": {
                 "k1": "v1",
                 "k2": 2,
             }
         }
 
+        # decode strings like datetime
+        cs_legacy = datastore_class.context_store(
+            table_name=table_name, timezone=timezone("Asia/Tokyo"),
+            datetime_decoding="legacy")
+        ctx = cs_legacy.get("TEST", user_id, connection)
+        assert ctx.data["dtvalue"] == now
+
         # save (not saved)
         cs.save(Context(), connection)
 
+        # codec
+        if orjson is not None:
+            cs_orjson = datastore_class.context_store(
+                table_name=table_name, timezone=timezone("Asia/Tokyo"),
+                codec="orjson")
+            ctx = cs_orjson.get("TEST", user_id, connection)
+            assert ctx.data["dtvalue"] == date_to_str(now, with_timezone=True)
+            ctx.data["intvalue"] = 3
+            cs_orjson.save(ctx, connection)
+            ctx = cs.get("TEST", user_id, connection)
+            assert ctx.data["intvalue"] == 3
+
+        # compression
+        cs_zlib = datastore_class.context_store(
+            table_name=table_name, timezone=timezone("Asia/Tokyo"),
+            compression="zlib", compression_threshold=10)
+        ctx = cs_zlib.get("TEST", user_id, connection)
+        ctx.data["listvalue"] = ["item"] * 100
+        cs_zlib.save(ctx, connection)
+        if cs_zlib.json_data:
+            # JSON column (MySQL) is not compressed
+            assert cs_zlib.compressor is None
+        else:
+            assert cs_zlib.compressor.stats()["bytes_saved"] > 0
+        ctx = cs.get("TEST", user_id, connection)
+        assert ctx.data["listvalue"] == ["item"] * 100
+        assert ctx.data["strvalue"] == "value1"
+
     # timeout
     cs_timeout = datastore_class.context_store(
         table_name=table_name, timezone=timezone("Asia/Tokyo"), timeout=3)
@@ -202,3 +239,89 @@ def test_save(datastore_class, connection_str):
         ctx = cs_timeout.get("TEST", user_id + "_to", connection)
         assert ctx.is_new is True
         assert ctx.data == {}
+
+
+@pytest.mark.parametrize("datastore_class, connection_str", datastore_params)
+def test_get_many_save_many(datastore_class, connection_str):
+    if not datastore_class:
+        pytest.skip("Unable to import DataStoreSet")
+    if not connection_str:
+        pytest.skip(
+            "Connection string for {} is not provided"
+            .format(datastore_class.connection_provider.__name__))
+
+    cs = datastore_class.context_store(
+        table_name=table_name, timezone=timezone("Asia/Tokyo"))
+    keys = [("TEST", user_id + "_m" + str(i)) for i in range(3)] + [("TEST", "")]
+    with datastore_class.connection_provider(connection_str).get_connection() as connection:
+        contexts = cs.get_many(keys + [keys[0]], connection)
+        assert list(contexts.keys()) == keys
+        for k, ctx in contexts.items():
+            assert ctx.channel == k[0]
+            assert ctx.channel_user_id == k[1]
+            assert ctx.is_new is True
+            ctx.topic.name = "many"
+            ctx.data["key"] = k[1]
+        cs.save_many(contexts.values(), connection)
+        if hasattr(connection, "commit"):
+            connection.commit()
+
+        contexts = cs.get_many(keys, connection)
+        for k, ctx in contexts.items():
+            if k[1]:
+                assert ctx.is_new is False
+                assert ctx.topic.name == "many"
+                assert ctx.data == {"key": k[1]}
+            else:
+                assert ctx.is_new is True
+                assert ctx.data == {}
+
+
+@pytest.mark.parametrize("datastore_class, connection_str", datastore_params)
+def test_save_binary_codec(datastore_class, connection_str):
+    if not datastore_class:
+        pytest.skip("Unable to import DataStoreSet")
+    if msgpack is None:
+        pytest.skip("msgpack is not installed")
+    cs = datastore_class.context_store(
+        table_name=table_name, timezone=timezone("Asia/Tokyo"),
+        codec="msgpack")
+    # JSON column (MySQL) is written by JSON codec
+    assert cs.codec.binary is not cs.json_data
+    if datastore_class is MySQLStores:
+        assert cs.codec.name == "json"
+        assert not cs._to_params(Context("TEST", user_id))[7].startswith("~")
+    if not connection_str:
+        pytest.skip(
+            "Connection string for {} is not provided"
+            .format(datastore_class.connection_provider.__name__))
+
+    with datastore_class.connection_provider(connection_str).get_connection() as connection:
+        ctx = cs.get("TEST", user_id + "_mp", connection)
+        ctx.data["strvalue"] = "value1"
+        cs.save(ctx, connection)
+        ctx = datastore_class.context_store(
+            table_name=table_name, timezone=timezone("Asia/Tokyo")
+        ).get("TEST", user_id + "_mp", connection)
+        assert ctx.data == {"strvalue": "value1"}
+
+
+@pytest.mark.parametrize("datastore_class, connection_str", datastore_params)
+def test_compression_columns(datastore_class, connection_str):
+    if not datastore_class:
+        pytest.skip("Unable to import DataStoreSet")
+    cs = datastore_class.context_store(
+        table_name=table_name, timezone=timezone("Asia/Tokyo"),
+        compression="zlib", compression_threshold=10)
+    # JSON column (MySQL) is not compressed
+    assert (cs.compressor is None) is cs.json_data
+    ctx = Context("TEST", user_id)
+    ctx.topic.previous = Topic()
+    ctx.topic.previous.name = "long_topic_name" * 5
+    ctx.data["listvalue"] = ["item"] * 100
+    if not hasattr(cs, "_to_params"):
+        pytest.skip("{} doesn't use parameters".format(type(cs).__name__))
+    params = cs._to_params(ctx)
+    # previous topic (short VARCHAR column) is not compressed
+    assert not params[5].startswith("~")
+    assert params[7].startswith("~") is not cs.json_data
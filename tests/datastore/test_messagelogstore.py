@@ -1,5 +1,5 @@
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from pytz import timezone
 
 from minette import (
@@ -7,9 +7,10 @@ from minette import (
     Message,
     Response,
     Context,
-    Config
+    Config,
+    Payload
 )
-from minette.serializer import dumpd
+from minette.serializer import dumpd, dumps, loads
 
 SQLDBStores = None
 try:
@@ -171,3 +172,145 @@ def test_save(datastore_class, connection_str):
 
         assert record["request_text"] == "request message {}".format(str(date_to_unixtime(now)))
         assert record["response_text"] == "response message {}".format(str(date_to_unixtime(now)))
+
+
+@pytest.mark.parametrize("datastore_class, connection_str", datastore_params)
+def test_save_many(datastore_class, connection_str):
+    if not datastore_class:
+        pytest.skip("Unable to import DataStoreSet")
+    if not connection_str:
+        pytest.skip(
+            "Connection string for {} is not provided"
+            .format(datastore_class.connection_provider.__name__))
+
+    ms = datastore_class.messagelog_store(
+        table_name=table_name, timezone=timezone("Asia/Tokyo"))
+    request_id = "many" + str(date_to_unixtime(now))
+    logs = []
+    for i in range(3):
+        request = Message(
+            id=request_id, channel="TEST", channel_user_id=user_id,
+            text="request message {}".format(i))
+        response = Response(messages=[request.to_reply(text="response message {}".format(i))])
+        logs.append((request, response, Context("TEST", user_id)))
+    with datastore_class.connection_provider(connection_str).get_connection() as connection:
+        ms.save_many(logs, connection)
+        if hasattr(connection, "commit"):
+            connection.commit()
+        if AzureTableConnection and isinstance(connection, AzureTableConnection):
+            return
+        elif SQLAlchemyConnection and isinstance(connection, SQLAlchemyConnection):
+            records = [dumpd(r) for r in connection.query(SQLAlchemyMessageLog).filter(
+                SQLAlchemyMessageLog.request_id == request_id
+            ).order_by(SQLAlchemyMessageLog.id).all()]
+        else:
+            cursor = connection.cursor()
+            if MySQLConnection and isinstance(connection, MySQLConnection):
+                sql = "select * from {} where request_id = %s order by id"
+            else:
+                sql = "select * from {} where request_id = ? order by id"
+            cursor.execute(sql.format(table_name), (request_id, ))
+            records = []
+            for row in cursor.fetchall():
+                if isinstance(row, dict):
+                    records.append(row)
+                else:
+                    records.append(dict(zip([column[0] for column in cursor.description], row)))
+
+        assert [r["request_text"] for r in records] == ["request message {}".format(i) for i in range(3)]
+        assert [r["response_text"] for r in records] == ["response message {}".format(i) for i in range(3)]
+
+
+def test_serialize():
+    ms = SQLiteStores.messagelog_store(table_name=table_name)
+    request = Message(
+        channel="TEST", channel_user_id=user_id, text="request",
+        channel_message={"events": [{"type": "message"}]},
+        payloads=[Payload(content_type="image", url="https://image")])
+    response = Response(messages=[request.to_reply(
+        text="response", payloads=[Payload(content={"key": "value"})])])
+    context = Context("TEST", user_id)
+    context.data = {"key": "value"}
+    context.set_error(ValueError("error"))
+    request.words = [{"surface": "request"}]
+
+    record = ms._serialize(request, response, context)
+    assert list(record.keys()) == list(ms.COLUMNS)
+    # words parsed are written
+    assert loads(record["request_json"])["words"] == [{"surface": "request"}]
+    # same as serializing each object
+    assert record["request_json"] == request.to_json(codec=ms.codec)
+    assert record["response_json"] == response.to_json(codec=ms.codec)
+    assert record["context_json"] == context.to_json(codec=ms.codec)
+    assert record["request_payloads"] == dumps(
+        [p.to_dict() for p in request.payloads], codec=ms.codec)
+    assert record["response_payloads"] == dumps(
+        [p.to_dict() for p in response.messages[0].payloads], codec=ms.codec)
+    assert record["context_error"] == dumps(context.error, codec=ms.codec)
+
+    # exclude columns and keys in JSON
+    ms = SQLiteStores.messagelog_store(
+        table_name=table_name,
+        exclude_fields="request.channel_message, request.words, context.data,response_json")
+    record = ms._serialize(request, response, context)
+    assert "channel_message" not in loads(record["request_json"])
+    assert "words" not in loads(record["request_json"])
+    assert loads(record["request_json"])["text"] == "request"
+    assert "data" not in loads(record["context_json"])
+    assert record["response_json"] is None
+    assert record["response_text"] == "response"
+    assert ms._to_params(request, response, context)[-2] is None
+
+    with pytest.raises(ValueError):
+        SQLiteStores.messagelog_store(exclude_fields="unknown.key")
+
+
+def test_history():
+    ms = SQLiteStores.messagelog_store(
+        table_name=table_name + "_h", timezone=timezone("Asia/Tokyo"))
+    base = timezone("Asia/Tokyo").localize(datetime(2020, 1, 1, 9, 0, 0))
+    with SQLiteStores.connection_provider("test.db").get_connection() as connection:
+        assert ms.prepare_table(connection) is True
+        # indexes are created
+        cursor = connection.cursor()
+        cursor.execute(
+            "select name from sqlite_master where type='index' and tbl_name=?",
+            (table_name + "_h", ))
+        assert len(cursor.fetchall()) == 2
+        # created again for the existing table without error
+        assert ms.prepare_table(connection) is False
+
+        logs = []
+        for i in range(10):
+            for uid in ("user_a", "user_b"):
+                request = Message(
+                    channel="TEST", channel_user_id=uid, text=str(i),
+                    timestamp=base + timedelta(seconds=i // 2))
+                logs.append((request, Response(), Context("TEST", uid)))
+        ms.save_many(logs, connection)
+        connection.commit()
+
+        history = ms.get_history("TEST", "user_a", connection, limit=3)
+        assert [r["request_text"] for r in history] == ["9", "8", "7"]
+        assert history[0]["request_timestamp"] == base + timedelta(seconds=4)
+        history = ms.get_history(
+            "TEST", "user_a", connection, limit=3,
+            before=history[-1]["request_timestamp"])
+        assert [r["request_text"] for r in history] == ["5", "4", "3"]
+        # next page by the time and id of the oldest log
+        history = ms.get_history("TEST", "user_a", connection, limit=3)
+        history = ms.get_history(
+            "TEST", "user_a", connection, limit=3,
+            before=history[-1]["request_timestamp"],
+            before_id=history[-1]["id"])
+        assert [r["request_text"] for r in history] == ["6", "5", "4"]
+        assert ms.get_history("TEST", "unknown", connection) == []
+
+        # pages don't skip or repeat the logs at the same time
+        records = list(ms.scan(
+            base + timedelta(seconds=1), base + timedelta(seconds=4),
+            connection, batch_size=3))
+        assert len(records) == 12
+        assert [r["request_text"] for r in records] == \
+            [str(i) for i in range(2, 8) for _ in range(2)]
+        assert len(set(r["id"] for r in records)) == 12
@@ -0,0 +1,147 @@
+import pytest
+from datetime import datetime, timedelta
+from pytz import timezone
+
+from minette import (
+    Minette,
+    SQLiteConnectionProvider,
+    SQLiteMessageLogStore,
+    PartitionedMessageLogStore,
+    Message,
+    Response,
+    Context
+)
+from minette.scheduler import MessageLogRetentionTask
+from minette.utils import date_to_unixtime
+
+tz = timezone("Asia/Tokyo")
+now = datetime.now(tz=tz)
+table_name = "partitionedlog" + str(date_to_unixtime(now))
+
+
+@pytest.fixture
+def connection():
+    with SQLiteConnectionProvider("test.db").get_connection() as connection:
+        yield connection
+
+
+def get_store(suffix, period="daily"):
+    store = SQLiteMessageLogStore(table_name=table_name + suffix, timezone=tz)
+    return PartitionedMessageLogStore(store, period=period)
+
+
+def make_logs(days, uid="user"):
+    logs = []
+    for d in days:
+        for h in (9, 10):
+            request = Message(
+                channel="TEST", channel_user_id=uid,
+                text="{}-{}".format(d, h),
+                timestamp=tz.localize(datetime(2020, 1, d, h)))
+            logs.append((request, Response(), Context("TEST", uid)))
+    return logs
+
+
+def test_route_and_read(connection):
+    ps = get_store("_r")
+    assert ps.prepare_table(connection) is True
+    assert ps.partition_name(tz.localize(datetime(2020, 1, 2, 23))) == \
+        table_name + "_r_20200102"
+
+    logs = make_logs([1, 2, 3])
+    ps.save_many(logs[:4], connection)
+    ps.save(*logs[4], connection)
+    ps.save(*logs[5], connection)
+    connection.commit()
+    assert ps.list_partitions(connection)[:3] == [
+        table_name + "_r_2020010" + str(d) for d in (1, 2, 3)]
+
+    # history across partitions
+    history = ps.get_history("TEST", "user", connection, limit=3)
+    assert [r["request_text"] for r in history] == ["3-10", "3-9", "2-10"]
+    history = ps.get_history(
+        "TEST", "user", connection, limit=3,
+        before=history[-1]["request_timestamp"])
+    assert [r["request_text"] for r in history] == ["2-9", "1-10", "1-9"]
+    history = ps.get_history(
+        "TEST", "user", connection, limit=2,
+        before=history[0]["request_timestamp"], before_id=history[0]["id"])
+    assert [r["request_text"] for r in history] == ["1-10", "1-9"]
+
+    # scan across partitions
+    records = list(ps.scan(
+        tz.localize(datetime(2020, 1, 1, 10)),
+        tz.localize(datetime(2020, 1, 3, 10)), connection, batch_size=1))
+    assert [r["request_text"] for r in records] == \
+        ["1-10", "2-9", "2-10", "3-9"]
+
+
+def test_purge(connection):
+    ps = get_store("_p", period="monthly")
+    logs = make_logs([1])
+    for log in logs:
+        log[0].timestamp = log[0].timestamp.replace(year=2019)
+    ps.save_many(logs + make_logs([1]), connection)
+    connection.commit()
+    assert ps.list_partitions(connection) == [
+        table_name + "_p_201901", table_name + "_p_202001"]
+
+    # partition of the time is kept
+    assert ps.purge(connection, tz.localize(datetime(2020, 1, 15))) == 1
+    assert ps.list_partitions(connection) == [table_name + "_p_202001"]
+    assert len(ps.get_history("TEST", "user", connection)) == 2
+    # recreated when written again
+    ps.save_many(logs, connection)
+    connection.commit()
+    assert len(ps.list_partitions(connection)) == 2
+
+
+def test_chunked_purge(connection):
+    ms = SQLiteMessageLogStore(table_name=table_name + "_c", timezone=tz)
+    ms.prepare_table(connection)
+    ms.save_many(make_logs([1, 2, 3]), connection)
+    connection.commit()
+    assert ms.purge(
+        connection, tz.localize(datetime(2020, 1, 3)), chunk_size=3) == 4
+    assert [r["request_text"] for r in ms.get_history(
+        "TEST", "user", connection)] == ["3-10", "3-9"]
+
+
+def test_retention_task(connection):
+    ms = SQLiteMessageLogStore(table_name=table_name + "_t", timezone=tz)
+    ms.prepare_table(connection)
+    logs = make_logs([1])
+    logs[0][0].timestamp = now - timedelta(days=31)
+    logs[1][0].timestamp = now - timedelta(days=29)
+    ms.save_many(logs, connection)
+    connection.commit()
+
+    task = MessageLogRetentionTask(
+        timezone=tz, connection_provider=SQLiteConnectionProvider("test.db"))
+    assert task.do(messagelog_store=ms) == 0
+    assert task.do(messagelog_store=ms, retention_days=30) == 1
+    assert len(ms.get_history("TEST", "user", connection)) == 1
+
+
+def test_unsupported():
+    store = SQLiteMessageLogStore(table_name=table_name)
+    with pytest.raises(ValueError):
+        PartitionedMessageLogStore(store, period="yearly")
+
+
+class APIMessageLogStore(SQLiteMessageLogStore):
+    # store without SQLs like SQLAlchemyStores and AzureTableStores
+    def get_sqls(self):
+        pass
+
+
+def test_unsupported_store():
+    with pytest.raises(ValueError) as excinfo:
+        PartitionedMessageLogStore(APIMessageLogStore(table_name=table_name))
+    assert "SQLiteStores, MySQLStores or SQLDBStores" in str(excinfo.value)
+
+    # raised at constructing Minette
+    with pytest.raises(ValueError):
+        Minette(
+            messagelog_store=APIMessageLogStore(table_name=table_name),
+            messagelog_partition="daily")
@@ -4,6 +4,7 @@ from pytz import timezone
 
 from minette import (
     SQLiteStores,
+    User,
     Config
 )
 
@@ -35,7 +36,8 @@ try:
 except Exception:
     pass
 
-from minette.utils import date_to_unixtime
+from minette.codec import msgpack
+from minette.utils import date_to_unixtime, date_to_str
 
 now = datetime.now()
 table_name = "user" + str(date_to_unixtime(now))
@@ -183,9 +185,116 @@ def test_save(datastore_class, connection_str):
         assert user.data == {
             "strvalue": "value1",
             "intvalue": 2,
-            "dtvalue": now,
+            "dtvalue": date_to_str(now),
             "dictvalue": {
                 "k1": "v1",
                 "k2": 2,
             }
         }
+
+        # decode strings like datetime
+        us_legacy = datastore_class.user_store(
+            table_name=table_name, timezone=timezone("Asia/Tokyo"),
+            datetime_decoding="legacy")
+        user = us_legacy.get("TEST", user_id, connection)
+        assert user.data["dtvalue"] == now
+
+
+@pytest.mark.parametrize("datastore_class, connection_str", datastore_params)
+def test_get_many_save_many(datastore_class, connection_str):
+    if not datastore_class:
+        pytest.skip("Unable to import DataStoreSet")
+    if not connection_str:
+        pytest.skip(
+            "Connection string for {} is not provided"
+            .format(datastore_class.connection_provider.__name__))
+
+    us = datastore_class.user_store(
+        table_name=table_name, timezone=timezone("Asia/Tokyo"))
+    keys = [("TEST", user_id + "_m" + str(i)) for i in range(3)]
+    with datastore_class.connection_provider(connection_str).get_connection() as connection:
+        # existing user
+        existing_user = us.get("TEST", keys[0][1], connection)
+        existing_user.name = "existing"
+        us.save(existing_user, connection)
+
+        users = us.get_many(keys, connection)
+        assert list(users.keys()) == keys
+        assert users[keys[0]].id == existing_user.id
+        assert users[keys[0]].name == "existing"
+        for k, user in users.items():
+            assert user.channel == k[0]
+            assert user.channel_user_id == k[1]
+            user.data["key"] = k[1]
+        us.save_many(users.values(), connection)
+        if hasattr(connection, "commit"):
+            connection.commit()
+
+        new_users = us.get_many(keys, connection)
+        for k, user in new_users.items():
+            assert user.id == users[k].id
+            assert user.data == {"key": k[1]}
+
+
+@pytest.mark.parametrize("datastore_class, connection_str", datastore_params)
+def test_should_save(datastore_class, connection_str):
+    if not datastore_class:
+        pytest.skip("Unable to import DataStoreSet")
+    if not connection_str:
+        pytest.skip(
+            "Connection string for {} is not provided"
+            .format(datastore_class.connection_provider.__name__))
+
+    us = datastore_class.user_store(
+        table_name=table_name, timezone=timezone("Asia/Tokyo"))
+    with datastore_class.connection_provider(connection_str).get_connection() as connection:
+        # new user is added at get
+        user = us.get("TEST", user_id + "_ss", connection)
+        assert user.saved_at is not None
+        assert us.should_save(user) is False
+        user.data["dictvalue"] = {"k1": "v1"}
+        assert us.should_save(user) is True
+        us.save(user, connection)
+        assert us.should_save(user) is False
+
+        # restored user
+        user = us.get("TEST", user_id + "_ss", connection)
+        assert us.should_save(user) is False
+        user.data["dictvalue"]["k1"] = "v2"
+        assert us.should_save(user) is True
+
+        # touch
+        user = us.get("TEST", user_id + "_ss", connection)
+        us.touch_interval = 0
+        assert us.should_save(user) is True
+        us.touch_interval = 3600
+        assert us.should_save(user) is False
+
+
+@pytest.mark.parametrize("datastore_class, connection_str", datastore_params)
+def test_save_binary_codec(datastore_class, connection_str):
+    if not datastore_class:
+        pytest.skip("Unable to import DataStoreSet")
+    if msgpack is None:
+        pytest.skip("msgpack is not installed")
+    us = datastore_class.user_store(
+        table_name=table_name, timezone=timezone("Asia/Tokyo"),
+        codec="msgpack")
+    # JSON column (MySQL) is written by JSON codec
+    assert us.codec.binary is not us.json_data
+    if datastore_class is MySQLStores:
+        assert us.codec.name == "json"
+        assert not us._to_params(User("TEST", user_id))[4].startswith("~")
+    if not connection_str:
+        pytest.skip(
+            "Connection string for {} is not provided"
+            .format(datastore_class.connection_provider.__name__))
+
+    with datastore_class.connection_provider(connection_str).get_connection() as connection:
+        user = us.get("TEST", user_id + "_mp", connection)
+        user.data["strvalue"] = "value1"
+        us.save(user, connection)
+        user = datastore_class.user_store(
+            table_name=table_name, timezone=timezone("Asia/Tokyo")
+        ).get("TEST", user_id + "_mp", connection)
+        assert user.data == {"strvalue": "value1"}
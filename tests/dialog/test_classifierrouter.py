@@ -0,0 +1,110 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from minette import (
+    ClassifierDialogRouter,
+    DialogService,
+    Message,
+    Context,
+    PerformanceInfo,
+    Priority,
+    SQLiteConnectionProvider,
+    SQLiteMessageLogStore,
+    Response
+)
+from minette.dialog import TfidfIntentClassifier
+
+documents = [
+    "i want to order a pizza",
+    "pizza delivery please",
+    "one large pizza",
+    "hot tanuki soba please",
+    "i like soba",
+    "what is the weather today",
+    "weather forecast for tomorrow",
+]
+intents = [
+    "PizzaIntent", "PizzaIntent", "PizzaIntent", "SobaIntent", "SobaIntent",
+    "WeatherIntent", "WeatherIntent"]
+
+
+class PizzaDialogService(DialogService):
+    pass
+
+
+class MyClassifierDialogRouter(ClassifierDialogRouter):
+    def register_intents(self):
+        self.intent_resolver = {"PizzaIntent": PizzaDialogService}
+
+
+def test_fit_predict():
+    classifier = TfidfIntentClassifier().fit(documents, intents)
+    assert classifier.intents == ["PizzaIntent", "SobaIntent", "WeatherIntent"]
+    predictions = classifier.predict(
+        ["pizza please", "weather", "", "unknown words", ["soba"]], 0.1)
+    assert [p[0] for p in predictions] == \
+        ["PizzaIntent", "WeatherIntent", None, None, "SobaIntent"]
+    assert 0 < predictions[0][1] <= 1
+    # batch scores equal to each
+    batch = classifier.scores(["pizza please", "", "soba today"])
+    assert np.allclose(batch[0], classifier.scores(["pizza please"])[0])
+    assert np.allclose(batch[1], 0)
+    assert np.allclose(batch[2], classifier.scores(["soba today"])[0])
+
+
+def test_save_load(tmpdir):
+    classifier = TfidfIntentClassifier().fit(documents, intents)
+    classifier.save(str(tmpdir))
+    loaded = TfidfIntentClassifier.load(str(tmpdir))
+    assert isinstance(loaded.weights, np.memmap)
+    assert loaded.intents == classifier.intents
+    assert np.allclose(
+        loaded.scores(["pizza please"]), classifier.scores(["pizza please"]))
+
+
+def test_fit_csv(tmpdir):
+    path = str(tmpdir.join("intents.csv"))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("text,intent\n")
+        for d, i in zip(documents, intents):
+            f.write("{},{}\n".format(d, i))
+    classifier = TfidfIntentClassifier().fit_csv(path)
+    assert classifier.predict(["large pizza"])[0][0] == "PizzaIntent"
+
+
+def test_fit_messagelog():
+    store = SQLiteMessageLogStore(table_name="classifierlog")
+    with SQLiteConnectionProvider("test.db").get_connection() as connection:
+        store.prepare_table(connection)
+        for d, i in zip(documents, intents):
+            store.save(Message(text=d, intent=i), Response(), Context(),
+                       connection)
+        classifier = TfidfIntentClassifier().fit_messagelog(
+            connection, "classifierlog")
+    assert classifier.predict(["soba please"])[0][0] == "SobaIntent"
+
+
+def test_extract_intent():
+    classifier = TfidfIntentClassifier().fit(documents, intents)
+    router = MyClassifierDialogRouter(
+        classifier=classifier, intent_priority=Priority.High)
+    request = Message(text="pizza please")
+    request.words = request.text.split()
+    ds = router.execute(request, Context(), None, PerformanceInfo())
+    assert request.intent == "PizzaIntent"
+    assert request.intent_priority == Priority.High
+    assert isinstance(ds, PizzaDialogService)
+
+    # not classified
+    request = Message(text="hello", intent="GivenIntent")
+    request.words = ["hello"]
+    assert router.extract_intent(request, Context(), None) == \
+        ("GivenIntent", {}, Priority.Normal)
+
+    # batch
+    requests = [Message(text=t) for t in ["soba please", "weather today"]]
+    for r in requests:
+        r.words = r.text.split()
+    assert [e[0] for e in router.extract_intents(requests)] == \
+        ["SobaIntent", "WeatherIntent"]
@@ -0,0 +1,112 @@
+from minette import (
+    FAQDialogService,
+    Message,
+    Context,
+    Config,
+    DependencyContainer
+)
+from minette.dialog import FAQIndex, BM25Index
+
+faqs = [
+    ("how can i order a pizza", "Call 0120-000-000 to order."),
+    ("when is the shop open", "We are open from 10:00 to 22:00."),
+    ("can i pay by credit card", "Yes, all major credit cards are accepted."),
+    ("is delivery free", "Delivery is free over 2,000 yen."),
+]
+
+
+def get_faq_index():
+    faq_index = FAQIndex()
+    for q, a in faqs:
+        faq_index.add(q, a)
+    return faq_index
+
+
+def test_bm25():
+    index = BM25Index()
+    assert index.search(["pizza"]) == []
+    index.add(["pizza", "pizza", "soba"])
+    index.add(["soba", "udon"])
+    index.add(["ramen"])
+    results = index.search(["pizza", "soba"], top_k=3)
+    assert [r[0] for r in results] == [0, 1]
+    assert results[0][1] > results[1][1] > 0
+    assert index.search(["unknown"]) == []
+
+    index.remove(0)
+    assert index.doc_count == 2
+    assert [r[0] for r in index.search(["pizza", "soba"], top_k=3)] == [1]
+
+
+def test_search():
+    faq_index = get_faq_index()
+    entry, score = faq_index.search("i want to order pizza")[0]
+    assert entry["answer"] == faqs[0][1]
+    assert score > 0
+    assert faq_index.search(["credit", "card"])[0][0]["answer"] == faqs[2][1]
+    assert len(faq_index.search("is the pizza free", top_k=2)) == 2
+
+    # incremental update
+    entry_id = faq_index.add("do you have soba", "No, pizza only.", tag="menu")
+    assert faq_index.search("soba")[0][0] == \
+        {"question": "do you have soba", "answer": "No, pizza only.",
+         "tag": "menu"}
+    new_id = faq_index.update(entry_id, "do you have udon", "No, pizza only.")
+    assert faq_index.search("soba") == []
+    assert faq_index.search("udon")[0][0]["question"] == "do you have udon"
+    faq_index.remove(new_id)
+    assert faq_index.search("udon") == []
+
+
+def test_save_load(tmpdir):
+    path = str(tmpdir.join("faq.idx"))
+    faq_index = get_faq_index()
+    faq_index.remove(3)
+    faq_index.save(path)
+
+    loaded = FAQIndex.load(path)
+    assert loaded.entries == faq_index.entries
+    for query in ["order pizza", "shop open", "credit card", "delivery"]:
+        assert loaded.search(query, top_k=3) == faq_index.search(query, top_k=3)
+    # postings are mapped to the file until updated
+    assert isinstance(loaded.index._postings["pizza"][0], memoryview)
+    loaded.add("pizza sizes", "S, M and L.")
+    assert loaded.search("pizza sizes")[0][0]["answer"] == "S, M and L."
+    assert loaded.search("order a pizza")[0][0]["answer"] == faqs[0][1]
+
+
+def test_save_to_loaded_file(tmpdir):
+    path = str(tmpdir.join("faq.idx"))
+    get_faq_index().save(path)
+    loaded = FAQIndex.load(path)
+    loaded.add("pizza sizes", "S, M and L.")
+    loaded.save(path)
+    # still searchable after the mapped file is replaced
+    assert loaded.search("order a pizza")[0][0]["answer"] == faqs[0][1]
+    assert loaded.search("pizza sizes")[0][0]["answer"] == "S, M and L."
+    reloaded = FAQIndex.load(path)
+    assert len(reloaded.entries) == len(faqs) + 1
+    for query in ["order pizza", "pizza sizes", "credit card"]:
+        assert reloaded.search(query, top_k=3) == loaded.search(query, top_k=3)
+    assert tmpdir.listdir() == [tmpdir.join("faq.idx")]
+
+
+def test_service(tmpdir):
+    ds = FAQDialogService()
+    ds.dependencies = DependencyContainer(
+        None, faq_index=get_faq_index())
+    request = Message(text="Shop open")
+    request.words = ["shop", "open"]
+    assert ds.compose_response(request, Context(), None) == faqs[1][1]
+    request = Message(text="hello")
+    assert ds.compose_response(request, Context(), None) == \
+        FAQDialogService.not_found_message
+
+    # index file in configuration
+    path = str(tmpdir.join("faq.idx"))
+    get_faq_index().save(path)
+    config = Config("")
+    config.confg_parser.set("minette", "faq_index", path)
+    ds = FAQDialogService(config=config)
+    request = Message(text="is delivery free")
+    assert ds.compose_response(request, Context(), None) == faqs[3][1]
@@ -0,0 +1,106 @@
+import pytest
+
+from minette import (
+    PatternDialogRouter,
+    DialogService,
+    Message,
+    Context,
+    PerformanceInfo,
+    Priority,
+    WordNode
+)
+from minette.dialog.patternrouter import AhoCorasick
+
+
+class SurfaceNode(WordNode):
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, surface, features=None):
+        return cls(surface, "", "", "", "", "", "", surface, "", "")
+
+
+class PizzaDialogService(DialogService):
+    pass
+
+
+class SobaDialogService(DialogService):
+    pass
+
+
+class MyPatternDialogRouter(PatternDialogRouter):
+    def register_intents(self):
+        self.intent_resolver = {
+            "PizzaIntent": PizzaDialogService,
+            "SobaIntent": SobaDialogService,
+            "OrderIntent": PizzaDialogService,
+        }
+
+    def register_patterns(self):
+        self.add_keywords("PizzaIntent", ["pizza", "ピザ"])
+        self.add_keywords(
+            "SobaIntent", ["tanuki soba", "kitsune soba"],
+            entity_name="soba_name", priority=Priority.High,
+            entities={"is_hot": True})
+        self.add_regex(
+            "OrderIntent", r"(?P<count>\d+) (?P<item>pizza|soba)s?",
+            priority=Priority.Highest)
+        self.add_regex("NumberIntent", r"^\d+$")
+        self.add_tokens("WeatherIntent", ["天気", "を", "教え"])
+
+
+def test_aho_corasick():
+    ac = AhoCorasick()
+    for word in ["he", "she", "his", "hers"]:
+        ac.add(word, word)
+    assert sorted(ac.find("ushers")) == [(4, "he"), (4, "she"), (6, "hers")]
+    assert ac.find("xyz") == []
+    # sequence of tokens
+    ac = AhoCorasick()
+    ac.add(("a", "b"), "ab")
+    assert ac.find(["c", "a", "b"]) == [(3, "ab")]
+
+
+def test_match():
+    router = MyPatternDialogRouter()
+    assert len(router.rules) == 5
+    assert router.match("I want PIZZA") == ("PizzaIntent", {}, Priority.Normal)
+    assert router.match("ピザください")[0] == "PizzaIntent"
+    # priority wins over order
+    assert router.match("pizza or kitsune soba") == (
+        "SobaIntent", {"soba_name": "kitsune soba", "is_hot": True},
+        Priority.High)
+    # regex with named groups
+    assert router.match("2 pizzas please") == (
+        "OrderIntent", {"count": "2", "item": "pizza"}, Priority.Highest)
+    # regex without literal
+    assert router.match("123")[0] == "NumberIntent"
+    # literal found but regex doesn't match
+    assert router.match("pizzas") == ("PizzaIntent", {}, Priority.Normal)
+    assert router.match("hello") is None
+
+
+def test_extract_intent():
+    router = MyPatternDialogRouter(default_dialog_service=PizzaDialogService)
+    request = Message(text="3 sobas")
+    ds = router.execute(request, Context(), None, PerformanceInfo())
+    assert request.intent == "OrderIntent"
+    assert request.entities == {"count": "3", "item": "soba"}
+    assert request.intent_priority == Priority.Highest
+    assert isinstance(ds, PizzaDialogService)
+
+    # not matched
+    request = Message(text="hello", intent="GivenIntent")
+    assert router.extract_intent(request, Context(), None) == \
+        ("GivenIntent", {})
+
+
+def test_tokens():
+    router = MyPatternDialogRouter()
+    request = Message(text="天気を教えて")
+    request.words = [
+        SurfaceNode.create(s) for s in ["天気", "を", "教え", "て"]]
+    assert router.match(request.text, request)[0] == "WeatherIntent"
+    # added after build
+    router.add_keywords("TeIntent", ["教えて"], priority=Priority.High)
+    assert router.match(request.text, request)[0] == "TeIntent"
@@ -2,6 +2,7 @@ import sys
 import os
 sys.path.append(os.pardir)
 import pytest
+import asyncio
 from pytz import timezone
 
 from minette import DialogRouter, DialogService, EchoDialogService, ErrorDialogService
@@ -347,3 +348,95 @@ def test_intent_resolver_as_arg():
         channel_user_id="test_user",
         text="Hello")
     assert dr.route(request, context, None) is EchoDialogService
+
+
+class AsyncDialogRouter(MyDialogRouter):
+    async def extract_intent(self, request, context, connection):
+        await asyncio.sleep(0)
+        return super().extract_intent(request, context, connection)
+
+
+def test_execute_async():
+    dr = AsyncDialogRouter(timezone=timezone("Asia/Tokyo"), default_dialog_service=EchoDialogService)
+    performance = PerformanceInfo()
+
+    # async extract_intent
+    context = Context("TEST", "test_user")
+    context.topic.is_new = True
+    request = Message(channel="TEST", channel_user_id="test_user", text="give me soba")
+    ds = asyncio.run(dr.execute_async(request, context, None, performance))
+    assert isinstance(ds, SobaDialogService)
+    assert request.entities == {"soba_name": "tanuki soba", "is_hot": True}
+    assert request.intent_priority == Priority.High
+
+    # sync extract_intent
+    dr = MyDialogRouter(timezone=timezone("Asia/Tokyo"), default_dialog_service=EchoDialogService)
+    context = Context("TEST", "test_user")
+    request = Message(channel="TEST", channel_user_id="test_user", text="give me pizza")
+    ds = asyncio.run(dr.execute_async(request, context, None, performance))
+    assert isinstance(ds, PizzaDialogService)
+
+    # error
+    context = Context("TEST", "test_user")
+    request = Message(channel="TEST", channel_user_id="test_user", text="error")
+    ds = asyncio.run(dr.execute_async(request, context, None, performance))
+    assert isinstance(ds, ErrorDialogService)
+    assert context.error["exception"] == "division by zero"
+
+
+class ReusablePizzaDialogService(PizzaDialogService):
+    reusable = True
+
+
+class ReusableDialogRouter(MyDialogRouter):
+    def register_intents(self):
+        self.intent_resolver = {
+            "PizzaIntent": ReusablePizzaDialogService,
+            "SobaIntent": SobaDialogService,
+        }
+
+
+def test_reusable_dialog_service():
+    import threading
+
+    dr = ReusableDialogRouter(timezone=timezone("Asia/Tokyo"))
+    dr.dependency_rules = {SobaDialogService: {"soba": "tanuki"}}
+    dr.default_dependencies = {"pizza": "margherita"}
+    dr.prepare_dependencies()
+
+    def get_service(text):
+        return dr.execute(
+            Message(text=text), Context(), None, PerformanceInfo())
+
+    # reused in the same thread
+    pizza = get_service("pizza")
+    assert isinstance(pizza, ReusablePizzaDialogService)
+    assert get_service("pizza") is pizza
+    assert pizza.dependencies.pizza == "margherita"
+
+    # created every time with dependencies
+    soba = get_service("soba")
+    assert get_service("soba") is not soba
+    assert get_service("soba").dependencies is not soba.dependencies
+    assert soba.dependencies.soba == "tanuki"
+
+    # not reused by coroutines
+    pizza_async = asyncio.run(dr.execute_async(
+        Message(text="pizza"), Context(), None, PerformanceInfo()))
+    assert isinstance(pizza_async, ReusablePizzaDialogService)
+    assert pizza_async is not pizza
+    assert pizza_async.dependencies is pizza.dependencies
+
+    # not shared among threads
+    services = []
+    t = threading.Thread(target=lambda: services.append(get_service("pizza")))
+    t.start()
+    t.join()
+    assert isinstance(services[0], ReusablePizzaDialogService)
+    assert services[0] is not pizza
+
+    # changing dependencies clears cache
+    dr.default_dependencies = {"pizza": "marinara"}
+    pizza2 = get_service("pizza")
+    assert pizza2 is not pizza
+    assert pizza2.dependencies.pizza == "marinara"
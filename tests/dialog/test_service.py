@@ -1,4 +1,5 @@
 import pytest
+import asyncio
 from pytz import timezone
 
 from minette import DialogService, EchoDialogService, ErrorDialogService
@@ -160,3 +161,50 @@ def test_execute_error():
     request = Message(channel="TEST", channel_user_id="test_user", text="hello")
     response = ds.execute(request, context, None, performance)
     assert response.messages[0].text == "?"
+
+
+class AsyncPizzaDialogService(PizzaDialogService):
+    async def process_request(self, request, context, connection):
+        await asyncio.sleep(0)
+        super().process_request(request, context, connection)
+
+    async def compose_response(self, request, context, connection):
+        await asyncio.sleep(0)
+        return super().compose_response(request, context, connection)
+
+
+def test_execute_async():
+    ds = AsyncPizzaDialogService(timezone=timezone("Asia/Tokyo"))
+    performance = PerformanceInfo()
+
+    # first contact
+    context = Context("TEST", "test_user")
+    context.topic.is_new = True
+    request = Message(channel="TEST", channel_user_id="test_user", text="Give me pizza")
+    response = asyncio.run(ds.execute_async(request, context, None, performance))
+    assert response.messages[0].text == "Which pizza?"
+    assert context.data == {
+        "pizza_name": "",
+        "pizza_count": 0
+    }
+    # say pizza name
+    context.topic.is_new = False
+    request = Message(channel="TEST", channel_user_id="test_user", text="seafood pizza")
+    response = asyncio.run(ds.execute_async(request, context, None, performance))
+    assert response.messages[0].text == "Your order is Seafood Pizza?"
+
+    # raise error
+    request = Message(channel="TEST", channel_user_id="test_user", text="error")
+    response = asyncio.run(ds.execute_async(request, context, None, performance))
+    assert response.messages[0].text == "?"
+    assert context.error["exception"] == "division by zero"
+
+
+def test_execute_async_sync_hooks():
+    ds = EchoDialogService(timezone=timezone("Asia/Tokyo"))
+    performance = PerformanceInfo()
+    context = Context("TEST", "test_user")
+    context.topic.is_new = True
+    request = Message(channel="TEST", channel_user_id="test_user", text="hello")
+    response = asyncio.run(ds.execute_async(request, context, None, performance))
+    assert response.messages[0].text == "You said: hello"
@@ -73,3 +73,21 @@ def test_from_dict():
     assert context.topic.status == "continue"
     assert context.data == {"fruit": "Apple"}
     assert context.error == {}
+
+
+def test_snapshot():
+    context = Context(channel="TEST", channel_user_id="user_id")
+    context.topic.name = "favorite_fruit"
+    context.topic.status = "continue"
+    context.data = {"fruits": ["Apple"]}
+    snapshot = context.snapshot()
+    context.reset()
+    # reset doesn't affect the snapshot
+    assert snapshot.topic.name == "favorite_fruit"
+    assert snapshot.topic.status == "continue"
+    assert snapshot.topic.previous is None
+    assert snapshot.data == {"fruits": ["Apple"]}
+    assert context.topic.name == ""
+    assert context.topic.previous.name == "favorite_fruit"
+    assert context.data == {}
+    assert snapshot.to_dict()["topic"]["name"] == "favorite_fruit"
@@ -2,7 +2,8 @@ import pytest
 from pytz import timezone
 from datetime import datetime
 
-from minette import Message, Group, Payload, Priority
+from minette import Message, Group, Payload, Priority, WordNode
+from minette.serializer import dumpd
 
 
 def test_init():
@@ -132,3 +133,59 @@ def test_from_dict():
     assert message.token == "token123456789"
     assert message.payloads[0].url == "https://image"
     assert message.channel_message == str({"text": "hello"})
+
+
+def test_words_parser():
+    parsed = []
+
+    def parse():
+        parsed.append(True)
+        return [{"surface": "hello"}]
+
+    message = Message(text="hello")
+    message.set_words_parser(parse)
+    # not parsed for serialization
+    assert message.to_dict()["words"] == []
+    assert parsed == []
+    # parsed once at the first access
+    assert message.words == [{"surface": "hello"}]
+    assert message.words == [{"surface": "hello"}]
+    assert parsed == [True]
+    assert message.to_dict()["words"] == [{"surface": "hello"}]
+
+    # set words directly
+    message.set_words_parser(parse)
+    message.words = []
+    assert message.words == []
+    assert parsed == [True]
+
+    # restored from dict
+    message = Message.from_dict({"text": "hello", "words": [{"surface": "hello"}]})
+    assert message.words == [{"surface": "hello"}]
+
+
+class _Node(WordNode):
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, surface, features):
+        return cls(surface, *features)
+
+
+def test_words_json():
+    features = ["名詞", "", "", "", "", "", "", "", ""]
+    message = Message(text="hello world")
+    message.words = [_Node.create("hello", features), _Node.create("world", features)]
+    # words are kept in JSON and dict by dumpd
+    assert [w["surface"] for w in dumpd(message)["words"]] == ["hello", "world"]
+    message = Message.from_json(message.to_json())
+    assert [w["surface"] for w in message.words] == ["hello", "world"]
+    assert message.words[0]["part"] == "名詞"
+
+
+def test_from_json_timestamp():
+    now = datetime.now(timezone("Asia/Tokyo"))
+    message = Message.from_json(Message(text="2019-01-02T03:04:05", timestamp=now).to_json())
+    assert message.timestamp == now
+    # text like datetime is not decoded
+    assert message.text == "2019-01-02T03:04:05"
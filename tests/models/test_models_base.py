@@ -21,6 +21,12 @@ class SubClass(CustomClass):
     pass
 
 
+class TypedClass(CustomClass):
+    @classmethod
+    def _types(cls):
+        return {"dtvalue": datetime}
+
+
 def test_init():
     now = datetime.now(timezone("Asia/Tokyo"))
     cc = CustomClass(strvalue="str", intvalue=1, dtvalue=now, listvalue=[1, 2, 3], dictvalue={"key1": "value1", "key2": 2})
@@ -112,7 +118,88 @@ def test_from_json():
     cc = CustomClass.from_json(cc_json)
     assert cc.strvalue == "str"
     assert cc.intvalue == 1
+    assert cc.dtvalue == date_to_str(now, with_timezone=True)
+    assert cc.listvalue == [1, 2, 3]
+    assert cc.dictvalue == {"key1": "value1", "key2": 2}
+    assert cc.objvalue is None
+
+    # datetime declared in schema
+    cc = TypedClass.from_json(cc_json)
+    assert cc.dtvalue == now
+    assert cc.strvalue == "str"
+
+    # decode strings like datetime
+    cc = CustomClass.from_json(cc_json, datetime_decoding="legacy")
+    assert cc.strvalue == "str"
+    assert cc.intvalue == 1
     assert cc.dtvalue == now
     assert cc.listvalue == [1, 2, 3]
     assert cc.dictvalue == {"key1": "value1", "key2": 2}
     assert cc.objvalue is None
+
+
+class PlainClass:
+    def __init__(self, value):
+        self.value = value
+        self._private = "private"
+
+
+class PropertyClass(Serializable):
+    def __init__(self):
+        self._value = None
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value.upper()
+
+
+class SlottedClass(Serializable):
+    __slots__ = ("value", "_private")
+
+    def __init__(self, value=None):
+        self.value = value
+        self._private = "private"
+
+
+def test_to_dict_values():
+    sc1 = SubClass(strvalue="sub_str_1")
+    cc = CustomClass(
+        strvalue=PlainClass("plain"),
+        listvalue=({"key": "value"}, [1, 2], PlainClass("plain_in_list"), SlottedClass("slotted_in_list")),
+        dictvalue={"key1": ["list"], "key2": {"key": "value"}, "key3": PlainClass("plain_in_dict")},
+        objvalue=SlottedClass(sc1))
+    # members added to the instance
+    cc.extravalue = {1, 2}
+    cc_dict = cc.to_dict()
+    assert cc_dict["strvalue"] == {"value": "plain"}
+    assert cc_dict["listvalue"] == [{"key": "value"}, [1, 2], {"value": "plain_in_list"}, {"value": "slotted_in_list"}]
+    assert cc_dict["dictvalue"] == {"key1": ["list"], "key2": {"key": "value"}, "key3": {"value": "plain_in_dict"}}
+    assert cc_dict["objvalue"] == {"value": sc1.to_dict()}
+    assert cc_dict["extravalue"] == [1, 2]
+    assert list(cc_dict.keys()) == ["strvalue", "intvalue", "dtvalue", "listvalue", "dictvalue", "objvalue", "extravalue"]
+    # encoded by the same encoder
+    assert CustomClass(strvalue="str").to_dict()["strvalue"] == "str"
+
+
+def test_from_dict_property():
+    pc = PropertyClass.from_dict({"value": "value"})
+    assert pc.value == "VALUE"
+    assert pc.to_dict() == {}
+    sc = SlottedClass.from_dict({"value": "value"})
+    assert sc.value == "value"
+    assert sc.to_dict() == {"value": "value"}
+
+
+def test_from_dict_datetime():
+    cc = TypedClass.from_dict({"dtvalue": "2019-01-02T03:04:05.000000+09:00"})
+    assert cc.dtvalue == timezone("Asia/Tokyo").localize(datetime(2019, 1, 2, 3, 4, 5))
+    assert TypedClass.from_dict({"dtvalue": "2019-01-02T03:04:05"}).dtvalue == datetime(2019, 1, 2, 3, 4, 5)
+    assert TypedClass.from_dict({"dtvalue": ["2019-01-02T03:04:05"]}).dtvalue == [datetime(2019, 1, 2, 3, 4, 5)]
+    # not datetime
+    assert TypedClass.from_dict({"dtvalue": "not datetime"}).dtvalue == "not datetime"
+    assert TypedClass.from_dict({"dtvalue": ""}).dtvalue == ""
+    assert TypedClass.from_dict({"dtvalue": None}).dtvalue is None
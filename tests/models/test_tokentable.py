@@ -0,0 +1,66 @@
+import pytest
+
+from minette import WordNode, TokenTable
+
+
+class CustomNode(WordNode):
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, surface, features):
+        return cls(surface, *features)
+
+
+def get_words():
+    return [
+        CustomNode.create("今日", ["名詞", "副詞可能", "", "", "", "", "今日", "キョウ", "キョー"]),
+        CustomNode.create("は", ["助詞", "係助詞", "", "", "", "", "は", "ハ", "ワ"]),
+        CustomNode.create("晴れ", ["名詞", "一般", "", "", "", "", "晴れ", "ハレ", "ハレ"]),
+    ]
+
+
+def test_from_words():
+    table = TokenTable.from_words(get_words(), text="今日 は晴れ")
+    assert len(table) == 3
+    assert table.text == "今日 は晴れ"
+    assert table.surfaces == ["今日", "は", "晴れ"]
+    assert table.words == ["今日", "は", "晴れ"]
+    assert list(table.starts) == [0, 3, 4]
+    assert list(table.ends) == [2, 4, 6]
+    assert table.node_class is CustomNode
+    assert TokenTable.vocabulary.get(table.pos_ids[1])[:2] == ("助詞", "係助詞")
+
+    # contiguous words without text
+    table = TokenTable.from_words(get_words())
+    assert table.text == "今日は晴れ"
+    assert list(table.starts) == [0, 2, 3]
+
+    # empty
+    table = TokenTable.from_words([], text="")
+    assert len(table) == 0
+    assert table.to_words() == []
+
+
+def test_to_words():
+    words = get_words()
+    restored = TokenTable.from_words(words).to_words()
+    assert [w.to_dict() for w in restored] == [w.to_dict() for w in words]
+    assert isinstance(restored[0], CustomNode)
+
+
+def test_find():
+    table = TokenTable.from_words(get_words())
+    assert table.find(part="名詞") == [0, 2]
+    assert table.find(part="名詞", part_detail1="一般") == [2]
+    assert table.find(part="動詞") == []
+    with pytest.raises(ValueError):
+        table.find(foo="bar")
+
+
+def test_to_numpy():
+    np = pytest.importorskip("numpy")
+    table = TokenTable.from_words(get_words())
+    columns = table.to_numpy()
+    nouns = np.isin(columns["pos_ids"], TokenTable.vocabulary.find_ids(part="名詞"))
+    assert list(columns["surfaces"][nouns]) == ["今日", "晴れ"]
+    assert list(columns["ends"] - columns["starts"]) == [2, 1, 2]
@@ -26,3 +26,15 @@ def test_is_changed():
     # change topic
     topic.name = "favorite_sushi"
     assert topic.is_changed is True
+
+
+def test_copy():
+    topic = Topic()
+    topic.name = "favorite_fruit"
+    topic.previous = Topic()
+    copied = topic.copy()
+    assert isinstance(copied, Topic)
+    assert copied.name == "favorite_fruit"
+    assert copied.previous is topic.previous
+    copied.name = "favorite_sushi"
+    assert topic.name == "favorite_fruit"
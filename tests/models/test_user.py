@@ -12,3 +12,21 @@ def test_user():
     assert user.channel_user_id == "user_id"
     assert user.profile_image_url == ""
     assert user.data == {}
+
+
+def test_is_changed():
+    user = User(channel="TEST", channel_user_id="user_id")
+    assert user.is_changed() is True
+    user.mark_saved()
+    assert user.is_changed() is False
+    assert user.saved_at is None
+    user.name = "user name"
+    assert user.is_changed() is True
+    user.mark_saved()
+    user.data["list"] = [1]
+    assert user.is_changed() is True
+    user.mark_saved()
+    user.data["list"].append(2)
+    assert user.is_changed() is True
+    # not serialized
+    assert "_saved" not in user.to_dict()
@@ -21,3 +21,32 @@ def test_init():
     assert node.word == "word"
     assert node.kana == "kana"
     assert node.pronunciation == "pronunciation"
+
+
+class SlottedNode(WordNode):
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, surface, features):
+        return cls(surface, *features)
+
+
+def test_slots():
+    features = ["名詞", "一般", "", "", "", "", "word", "kana", "pronunciation"]
+    node = SlottedNode.create("surface", [f + "" for f in features])
+    assert not hasattr(node, "__dict__")
+    with pytest.raises(AttributeError):
+        node.foo = "bar"
+    # part-of-speech strings are interned
+    other = SlottedNode.create("surface2", ["".join(["名", "詞"])] + features[1:])
+    assert node.part is other.part
+
+
+def test_to_dict():
+    node = SlottedNode.create("surface", ["part", "part_detail1", "part_detail2", "part_detail3", "stem_type", "stem_form", "word", "kana", "pronunciation"])
+    assert node.to_dict() == {
+        "surface": "surface", "part": "part", "part_detail1": "part_detail1",
+        "part_detail2": "part_detail2", "part_detail3": "part_detail3",
+        "stem_type": "stem_type", "stem_form": "stem_form", "word": "word",
+        "kana": "kana", "pronunciation": "pronunciation"}
+    assert '"surface": "surface"' in node.to_json()
@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.append(os.pardir)
+import pytest
+from pytz import timezone
+from types import GeneratorType
+from concurrent.futures import ThreadPoolExecutor
+
+from minette import Tagger, CachedTagger, Config
+from minette.models import WordNode
+
+
+class WordNodeForTest(WordNode):
+    @classmethod
+    def create(cls, surface, features=None):
+        return cls(surface, "", "", "", "", "", "", surface, "", "")
+
+
+class CountingTagger(Tagger):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.count = 0
+
+    def parse_as_generator(self, text, max_length=None):
+        if self.validate(text, max_length) is False:
+            return
+        self.count += 1
+        for w in text.split():
+            yield WordNodeForTest.create(w)
+
+
+def test_init():
+    tagger = CachedTagger(CountingTagger(timezone=timezone("Asia/Tokyo"), max_length=10))
+    assert tagger.timezone == timezone("Asia/Tokyo")
+    assert tagger.max_length == 10
+    assert tagger.cache_size == 1024
+    assert CachedTagger(CountingTagger(), cache_size=10).cache_size == 10
+    config = Config("")
+    config.confg_parser.set("minette", "tagger_cache_size", "20")
+    assert CachedTagger(CountingTagger(config=config)).cache_size == 20
+
+
+def test_parse():
+    base_tagger = CountingTagger()
+    tagger = CachedTagger(base_tagger)
+    words = tagger.parse("hello world")
+    assert isinstance(words, list)
+    assert [w.surface for w in words] == ["hello", "world"]
+    assert base_tagger.count == 1
+
+    # normalized text hits the cache
+    words_cached = tagger.parse(" hello world\n")
+    assert words_cached == words
+    assert base_tagger.count == 1
+    # new list is returned for each request
+    words_cached.pop()
+    assert [w.surface for w in tagger.parse("hello world")] == ["hello", "world"]
+    # カ + combining voiced sound mark is composed to ガ by NFC
+    assert tagger.parse("\u30ac") == tagger.parse("\u30ab\u3099")
+    stats = tagger.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 2
+    assert stats["size"] == 2
+    assert stats["hit_ratio"] == 0.6
+
+    # not validated
+    assert tagger.parse("") == []
+    assert tagger.parse("hello world", max_length=5) == []
+
+    # generator
+    words_gen = tagger.parse_as_generator("hello world")
+    assert isinstance(words_gen, GeneratorType)
+    assert [w.surface for w in words_gen] == ["hello", "world"]
+
+    tagger.clear()
+    assert tagger.stats()["size"] == 0
+
+    # original text is parsed and only the key is stripped
+    base_tagger.parse_as_generator = lambda text, max_length=None: \
+        iter([WordNodeForTest.create(text)])
+    assert [w.surface for w in tagger.parse(" hello\n")] == [" hello\n"]
+
+
+def test_parse_eviction():
+    base_tagger = CountingTagger()
+    tagger = CachedTagger(base_tagger, cache_size=2)
+    tagger.parse("a")
+    tagger.parse("b")
+    tagger.parse("a")
+    # "b" is the least recently used
+    tagger.parse("c")
+    assert tagger.stats()["evictions"] == 1
+    tagger.parse("a")
+    assert base_tagger.count == 3
+    tagger.parse("b")
+    assert base_tagger.count == 4
+
+
+def test_parse_threads():
+    tagger = CachedTagger(CountingTagger(), cache_size=5)
+    texts = ["text {}".format(i % 10) for i in range(200)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(tagger.parse, texts))
+    for text, words in zip(texts, results):
+        assert " ".join(w.surface for w in words) == text
+    stats = tagger.stats()
+    assert stats["size"] == 5
+    assert stats["hits"] + stats["misses"] == 200
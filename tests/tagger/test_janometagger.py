@@ -103,3 +103,15 @@ def test_error():
     tagger = JanomeTagger()
     with pytest.raises(TypeError):
         tagger.parse(object())
+
+
+def test_parse_as_table():
+    tagger = JanomeTagger()
+    table = tagger.parse_as_table("今日は 良い天気です")
+    assert table.surfaces[:3] == ["今日", "は", " "]
+    assert list(table.starts[:4]) == [0, 2, 3, 4]
+    assert table.find(part="名詞") == [0, 4]
+    words = table.to_words()
+    assert isinstance(words[0], JanomeNode)
+    assert [w.to_dict() for w in words] == [w.to_dict() for w in tagger.parse("今日は 良い天気です")]
+    assert len(tagger.parse_as_table("")) == 0
@@ -1,4 +1,8 @@
 import pytest
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from pytz import timezone
 
 try:
@@ -10,6 +14,68 @@ except Exception:
     # Skip if import dependencies not found
     pytestmark = pytest.mark.skip
 
+from minette import Tagger, CachedTagger
+
+
+def to_nodes(text):
+    features = {
+        "part": "名詞", "part_detail1": "", "part_detail2": "",
+        "part_detail3": "", "stem_type": "", "stem_form": "", "word": "",
+        "kana": "", "pronunciation": ""}
+    return [{"surface": w, "features": features} for w in text.split()]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fail_count = 0
+
+    def do_POST(self):
+        data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, data))
+        if self.path not in ("/parse", "/fail", "/slow", "/batch"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/fail" and StubHandler.fail_count > 0:
+            StubHandler.fail_count -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/slow":
+            time.sleep(0.5)
+        if self.path == "/batch":
+            body = {"results": [{"nodes": to_nodes(t)} for t in data["texts"]]}
+        else:
+            body = {"nodes": to_nodes(data["text"])}
+        body = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FallbackTagger(Tagger):
+    def parse_as_generator(self, text, max_length=None):
+        yield MeCabServiceNode.create("fallback", to_nodes("x")[0]["features"])
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, "http://127.0.0.1:{}".format(server.server_port)
+    server.shutdown()
+    server.server_close()
+
 
 def test_init():
     tagger = MeCabServiceTagger(timezone=timezone("Asia/Tokyo"))
@@ -45,3 +111,114 @@ def test_error():
     tagger = MeCabServiceTagger(api_url="https://")
     assert tagger.api_url == "https://"
     assert tagger.parse("今日は良い天気です") == []
+
+
+def test_parse_stub(stub_server):
+    server, url = stub_server
+    tagger = MeCabServiceTagger(api_url=url + "/parse")
+    assert [w.surface for w in tagger.parse("hello world")] == ["hello", "world"]
+    assert [w.surface for w in tagger.parse_as_generator("hello")] == ["hello"]
+    assert tagger.parse("") == []
+    assert len(server.requests) == 2
+    tagger.close()
+
+
+def test_parse_retry(stub_server):
+    server, url = stub_server
+    tagger = MeCabServiceTagger(api_url=url + "/fail", retries=2)
+    StubHandler.fail_count = 2
+    assert [w.surface for w in tagger.parse("hello")] == ["hello"]
+    assert len(server.requests) == 3
+
+    # retries exhausted
+    tagger = MeCabServiceTagger(api_url=url + "/fail", retries=1)
+    StubHandler.fail_count = 3
+    assert tagger.parse("hello") == []
+    StubHandler.fail_count = 0
+
+
+def test_parse_error(stub_server):
+    server, url = stub_server
+    tagger = MeCabServiceTagger(
+        api_url=url + "/fail", retries=0, fallback_tagger=FallbackTagger())
+    StubHandler.fail_count = 2
+    # errors are raised from generator and fallback is used by parse
+    with pytest.raises(Exception):
+        list(tagger.parse_as_generator("hello"))
+    assert [w.surface for w in tagger.parse("hello")] == ["fallback"]
+    assert [w.surface for w in tagger.parse("hello")] == ["hello"]
+
+
+def test_parse_cached(stub_server):
+    server, url = stub_server
+    tagger = CachedTagger(MeCabServiceTagger(
+        api_url=url + "/fail", retries=0, fallback_tagger=FallbackTagger()))
+    StubHandler.fail_count = 1
+    # fallback words of the failure are not cached
+    assert [w.surface for w in tagger.parse("hello")] == ["fallback"]
+    assert tagger.stats()["size"] == 0
+    assert [w.surface for w in tagger.parse("hello")] == ["hello"]
+    assert [w.surface for w in tagger.parse("hello")] == ["hello"]
+    assert len(server.requests) == 2
+    assert tagger.stats()["hits"] == 1
+
+
+def test_parse_latency_budget(stub_server):
+    server, url = stub_server
+    tagger = MeCabServiceTagger(
+        api_url=url + "/slow", latency_budget=0.1, retries=0)
+    start = time.monotonic()
+    assert tagger.parse("hello") == []
+    assert time.monotonic() - start < 0.5
+
+    tagger = MeCabServiceTagger(
+        api_url=url + "/slow", latency_budget=0.1, retries=0,
+        fallback_tagger=FallbackTagger())
+    assert [w.surface for w in tagger.parse("hello")] == ["fallback"]
+
+    # retries don't exceed the budget
+    tagger = MeCabServiceTagger(
+        api_url=url + "/slow", latency_budget=0.1, retries=5)
+    start = time.monotonic()
+    assert tagger.parse("hello") == []
+    assert time.monotonic() - start < 0.5
+
+    # retried in the budget
+    server.requests.clear()
+    tagger = MeCabServiceTagger(
+        api_url=url + "/fail", latency_budget=2, retries=2)
+    StubHandler.fail_count = 2
+    assert [w.surface for w in tagger.parse("hello")] == ["hello"]
+    assert len(server.requests) == 3
+
+    # retries exhausted in the budget
+    tagger = MeCabServiceTagger(
+        api_url=url + "/fail", latency_budget=2, retries=1)
+    StubHandler.fail_count = 3
+    assert tagger.parse("hello") == []
+    StubHandler.fail_count = 0
+
+
+def test_parse_batch(stub_server):
+    server, url = stub_server
+    tagger = MeCabServiceTagger(api_url=url + "/parse", batch_api_url=url + "/batch")
+    words_list = tagger.parse_batch(["hello world", "", "good morning"])
+    assert [[w.surface for w in words] for words in words_list] == \
+        [["hello", "world"], [], ["good", "morning"]]
+    assert server.requests[-1] == ("/batch", {"texts": ["hello world", "good morning"]})
+    assert len(server.requests) == 1
+
+    # parse one by one without batch api
+    tagger = MeCabServiceTagger(api_url=url + "/parse")
+    words_list = tagger.parse_batch(["hello world", "good morning"])
+    assert [[w.surface for w in words] for words in words_list] == \
+        [["hello", "world"], ["good", "morning"]]
+    assert len(server.requests) == 3
+
+    # fallback
+    tagger = MeCabServiceTagger(
+        api_url=url + "/parse", batch_api_url=url + "/notfound",
+        fallback_tagger=FallbackTagger())
+    words_list = tagger.parse_batch(["hello", "world"])
+    assert [[w.surface for w in words] for words in words_list] == \
+        [["fallback"], ["fallback"]]
@@ -4,6 +4,7 @@ sys.path.append(os.pardir)
 import pytest
 from pytz import timezone
 from types import GeneratorType
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from minette.tagger.mecabtagger import MeCabTagger, MeCabNode
@@ -17,6 +18,26 @@ def test_init():
     assert tagger.timezone == timezone("Asia/Tokyo")
 
 
+def test_init_options():
+    tagger = MeCabTagger()
+    assert tagger.options == "-Ochasen"
+    assert tagger.user_dic is None
+    tagger = MeCabTagger(options="-Ochasen -N1")
+    assert tagger.options == "-Ochasen -N1"
+    with pytest.raises(RuntimeError):
+        MeCabTagger(user_dic="notexist.dic")
+
+
+def test_parse_threads():
+    tagger = MeCabTagger()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(tagger.parse, ["今日は良い天気です"] * 20))
+    for words in results:
+        assert [w.surface for w in words] == ["今日", "は", "良い", "天気", "です"]
+    # tagger is reused at the same thread
+    assert tagger._get_mecab() is tagger._get_mecab()
+
+
 def test_parse():
     tagger = MeCabTagger()
     # 空文字列
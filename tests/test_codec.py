@@ -0,0 +1,99 @@
+import pytest
+from datetime import datetime
+from pytz import timezone
+
+from minette.codec import (
+    Codec, Compressor, get_codec, get_compressor, encode, decode, orjson, msgpack
+)
+from minette.serializer import dumps, loads
+from minette.utils import date_to_str
+
+now = datetime.now(tz=timezone("Asia/Tokyo"))
+obj = {
+    "strvalue": "値",
+    "intvalue": 2,
+    "dtvalue": now,
+    "listvalue": [1, "2", None],
+    "dictvalue": {"k1": "v1", "k2": 2.5},
+}
+expected = dict(obj, dtvalue=date_to_str(now, with_timezone=True))
+
+
+def test_json():
+    s = encode(obj)
+    assert s == dumps(obj)
+    assert decode(s) == expected
+
+
+@pytest.mark.parametrize("codec_name", ["orjson", "ujson", "msgpack"])
+def test_roundtrip(codec_name):
+    pytest.importorskip(codec_name)
+    s = encode(obj, codec_name)
+    assert isinstance(s, str)
+    assert decode(s, codec_name) == expected
+    # codec is detected from the value
+    assert decode(s) == expected
+    assert loads(dumps(obj, codec=codec_name)) == expected
+
+
+def test_json_codecs_write_json():
+    if orjson is None:
+        pytest.skip("orjson is not installed")
+    s = encode(obj, "orjson")
+    assert decode(s, "json") == expected
+    # read the value written by stdlib json
+    assert decode(encode(obj), "orjson") == expected
+
+
+def test_mixed_values():
+    if msgpack is None:
+        pytest.skip("msgpack is not installed")
+    binary = encode(obj, "msgpack")
+    assert binary.startswith("~m")
+    # values written before switching codec are still readable
+    assert decode(encode(obj), "msgpack") == expected
+    assert decode(binary, "json") == expected
+
+
+@pytest.mark.parametrize("compression", ["zlib", "lz4"])
+def test_compression(compression):
+    if compression == "lz4":
+        pytest.importorskip("lz4")
+    compressor = get_compressor(compression, threshold=100)
+    large = {"items": [dict(obj, index=i) for i in range(20)]}
+    s = encode(large, compressor=compressor)
+    assert s.startswith("~j" + compressor.tag)
+    assert len(s) < len(encode(large))
+    assert decode(s) == {"items": [
+        dict(expected, index=i) for i in range(20)]}
+    # small value is not compressed
+    assert encode({"k": "v"}, compressor=compressor) == '{"k": "v"}'
+
+    stats = compressor.stats()
+    assert stats["compressed"] == 1
+    assert stats["skipped"] == 1
+    assert stats["bytes_saved"] == \
+        stats["original_bytes"] - stats["stored_bytes"] > 0
+
+    # compress binary codec
+    if msgpack is not None:
+        s = encode(large, "msgpack", compressor)
+        assert s.startswith("~m" + compressor.tag)
+        assert decode(s, "json")["items"][0] == dict(expected, index=0)
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("unknown")
+    with pytest.raises(ValueError):
+        decode("~x-AAAA")
+    with pytest.raises(ValueError):
+        get_compressor("unknown")
+    assert get_compressor() is None
+
+
+def test_abstract_classes():
+    with pytest.raises(TypeError):
+        Codec()
+    with pytest.raises(TypeError):
+        Compressor()
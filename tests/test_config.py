@@ -26,3 +26,17 @@ def test_get():
 def test_get_without_section():
     config = Config("config/test_config_empty.ini")
     assert config.get("timezone") == "UTC"
+
+
+def test_getboolean():
+    config = Config("config/test_config.ini")
+    config.confg_parser.set("minette", "bool_true", "True")
+    config.confg_parser.set("minette", "bool_yes", "yes")
+    config.confg_parser.set("minette", "bool_false", "false")
+    assert config.getboolean("bool_true") is True
+    assert config.getboolean("bool_yes") is True
+    assert config.getboolean("bool_false") is False
+    assert config.getboolean("not_configured") is False
+    assert config.getboolean("not_configured", default=True) is True
+    # environment variable is not set
+    assert config.getboolean("key2", default=True) is True
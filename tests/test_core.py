@@ -2,6 +2,7 @@ import sys
 import os
 sys.path.append(os.pardir)
 import pytest
+import asyncio
 from pytz import timezone
 from logging import Logger, FileHandler, getLogger
 from datetime import datetime
@@ -11,7 +12,8 @@ from minette import (
     Minette, DialogService, SQLiteConnectionProvider,
     SQLiteContextStore, SQLiteUserStore, SQLiteMessageLogStore,
     Tagger, Config, DialogRouter, StoreSet, Message, User, Group,
-    DependencyContainer, Payload
+    DependencyContainer, Payload, PooledConnectionProvider, CachedTagger,
+    CachedContextStore, BufferedMessageLogStore, PartitionedMessageLogStore
 )
 from minette.utils import date_to_unixtime
 from minette.tagger.janometagger import JanomeTagger
@@ -317,6 +319,208 @@ def test_chat():
     assert res.messages[0].text == "res:hello"
 
 
+class AsyncDialog(DialogService):
+    async def process_request(self, request, context, connection):
+        await asyncio.sleep(0)
+        context.data["count"] = context.data.get("count", 0) + 1
+        context.topic.keep_on = True
+
+    async def compose_response(self, request, context, connection):
+        return "res:{}:{}".format(request.text, context.data["count"])
+
+
+def test_chat_async():
+    bot = Minette(default_dialog_service=MyDialog)
+    res = asyncio.run(bot.chat_async("hello"))
+    assert res.messages[0].text == "res:hello"
+
+    # successive conversation with async dialog
+    bot = Minette(default_dialog_service=AsyncDialog)
+    res = asyncio.run(bot.chat_async(Message(text="hello", channel_user_id=user_id + "_async")))
+    assert res.messages[0].text == "res:hello:1"
+    res = asyncio.run(bot.chat_async(Message(text="hello", channel_user_id=user_id + "_async")))
+    assert res.messages[0].text == "res:hello:2"
+
+
+def test_chat_async_concurrent():
+    bot = Minette(default_dialog_service=MyDialog)
+
+    async def chat_all():
+        return await asyncio.gather(
+            *[bot.chat_async(Message(text="hello" + str(i), channel_user_id=user_id + "_c" + str(i))) for i in range(10)])
+
+    responses = asyncio.run(chat_all())
+    assert [r.messages[0].text for r in responses] == ["res:hello" + str(i) for i in range(10)]
+
+
+def test_chat_async_error():
+    bot = Minette(default_dialog_service=MyDialog)
+    bot.connection_provider = None
+    res = asyncio.run(bot.chat_async("hello"))
+    assert res.messages == []
+
+
+class CountDialog(DialogService):
+    def process_request(self, request, context, connection):
+        context.data["count"] = context.data.get("count", 0) + 1
+        context.topic.keep_on = True
+
+    def compose_response(self, request, context, connection):
+        return "{}:{}".format(request.text, context.data["count"])
+
+
+def test_chat_batch():
+    bot = Minette(default_dialog_service=CountDialog)
+    requests = [
+        Message(text="a1", channel_user_id=user_id + "_batch_a"),
+        Message(text="b1", channel_user_id=user_id + "_batch_b"),
+        Message(text="a2", channel_user_id=user_id + "_batch_a"),
+        Message(text="c1", channel_user_id=""),
+        Message(text="a3", channel_user_id=user_id + "_batch_a"),
+        Message(text="c2", channel_user_id=""),
+    ]
+    responses = bot.chat_batch(requests)
+    assert [r.messages[0].text for r in responses] == ["a1:1", "b1:1", "a2:2", "c1:1", "a3:3", "c2:1"]
+    assert responses[0].performance.ticks
+
+    # context and user are saved
+    res = bot.chat(Message(text="a4", channel_user_id=user_id + "_batch_a"))
+    assert res.messages[0].text == "a4:4"
+    assert bot.chat_batch([]) == []
+
+    # str messages
+    bot = Minette(default_dialog_service=MyDialog)
+    responses = bot.chat_batch(["hello", "world"])
+    assert [r.messages[0].text for r in responses] == ["res:hello", "res:world"]
+
+
+def test_chat_batch_error():
+    bot = Minette(default_dialog_service=MyDialog)
+    bot.connection_provider = None
+    responses = bot.chat_batch(["hello", "world"])
+    assert [r.messages for r in responses] == [[], []]
+
+
+class CommitCountingConnection:
+    def __init__(self, connection, provider):
+        self.connection = connection
+        self.provider = provider
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def commit(self):
+        self.provider.commit_count += 1
+        self.connection.commit()
+
+
+class CommitCountingConnectionProvider(SQLiteConnectionProvider):
+    commit_count = 0
+
+    def get_connection(self):
+        return CommitCountingConnection(super().get_connection(), self)
+
+
+class ErrorMessageLogStore(SQLiteMessageLogStore):
+    def save(self, request, response, context, connection):
+        raise Exception("messagelog error")
+
+
+def test_chat_unit_of_work():
+    # commit at each store
+    bot = Minette(
+        default_dialog_service=CountDialog,
+        connection_provider=CommitCountingConnectionProvider)
+    assert bot.unit_of_work is False
+    res = bot.chat(Message(text="a", channel_user_id=user_id + "_uow"))
+    assert res.messages[0].text == "a:1"
+    assert bot.connection_provider.commit_count > 1
+
+    # commit once in a turn
+    bot = Minette(
+        default_dialog_service=CountDialog,
+        connection_provider=CommitCountingConnectionProvider,
+        unit_of_work=True)
+    bot.connection_provider.commit_count = 0
+    res = bot.chat(Message(text="b", channel_user_id=user_id + "_uow"))
+    assert res.messages[0].text == "b:2"
+    assert bot.connection_provider.commit_count == 1
+    res = asyncio.run(bot.chat_async(
+        Message(text="c", channel_user_id=user_id + "_uow")))
+    assert res.messages[0].text == "c:3"
+    assert bot.connection_provider.commit_count == 2
+
+
+def test_chat_unit_of_work_messagelog_failure():
+    # changes are committed even if message log fails by default
+    bot = Minette(
+        default_dialog_service=CountDialog,
+        messagelog_store=ErrorMessageLogStore,
+        unit_of_work=True)
+    assert bot.messagelog_failure == "commit"
+    bot.chat(Message(text="a", channel_user_id=user_id + "_uow_commit"))
+    res = bot.chat(Message(text="b", channel_user_id=user_id + "_uow_commit"))
+    assert res.messages[0].text == "b:2"
+
+    # changes are discarded
+    bot = Minette(
+        default_dialog_service=CountDialog,
+        messagelog_store=ErrorMessageLogStore,
+        unit_of_work=True, messagelog_failure="rollback")
+    bot.chat(Message(text="a", channel_user_id=user_id + "_uow_rollback"))
+    res = bot.chat(Message(text="b", channel_user_id=user_id + "_uow_rollback"))
+    assert res.messages[0].text == "b:1"
+
+
+class SaveUserErrorMinette(Minette):
+    def _save_user(self, user, connection):
+        raise Exception("save user error")
+
+    async def _save_user_async(self, user, connection):
+        raise Exception("save user error")
+
+
+def test_chat_unit_of_work_error():
+    # changes in the turn failed are not committed
+    bot = SaveUserErrorMinette(
+        default_dialog_service=CountDialog, unit_of_work=True)
+    res = bot.chat(Message(text="a", channel_user_id=user_id + "_uow_error"))
+    assert res.messages == []
+    res = asyncio.run(bot.chat_async(
+        Message(text="b", channel_user_id=user_id + "_uow_error")))
+    assert res.messages == []
+    ctx = bot.context_store.get(
+        "console", user_id + "_uow_error",
+        bot.connection_provider.get_connection())
+    assert ctx.is_new is True
+    assert ctx.data == {}
+
+
+def test_chat_connection_pool():
+    bot = Minette(default_dialog_service=MyDialog, connection_pool_size=2)
+    assert isinstance(bot.connection_provider, PooledConnectionProvider)
+    assert bot.connection_provider.max_size == 2
+    bot.chat("hello")
+    res = bot.chat("hello")
+    assert res.messages[0].text == "res:hello"
+    stats = bot.connection_provider.stats()
+    assert stats["created"] == 1
+    assert stats["in_use"] == 0
+
+    # pass connection provider instance
+    connection_provider = PooledConnectionProvider(
+        SQLiteConnectionProvider("minette.db"), max_size=1, checkout_timeout=1)
+    bot = Minette(
+        default_dialog_service=MyDialog, connection_provider=connection_provider,
+        unit_of_work=True)
+    assert bot.connection_provider is connection_provider
+    res = bot.chat("hello")
+    res = asyncio.run(bot.chat_async("hello"))
+    assert res.messages[0].text == "res:hello"
+    assert [r.messages[0].text for r in bot.chat_batch(["a", "b"])] == ["res:a", "res:b"]
+    assert connection_provider.stats()["idle"] == 1
+
+
 def test_chat_error():
     bot = Minette(default_dialog_service=MyDialog)
     bot.connection_provider = None
@@ -358,6 +562,117 @@ def test_chat_with_tagger():
     assert words[4].surface == "です"
 
 
+def test_chat_with_tagger_lazy():
+    # words are not used
+    bot = Minette(default_dialog_service=MyDialog, tagger=JanomeTagger)
+    res = bot.chat("今日はいい天気です。")
+    ticks = [t[0] for t in res.performance.ticks]
+    assert "tagger.parse" not in ticks
+
+    # words are used
+    bot = Minette(default_dialog_service=TaggerDialog, tagger=JanomeTagger)
+    res = bot.chat("今日はいい天気です。")
+    assert res.messages[0].payloads[0].content[0].surface == "今日"
+    ticks = [t[0] for t in res.performance.ticks]
+    assert ticks.count("tagger.parse") == 1
+    assert ticks.index("tagger.parse") > ticks.index("dialog_router.execute")
+
+
+def test_chat_with_tagger_cache():
+    bot = Minette(
+        default_dialog_service=TaggerDialog,
+        tagger=JanomeTagger, tagger_cache_size=10)
+    assert isinstance(bot.tagger, CachedTagger)
+    assert isinstance(bot.tagger.tagger, JanomeTagger)
+    bot.chat("今日はいい天気です。")
+    res = bot.chat("今日はいい天気です。")
+    assert res.messages[0].payloads[0].content[0].surface == "今日"
+    assert bot.tagger.stats()["hits"] == 1
+
+
+class CountDialogService(DialogService):
+    def process_request(self, request, context, connection):
+        context.data["count"] = context.data.get("count", 0) + 1
+        context.topic.keep_on = True
+
+    def compose_response(self, request, context, connection):
+        return str(context.data["count"])
+
+
+def test_chat_with_context_cache():
+    bot = Minette(
+        default_dialog_service=CountDialogService, context_cache_size=10)
+    assert isinstance(bot.context_store, CachedContextStore)
+    assert isinstance(bot.context_store.store, SQLiteContextStore)
+    assert bot.context_store.cache_size == 10
+    assert bot.chat(Message(
+        text="hello", channel_user_id=user_id + "_cc")).messages[0].text == "1"
+    assert bot.chat(Message(
+        text="hello", channel_user_id=user_id + "_cc")).messages[0].text == "2"
+    assert bot.context_store.stats()["hits"] == 1
+
+
+def test_chat_with_messagelog_queue():
+    bot = Minette(
+        default_dialog_service=CountDialogService, messagelog_queue_size=100)
+    assert isinstance(bot.messagelog_store, BufferedMessageLogStore)
+    assert isinstance(bot.messagelog_store.store, SQLiteMessageLogStore)
+    bot.chat(Message(text="queued", channel_user_id=user_id + "_mq"))
+    bot.chat_batch([Message(text="queued", channel_user_id=user_id + "_mq")])
+    assert bot.messagelog_store.flush(timeout=10) is True
+    assert bot.messagelog_store.stats()["written"] == 2
+    bot.messagelog_store.close()
+
+
+def test_chat_with_messagelog_partition():
+    bot = Minette(
+        default_dialog_service=CountDialogService,
+        messagelog_table="partitionlog", messagelog_partition="daily",
+        messagelog_queue_size=100)
+    assert isinstance(bot.messagelog_store, BufferedMessageLogStore)
+    ps = bot.messagelog_store.store
+    assert isinstance(ps, PartitionedMessageLogStore)
+    bot.chat(Message(text="hello", channel_user_id=user_id + "_mp"))
+    assert bot.messagelog_store.flush(timeout=10) is True
+    bot.messagelog_store.close()
+    with bot.connection_provider.get_connection() as connection:
+        assert ps.partition_name(datetime.now(bot.timezone)) in \
+            ps.list_partitions(connection)
+        history = bot.messagelog_store.get_history(
+            "console", user_id + "_mp", connection)
+    assert [r["request_text"] for r in history] == ["hello"]
+
+
+class CountingUserStore(SQLiteUserStore):
+    saved = 0
+
+    def save(self, user, connection):
+        CountingUserStore.saved += 1
+        super().save(user, connection)
+
+
+class UserNameDialogService(DialogService):
+    def process_request(self, request, context, connection):
+        if request.text.startswith("name:"):
+            request.user.name = request.text[5:]
+
+    def compose_response(self, request, context, connection):
+        return request.user.name
+
+
+def test_chat_save_changed_user():
+    bot = Minette(
+        default_dialog_service=UserNameDialogService,
+        user_store=CountingUserStore)
+    bot.chat(Message(text="hello", channel_user_id=user_id + "_su"))
+    assert CountingUserStore.saved == 0
+    bot.chat(Message(text="name:minette", channel_user_id=user_id + "_su"))
+    assert CountingUserStore.saved == 1
+    res = bot.chat(Message(text="hello", channel_user_id=user_id + "_su"))
+    assert res.messages[0].text == "minette"
+    assert CountingUserStore.saved == 1
+
+
 def test_chat_with_tagger_no_parse():
     bot = Minette(
         default_dialog_service=TaggerDialog,
@@ -45,5 +45,7 @@ def test_decode_json():
     obj = loads('{"key1": "value1", "key2": 2, "key3": "2019-01-02T03:04:05+09:00"}')
     assert obj["key1"] == "value1"
     assert obj["key2"] == 2
+    assert obj["key3"] == "2019-01-02T03:04:05+09:00"
+    obj = loads('{"key1": "value1", "key2": 2, "key3": "2019-01-02T03:04:05+09:00"}', datetime_decoding="legacy")
     assert obj["key3"] == aware_dt
     assert loads("") is None